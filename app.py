@@ -18,18 +18,37 @@ import tempfile
 import subprocess
 import re
 import signal
-import asyncio
+import zlib
+import codecs
 from urllib.parse import urlparse
 from datetime import datetime
 from functools import wraps
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, Response
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from db import Database, TTLCache
+from job_store import JobStore
+from file_delivery import MediaDelivery, content_disposition, follow_file
+from streaming_zip import stream_zip, tee_to_file
+from hls import HLSPackager, segment_mimetype
+from async_runtime import async_runtime
+from model_manager import ModelManager, WHISPER_MEMORY_MB, XTTS_MEMORY_MB
+from transcription import BatchedTranscriber
+from pcm_cache import PCMCache, source_key
+from transcript_cache import TranscriptCache, content_hash
+from llm import create_client
+from llm_cache import CachedLLMClient
+from story import StoryGenerator, PROMPT_VERSION
+from speech import ChunkedSynthesizer, create_engine
+from tts_cache import TTSCache
+from speaker_store import SpeakerStore
+from captions import CAPTIONS_MODEL, choose_caption_track, parse_cues, caption_result
+from vad import SAMPLE_RATE
+from events import job_events, job_event, format_sse
 import numpy as np
 import yt_dlp
-import edge_tts
 try:
     import google.generativeai as genai
     GEMINI_AVAILABLE = True
@@ -99,14 +118,25 @@ app.config['OUTPUT_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__fil
 app.config['AUDIO_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audio')
 app.config['TRANSCRIPT_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcripts')
 app.config['VOICE_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'voices')
+app.config['PREVIEW_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'previews')
 app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 * 1024  # 1GB max
 app.config['ALLOWED_EXTENSIONS'] = {'mp4', 'avi', 'mov', 'mkv', 'flv', 'wmv', 'mp3', 'wav', 'm4a'}
 app.config['SECRET_KEY'] = 'video-editor-secret-key-change-this-in-production'
 
+# Media folders served through nginx internal locations (see nginx.conf)
+media = MediaDelivery({
+    app.config['UPLOAD_FOLDER']: '/protected/uploads/',
+    app.config['OUTPUT_FOLDER']: '/protected/outputs/',
+    app.config['AUDIO_FOLDER']: '/protected/audio/',
+    app.config['VOICE_FOLDER']: '/protected/voices/',
+    app.config['TRANSCRIPT_FOLDER']: '/protected/transcripts/',
+    app.config['PREVIEW_FOLDER']: '/protected/previews/',
+})
+
 # Create necessary directories
 for folder in [app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'], 
               app.config['AUDIO_FOLDER'], app.config['TRANSCRIPT_FOLDER'], 
-              app.config['VOICE_FOLDER']]:
+              app.config['VOICE_FOLDER'], app.config['PREVIEW_FOLDER']]:
     os.makedirs(folder, exist_ok=True)
 
 # Initialize Gemini if available
@@ -170,11 +200,21 @@ def init_db():
     conn.commit()
     conn.close()
 
+# Shared database layer - a bounded pool of connections shared by all threads
+app.config['DATABASE'] = os.environ.get('DATABASE_PATH', '/app/data/users.db')
+db = Database(app.config['DATABASE'])
+
+# Authenticated users are cached so request auth is not a DB round trip
+user_cache = TTLCache(maxsize=1024, ttl=300)
+
 # Database setup
 def init_db():
-    conn = sqlite3.connect('/app/data/users.db')
+    conn = db.acquire()
     c = conn.cursor()
     
+    # WAL lets readers run alongside the writer; the mode is stored in the database file
+    c.execute("PRAGMA journal_mode=WAL")
+    
     # Users table
     c.execute('''CREATE TABLE IF NOT EXISTS users
                  (id INTEGER PRIMARY KEY AUTOINCREMENT, 
@@ -201,6 +241,15 @@ def init_db():
     except:
         print("ℹ️ type column already exists")
     
+    # Columns used by the job cache when finished jobs are evicted from memory
+    for column in ['progress INTEGER', 'error TEXT', 'input_path TEXT', 'output_file TEXT',
+                   'transcript_path TEXT', 'story_path TEXT', 'voice_path TEXT',
+                   'file_type TEXT', 'finished_at REAL', 'preview_playlist TEXT']:
+        try:
+            c.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    
     # Transcripts table
     c.execute('''CREATE TABLE IF NOT EXISTS transcripts
                  (id TEXT PRIMARY KEY,
@@ -211,6 +260,39 @@ def init_db():
                   created_at TIMESTAMP,
                   FOREIGN KEY (user_id) REFERENCES users (id))''')
     
+    # Columns used by the transcript cache to find earlier runs on the same media
+    for column in ['media_key TEXT', 'model TEXT', 'segments_path TEXT']:
+        try:
+            c.execute(f"ALTER TABLE transcripts ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    c.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_media ON transcripts (media_key, model, language)")
+    
+    # LLM responses reused across story jobs
+    c.execute('''CREATE TABLE IF NOT EXISTS llm_cache
+                 (key TEXT PRIMARY KEY,
+                  model TEXT,
+                  prompt_version TEXT,
+                  response TEXT,
+                  size INTEGER,
+                  created_at REAL,
+                  last_used REAL,
+                  hits INTEGER DEFAULT 0)''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+    
+    # Saved XTTS speaker profiles for voice cloning
+    c.execute('''CREATE TABLE IF NOT EXISTS speakers
+                 (id TEXT PRIMARY KEY,
+                  user_id INTEGER,
+                  name TEXT,
+                  sample_path TEXT,
+                  sample_hash TEXT,
+                  latents_path TEXT,
+                  model TEXT,
+                  created_at TIMESTAMP,
+                  FOREIGN KEY (user_id) REFERENCES users (id))''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_speakers_user ON speakers (user_id, sample_hash)")
+    
     # Voices table
     c.execute('''CREATE TABLE IF NOT EXISTS voices
                  (id TEXT PRIMARY KEY,
@@ -222,7 +304,7 @@ def init_db():
                   FOREIGN KEY (user_id) REFERENCES users (id))''')
     
     conn.commit()
-    conn.close()
+    db.release(conn)
 
 
 init_db()
@@ -235,17 +317,49 @@ class User(UserMixin):
 
 @login_manager.user_loader
 def load_user(user_id):
-    conn = sqlite3.connect('/app/data/users.db')
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    user = c.fetchone()
-    conn.close()
+    user_obj = user_cache.get(str(user_id))
+    if user_obj:
+        return user_obj
+    user = db.query_one("SELECT id, username, email FROM users WHERE id = ?", (user_id,))
     if user:
-        return User(user[0], user[1], user[3])
+        user_obj = User(user[0], user[1], user[2])
+        user_cache.set(str(user_id), user_obj)
+        return user_obj
     return None
 
-# Store active jobs in memory
-active_jobs = {}
+def invalidate_user(user_id):
+    """Drop a cached user, e.g. after logout or a password change"""
+    user_cache.invalidate(str(user_id))
+
+# Store active jobs in a bounded in-memory cache backed by the jobs table
+app.config['JOB_CACHE_SIZE'] = int(os.environ.get('JOB_CACHE_SIZE', 1000))
+app.config['JOB_TTL'] = int(os.environ.get('JOB_TTL', 3600))  # seconds after a job finishes
+def job_evicted(job):
+    """Delete a job's preview rendition and cached download package once it leaves the cache"""
+    job['preview_playlist'] = None
+    preview_packager.remove(job.id)
+    package_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job.id}_package.zip")
+    try:
+        os.remove(package_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove {package_path}: {e}")
+
+active_jobs = JobStore(db,
+                       max_jobs=app.config['JOB_CACHE_SIZE'],
+                       ttl=app.config['JOB_TTL'],
+                       on_change=job_events.publish_job,
+                       on_evict=job_evicted)
+
+def preview_ready(job_id, playlist_path):
+    """Record a finished HLS preview on its job"""
+    job = active_jobs.get(job_id)
+    if job is not None:
+        job['preview_playlist'] = playlist_path
+
+# Low-bitrate HLS proxies for previews, built in the background
+preview_packager = HLSPackager(app.config['PREVIEW_FOLDER'], on_ready=preview_ready)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -512,170 +626,405 @@ def get_output_parameters(quality):
     else:  # low
         return {'bitrate': '1000k', 'codec': 'libx264', 'preset': 'fast'}
 
+# ==================== MODEL MANAGER ====================
+
+# Whisper and XTTS stay resident between jobs instead of loading per request
+app.config['WHISPER_MODEL'] = os.environ.get('WHISPER_MODEL', 'base')
+app.config['XTTS_MODEL'] = os.environ.get('XTTS_MODEL', 'tts_models/multilingual/multi-dataset/xtts_v2')
+app.config['MODEL_MEMORY_MB'] = int(os.environ.get('MODEL_MEMORY_MB', 6144))
+app.config['MODEL_IDLE_SECONDS'] = int(os.environ.get('MODEL_IDLE_SECONDS', 1800))
+app.config['PRELOAD_MODELS'] = [name.strip() for name in os.environ.get('PRELOAD_MODELS', '').split(',')
+                                if name.strip()]
+
+def _load_whisper():
+    import whisper
+    return whisper.load_model(app.config['WHISPER_MODEL'])
+
+def _load_xtts():
+    from TTS.api import TTS
+    return TTS(app.config['XTTS_MODEL'], gpu=False)
+
+model_manager = ModelManager(memory_budget_mb=app.config['MODEL_MEMORY_MB'],
+                             idle_timeout=app.config['MODEL_IDLE_SECONDS'])
+model_manager.register('whisper', _load_whisper,
+                       WHISPER_MEMORY_MB.get(app.config['WHISPER_MODEL'], 1000))
+model_manager.register('xtts', _load_xtts, XTTS_MEMORY_MB)
+
+# Whisper windows from all transcript jobs are batched; the latency knob bounds
+# how long a window waits for others before its batch is decoded
+app.config['WHISPER_BATCH_SIZE'] = int(os.environ.get('WHISPER_BATCH_SIZE', 8))
+app.config['WHISPER_BATCH_LATENCY_MS'] = int(os.environ.get('WHISPER_BATCH_LATENCY_MS', 100))
+# Streamed transcripts each run an ffmpeg decoder; this many at once, the rest
+# wait on the event loop without holding a thread
+app.config['TRANSCRIBE_STREAMS'] = int(os.environ.get('TRANSCRIBE_STREAMS', 4))
+whisper_batcher = BatchedTranscriber(model_manager,
+                                     max_batch=app.config['WHISPER_BATCH_SIZE'],
+                                     max_latency=app.config['WHISPER_BATCH_LATENCY_MS'] / 1000,
+                                     executor=async_runtime.cpu_executor,
+                                     max_streams=app.config['TRANSCRIBE_STREAMS'])
+
+if app.config['PRELOAD_MODELS']:
+    # Load in the background so the worker starts serving immediately
+    threading.Thread(target=model_manager.preload, args=(app.config['PRELOAD_MODELS'],),
+                     name='model-preload', daemon=True).start()
+
 # ==================== TRANSCRIPT & VOICE GENERATION FUNCTIONS ====================
 
+# Smallest audio-only format; speech recognition only needs 16kHz mono
+ASR_AUDIO_FORMAT = 'worstaudio[abr>=32]/worstaudio/bestaudio/best'
+
+# Decoded 16kHz PCM per video, reused by transcription and the VAD
+app.config['PCM_CACHE_FOLDER'] = os.path.join(app.config['AUDIO_FOLDER'], 'pcm')
+app.config['PCM_CACHE_MB'] = int(os.environ.get('PCM_CACHE_MB', 2048))
+pcm_cache = PCMCache(app.config['PCM_CACHE_FOLDER'], max_bytes=app.config['PCM_CACHE_MB'] * 1024 * 1024)
+
+# Story generation: LLM_BACKEND=stub runs the pipeline offline without Gemini
+app.config['LLM_BACKEND'] = os.environ.get('LLM_BACKEND', 'gemini')
+app.config['LLM_MODEL'] = os.environ.get('LLM_MODEL', 'gemini-1.5-pro')
+app.config['STORY_CHUNK_TOKENS'] = int(os.environ.get('STORY_CHUNK_TOKENS', 8000))
+app.config['STORY_CONCURRENCY'] = int(os.environ.get('STORY_CONCURRENCY', 4))
+app.config['LLM_CACHE_MB'] = int(os.environ.get('LLM_CACHE_MB', 64))
+llm_client = None
+story_generator = None
+if app.config['LLM_BACKEND'] != 'gemini' or GEMINI_AVAILABLE:
+    # Repeated prompts (same transcript chunk, model and templates) are answered from SQLite
+    llm_client = CachedLLMClient(create_client(app.config['LLM_BACKEND'], app.config['LLM_MODEL']), db,
+                                 prompt_version=PROMPT_VERSION,
+                                 max_bytes=app.config['LLM_CACHE_MB'] * 1024 * 1024)
+    story_generator = StoryGenerator(llm_client,
+                                     chunk_tokens=app.config['STORY_CHUNK_TOKENS'],
+                                     concurrency=app.config['STORY_CONCURRENCY'])
+
+# Story narration: sentences are synthesised concurrently and retried one by one;
+# TTS_BACKEND=fake produces silent audio offline
+app.config['TTS_BACKEND'] = os.environ.get('TTS_BACKEND', 'edge')
+app.config['TTS_VOICE'] = os.environ.get('TTS_VOICE', 'my-MM-ThihaNeural')
+app.config['TTS_CONCURRENCY'] = int(os.environ.get('TTS_CONCURRENCY', 4))
+app.config['TTS_RETRIES'] = int(os.environ.get('TTS_RETRIES', 3))
+# Synthesised sentences are cached by engine, voice and text, so repeated and
+# edited texts only synthesise new sentences
+app.config['TTS_CACHE_FOLDER'] = os.path.join(app.config['AUDIO_FOLDER'], 'tts')
+app.config['TTS_CACHE_MB'] = int(os.environ.get('TTS_CACHE_MB', 1024))
+tts_cache = TTSCache(app.config['TTS_CACHE_FOLDER'], max_bytes=app.config['TTS_CACHE_MB'] * 1024 * 1024)
+voice_synthesizer = ChunkedSynthesizer(create_engine(app.config['TTS_BACKEND'], app.config['TTS_VOICE']),
+                                       concurrency=app.config['TTS_CONCURRENCY'],
+                                       retries=app.config['TTS_RETRIES'],
+                                       cache=tts_cache)
+
+# /voice requests: gTTS by default, or edge-tts with a voice per voice_type
+app.config['VOICE_TTS_BACKEND'] = os.environ.get('VOICE_TTS_BACKEND', 'gtts')
+app.config['EDGE_VOICES'] = {'female': 'my-MM-NilarNeural', 'male': 'my-MM-ThihaNeural'}
+# Names of TTS cache entries (sha256 keys) that /audio may serve
+TTS_CACHE_FILE_RE = re.compile(r'^[0-9a-f]{64}\.mp3$')
+
+# Running /voice syntheses by voice ID; every stream request follows the same file
+voice_tasks = {}
+
+# Finished transcripts are reused for the same media, model and language
+transcript_cache = TranscriptCache(db, os.path.join(app.config['TRANSCRIPT_FOLDER'], 'segments'))
+
+def _download_with_ytdlp(url, ydl_opts):
+    """Blocking yt-dlp download, run in the async runtime's I/O executor"""
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.extract_info(url, download=True)
+
 async def download_youtube_audio(url, output_path):
-    """Download audio from YouTube URL"""
+    """Download the smallest audio-only format of a YouTube video for speech recognition
+
+    Whisper works on 16kHz mono, so the file is not transcoded here; it is
+    decoded once into the PCM cache instead. Returns the downloaded path
+    (yt-dlp picks the extension) or None.
+    """
     try:
         ydl_opts = {
-            'format': 'bestaudio/best',
-            'outtmpl': output_path,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
+            'format': ASR_AUDIO_FORMAT,
+            'outtmpl': os.path.splitext(output_path)[0] + '.%(ext)s',
+            'quiet': True,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        info = await async_runtime.run_blocking(_download_with_ytdlp, url, ydl_opts)
         
-        return True
+        downloads = info.get('requested_downloads') or [{}]
+        return downloads[0].get('filepath') or downloads[0].get('_filename')
     except Exception as e:
         logger.error(f"YouTube download error: {e}")
-        return False
+        return None
+
+async def transcribe_audio(audio, on_segment=None, language=None):
+    """Transcribe an audio file or 16kHz PCM samples using Whisper
 
-async def transcribe_audio(audio_path):
-    """Transcribe audio using Whisper"""
+    Returns the result (text, segments, language) or None.
+    """
     try:
-        import whisper
-        model = whisper.load_model("base")
-        result = model.transcribe(audio_path)
-        return result['text']
+        # Windows from concurrent jobs are decoded together in shared batches
+        return await whisper_batcher.transcribe_async(audio, language=language, on_segment=on_segment)
     except Exception as e:
         logger.error(f"Transcription error: {e}")
         return None
 
-async def generate_burmese_story(transcript_text):
-    """Generate Burmese storytelling summary using Gemini 1.5 Pro"""
+async def generate_burmese_story(transcript_text, on_delta=None):
+    """Generate Burmese storytelling summary with the configured LLM
+
+    on_delta, if given, receives each piece of the story as it is generated.
+    """
     try:
-        if not GEMINI_AVAILABLE:
+        if story_generator is None:
             return "တောင်းပန်ပါသည်။ Gemini AI မရှိပါ။"  # "Sorry. Gemini AI not available."
         
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
-        prompt = f"""
-        You are NotebookLM, an AI assistant specialized in creating engaging, educational content from transcripts. 
-        
-        Please analyze this transcript and create a compelling Burmese story that:
-        1. Captures the main themes and key insights
-        2. Uses natural, conversational Myanmar language
-        3. Includes cultural context where appropriate
-        4. Is engaging and easy to understand
-        5. Follows storytelling traditions of Myanmar
-        
-        Format as a narrative story that flows naturally, not just a summary.
-        Use rich vocabulary but keep it accessible.
-        
-        Original transcript:
-        {transcript_text}
-        
-        Burmese story (NotebookLM style):
-        """
-        
-        response = model.generate_content(prompt)
-        return response.text
+        # Long transcripts are summarised in chunks first, then retold as one story
+        pieces = []
+        async for piece in story_generator.stream(transcript_text):
+            pieces.append(piece)
+            if on_delta:
+                on_delta(piece)
+        return ''.join(pieces)
     except Exception as e:
         logger.error(f"Gemini story generation error: {e}")
         return "တောင်းပန်ပါသည်။ ဇာတ်လမ်းဖန်တီးရာတွင် အမှားဖြစ်ပါသည်။"  # "Sorry. Error generating story."
 
 async def generate_burmese_voice(text, output_path):
-    """Generate Burmese voice using Edge-TTS"""
+    """Generate Burmese voice using Edge-TTS, several sentences at a time"""
     try:
-        communicate = edge_tts.Communicate(text, "my-MM-ThihaNeural")
-        await communicate.save(output_path)
+        await voice_synthesizer.save(text, output_path)
         return True
     except Exception as e:
         logger.error(f"Voice generation error: {e}")
         return False
 
+def _resolve_audio_stream(url):
+    """Blocking lookup of the direct media URL of a video's audio track"""
+    with yt_dlp.YoutubeDL({'format': ASR_AUDIO_FORMAT, 'quiet': True}) as ydl:
+        return ydl.extract_info(url, download=False)
+
+def _fetch_caption_text(url):
+    """Blocking download of a subtitle file through yt-dlp's HTTP client"""
+    with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
+        return ydl.urlopen(url).read().decode('utf-8', errors='replace')
+
+async def fetch_youtube_captions(info, language=None):
+    """Transcript result from a video's subtitle track, None if it has no usable one"""
+    track = choose_caption_track(info, [language] if language else [])
+    if not track:
+        return None
+    track_language, ext, track_url = track
+    try:
+        text = await async_runtime.run_blocking(_fetch_caption_text, track_url)
+        return caption_result(parse_cues(text), track_language)
+    except Exception as e:
+        logger.warning(f"Could not fetch {track_language} {ext} captions: {e}")
+        return None
+
+async def transcribe_youtube(job_id, url, user_id, language=None):
+    """Transcribe a YouTube video from 16kHz PCM, publishing partial segments
+
+    A transcript cached for the same video, model and language is returned
+    without downloading anything, and a usable subtitle track is used
+    instead of Whisper. Otherwise each video is decoded to PCM
+    once and cached: a cached track is transcribed straight away, else the
+    audio stream is transcribed while it downloads and teed into the cache.
+    If streaming fails, the smallest audio-only file is downloaded and
+    decoded instead. Returns the result (text, segments, language) or None.
+    """
+    info = None
+    try:
+        # Metadata only; nothing is downloaded yet
+        info = await async_runtime.run_blocking(_resolve_audio_stream, url)
+    except Exception as e:
+        logger.warning(f"Could not resolve audio stream for job {job_id}: {e}")
+    
+    model = f"whisper-{app.config['WHISPER_MODEL']}"
+    title = (info or {}).get('title') or f"Transcript from {url[:30]}..."
+    media_key = (source_key(info['id'], extractor=info.get('extractor_key') or info.get('extractor'))
+                 if info and info.get('id') else None)
+    
+    def cached_result(key):
+        for cached_model in (CAPTIONS_MODEL, model):
+            result = transcript_cache.lookup(key, cached_model, language)
+            if result:
+                logger.info(f"Transcript cache hit for {key} (job {job_id})")
+                transcript_cache.store(user_id, title, key, cached_model, language, result)
+                return result
+        return None
+    
+    if media_key:
+        result = cached_result(media_key)
+        if result:
+            return result
+    
+    # Existing subtitles beat running Whisper
+    if info:
+        result = await fetch_youtube_captions(info, language)
+        if result:
+            logger.info(f"Using {result['language']} captions for job {job_id}")
+            transcript_cache.store(user_id, title, media_key, CAPTIONS_MODEL, language, result)
+            return result
+    
+    pcm_key = media_key or source_key(url=url)
+    duration = (info or {}).get('duration')
+    
+    def on_segment(segment):
+        job = active_jobs[job_id]
+        job.append('segments', segment)
+        if duration:
+            job['progress'] = max(job['progress'], min(69, 10 + int(60 * segment['end'] / duration)))
+    
+    result = None
+    samples = pcm_cache.get(pcm_key)
+    if samples is not None:
+        logger.info(f"Transcribing cached PCM {pcm_key} for job {job_id}")
+        duration = len(samples) / SAMPLE_RATE
+        result = await transcribe_audio(samples, on_segment, language)
+    
+    elif info and info.get('url'):
+        input_args = ['-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5']
+        headers = ''.join(f"{k}: {v}\r\n" for k, v in (info.get('http_headers') or {}).items())
+        if headers:
+            input_args += ['-headers', headers]
+        input_args += ['-i', info['url']]
+        try:
+            with pcm_cache.writer(pcm_key) as pcm_sink:
+                result = await whisper_batcher.transcribe_stream(input_args, language=language,
+                                                                 on_segment=on_segment, pcm_sink=pcm_sink)
+        except Exception as e:
+            logger.error(f"Streaming transcription error for job {job_id}, downloading instead: {e}")
+            active_jobs[job_id]['segments'] = None
+    
+    if result is None and samples is None:
+        # Scratch audio is per job so concurrent requests never share a file
+        logger.info(f"Downloading audio for job {job_id}")
+        downloaded = await download_youtube_audio(url, os.path.join(app.config['AUDIO_FOLDER'], job_id))
+        if not downloaded:
+            raise Exception('Failed to download audio')
+        try:
+            if not media_key:
+                # No video ID to go by; identify the media by its bytes
+                media_key = await async_runtime.run_cpu(content_hash, downloaded)
+                result = cached_result(media_key)
+                if result:
+                    return result
+            samples = await async_runtime.run_cpu(pcm_cache.decode_file, downloaded, pcm_key)
+        finally:
+            if os.path.exists(downloaded):
+                os.remove(downloaded)
+        duration = len(samples) / SAMPLE_RATE
+        result = await transcribe_audio(samples, on_segment, language)
+    
+    if result and result.get('text'):
+        transcript_cache.store(user_id, title, media_key, model, language, result)
+    return result
+
 # ==================== BACKGROUND TASK FOR TRANSCRIPT & VOICE ====================
 
-def process_transcript_and_voice(job_id, youtube_url, user_id):
-    """Background task to process YouTube transcript and generate voice"""
+def transcript_cancelled(job_id):
+    """True once the user cancelled a queued or running transcript job
+
+    The job status is checked as well as the task flag, because cancel_task
+    drops the active_tasks entry shortly after a cancel.
+    """
+    if active_tasks.get(job_id, {}).get('cancelled', False):
+        return True
+    job = active_jobs.get(job_id)
+    return job is not None and job.get('status') == 'cancelled'
+
+
+async def process_transcript_and_voice(job_id, youtube_url, user_id):
+    """Background task to process YouTube transcript and generate voice
+
+    Runs on the shared event loop, so any number of jobs wait on the network,
+    the LLM and TTS together; ffmpeg decoding is bounded by the Whisper
+    batcher's stream slots.
+    """
     try:
-        import asyncio
-        
-        async def run_full_process():
-            # Initialize job
+        # Jobs submitted through /transcript are registered as queued up front
+        if job_id not in active_jobs:
             active_jobs[job_id] = {
                 'id': job_id,
                 'user_id': user_id,
                 'filename': f"Transcript from {youtube_url[:30]}...",
-                'status': 'processing',
+                'status': 'queued',
                 'progress': 0,
+                'type': 'transcript',
                 'created_at': time.time()
             }
-            
-            # Step 1: Download audio (30%)
-            active_jobs[job_id]['progress'] = 10
-            logger.info(f"Step 1: Downloading audio from YouTube")
-            
-            audio_path = os.path.join(app.config['AUDIO_FOLDER'], f"{job_id}.mp3")
-            success = await download_youtube_audio(youtube_url, audio_path)
-            
-            if not success:
-                active_jobs[job_id]['status'] = 'error'
-                active_jobs[job_id]['error'] = 'Failed to download audio'
-                return
-            
-            # Step 2: Transcribe audio (60%)
-            active_jobs[job_id]['progress'] = 40
-            logger.info(f"Step 2: Transcribing audio")
-            
-            transcript = await transcribe_audio(audio_path)
-            if not transcript:
-                active_jobs[job_id]['status'] = 'error'
-                active_jobs[job_id]['error'] = 'Failed to transcribe audio'
-                return
-            
-            # Save transcript
-            transcript_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}.txt")
-            with open(transcript_path, 'w', encoding='utf-8') as f:
-                f.write(transcript)
-            
-            # Step 3: Generate Burmese story (80%)
-            active_jobs[job_id]['progress'] = 70
-            logger.info(f"Step 3: Generating Burmese story")
-            
-            burmese_story = await generate_burmese_story(transcript)
+        if transcript_cancelled(job_id):
+            return
+        active_jobs[job_id]['status'] = 'processing'
+        
+        # Steps 1+2: Decode audio to 16kHz PCM and transcribe it (10% -> 70%)
+        active_jobs[job_id]['progress'] = 10
+        logger.info(f"Step 1: Transcribing audio from YouTube")
+        
+        result = await transcribe_youtube(job_id, youtube_url, user_id)
+        transcript = result['text'] if result else None
+        
+        if not transcript:
+            active_jobs[job_id]['error'] = 'Failed to transcribe audio'
+            active_jobs[job_id]['status'] = 'error'
+            return
+        
+        # Save transcript
+        transcript_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}.txt")
+        with open(transcript_path, 'w', encoding='utf-8') as f:
+            f.write(transcript)
+        active_jobs[job_id]['transcript_path'] = transcript_path
+        # The full transcript supersedes the partial segments
+        active_jobs[job_id]['segments'] = None
+        if transcript_cancelled(job_id):
+            return
+        
+        # Step 3: Generate Burmese story (80%)
+        active_jobs[job_id]['progress'] = 70
+        logger.info(f"Step 3: Generating Burmese story")
+        
+        # The story is streamed into a .part file that /story/stream follows;
+        # the complete text is saved once generation ends
+        story_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}_story.txt")
+        try:
+            with open(f"{story_path}.part", 'w', encoding='utf-8') as partial:
+                def on_delta(piece):
+                    partial.write(piece)
+                    partial.flush()
+                burmese_story = await generate_burmese_story(transcript, on_delta)
             
             # Save story
-            story_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}_story.txt")
             with open(story_path, 'w', encoding='utf-8') as f:
                 f.write(burmese_story)
-            
-            # Step 4: Generate voice (100%)
-            active_jobs[job_id]['progress'] = 90
-            logger.info(f"Step 4: Generating Burmese voice")
-            
-            voice_path = os.path.join(app.config['VOICE_FOLDER'], f"{job_id}.mp3")
-            success = await generate_burmese_voice(burmese_story, voice_path)
-            
-            if not success:
-                active_jobs[job_id]['status'] = 'error'
-                active_jobs[job_id]['error'] = 'Failed to generate voice'
-                return
-            
-            # Complete
-            active_jobs[job_id]['status'] = 'completed'
-            active_jobs[job_id]['progress'] = 100
-            active_jobs[job_id]['transcript_path'] = transcript_path
             active_jobs[job_id]['story_path'] = story_path
-            active_jobs[job_id]['voice_path'] = voice_path
-            active_jobs[job_id]['transcript'] = transcript
-            active_jobs[job_id]['story'] = burmese_story
-            
-            logger.info(f"✅ Transcript and voice generation completed for job {job_id}")
+        finally:
+            # A follower that already opened the partial keeps reading it
+            if os.path.exists(f"{story_path}.part"):
+                os.remove(f"{story_path}.part")
+        if transcript_cancelled(job_id):
+            return
+        
+        # Step 4: Generate voice (100%)
+        active_jobs[job_id]['progress'] = 90
+        logger.info(f"Step 4: Generating Burmese voice")
+        
+        voice_path = os.path.join(app.config['VOICE_FOLDER'], f"{job_id}.mp3")
+        success = await generate_burmese_voice(burmese_story, voice_path)
+        
+        if not success:
+            active_jobs[job_id]['error'] = 'Failed to generate voice'
+            active_jobs[job_id]['status'] = 'error'
+            return
+        if transcript_cancelled(job_id):
+            return
         
-        # Run the async process
-        asyncio.run(run_full_process())
+        # Complete
+        active_jobs[job_id]['voice_path'] = voice_path
+        active_jobs[job_id]['progress'] = 100
+        active_jobs[job_id]['status'] = 'completed'
         
+        logger.info(f"✅ Transcript and voice generation completed for job {job_id}")
+
     except Exception as e:
         logger.error(f"Transcript/Voice processing error: {e}")
         if job_id in active_jobs:
-            active_jobs[job_id]['status'] = 'error'
             active_jobs[job_id]['error'] = str(e)
+            active_jobs[job_id]['status'] = 'error'
+    finally:
+        active_tasks.pop(job_id, None)
 
 def get_output_parameters(quality):
     """Get output parameters based on quality setting"""
@@ -688,6 +1037,13 @@ def get_output_parameters(quality):
 
 # ==================== VIDEO PROCESSING ====================
 
+# Fragmented MP4: the moov box is written up front and media follows in
+# ~2 second fragments, so the file is playable while it is still growing.
+FRAGMENTED_MP4_PARAMS = [
+    '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+    '-force_key_frames', 'expr:gte(t,n_forced*2)',
+]
+
 def process_video_task(job_id, input_path, options, user_id):
     """Simple background video processing task"""
     try:
@@ -718,8 +1074,8 @@ def process_video_task(job_id, input_path, options, user_id):
             # Check if task was cancelled - check more frequently
             if job_id in active_tasks and active_tasks[job_id].get('cancelled'):
                 logger.info(f"Job {job_id} cancelled during processing")
-                active_jobs[job_id]['status'] = 'cancelled'
                 active_jobs[job_id]['error'] = 'Job cancelled by user'
+                active_jobs[job_id]['status'] = 'cancelled'
                 video.close()
                 return
             
@@ -860,6 +1216,9 @@ def process_video_task(job_id, input_path, options, user_id):
         
         params = get_output_parameters(output_quality)
         
+        # Readable through /stream/<job_id> while the render is still running
+        active_jobs[job_id]['render_path'] = output_path
+        
         # Update progress during final render
         def render_progress_callback(progress):
             active_jobs[job_id]['progress'] = 95 + int(progress * 0.05)  # 95-100% for final render
@@ -870,8 +1229,9 @@ def process_video_task(job_id, input_path, options, user_id):
             bitrate=params['bitrate'],
             preset=params['preset'],
             audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
+            temp_audiofile=os.path.join(app.config['OUTPUT_FOLDER'], f"{job_id}_temp-audio.m4a"),
             remove_temp=True,
+            ffmpeg_params=FRAGMENTED_MP4_PARAMS,
             verbose=False,
             logger='bar'
         )
@@ -883,17 +1243,14 @@ def process_video_task(job_id, input_path, options, user_id):
         
         processing_time = time.time() - active_jobs[job_id]['start_time']
         
-        active_jobs[job_id]['status'] = 'completed'
-        active_jobs[job_id]['progress'] = 100
         active_jobs[job_id]['output_file'] = output_filename
         active_jobs[job_id]['output_path'] = output_path
+        active_jobs[job_id]['progress'] = 100
+        active_jobs[job_id]['type'] = 'video'
+        active_jobs[job_id]['status'] = 'completed'
         
-        conn = sqlite3.connect('/app/data/users.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO jobs (id, user_id, filename, type, status, created_at, output_path) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                 (job_id, user_id, os.path.basename(input_path), 'video', 'completed', datetime.now(), output_path))
-        conn.commit()
-        conn.close()
+        # Keeps the job's original created_at so pagination stays ordered
+        active_jobs.persist(job_id)
         
         logger.info(f"Video job {job_id} completed in {processing_time:.1f} seconds")
         
@@ -901,8 +1258,8 @@ def process_video_task(job_id, input_path, options, user_id):
         logger.error(f"Error in video job {job_id}: {str(e)}")
         logger.error(traceback.format_exc())
         
-        active_jobs[job_id]['status'] = 'error'
         active_jobs[job_id]['error'] = str(e)
+        active_jobs[job_id]['status'] = 'error'
         
         # Clean up task tracking
         if job_id in active_tasks:
@@ -927,34 +1284,41 @@ def generate_voice():
         if len(text) > 5000:
             return jsonify({'error': 'Text too long (max 5000 characters)'}), 400
         
-        job_id = str(uuid.uuid4())
-        
-        # Generate voice using gTTS
-        logger.info(f"Generating voice for text: {text[:50]}...")
-        
-        # For Myanmar, use 'my' language code
-        tts = gTTS(text=text, lang='my', slow=False)
-        
-        audio_filename = f"{job_id}_voice.mp3"
-        audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_filename)
-        tts.save(audio_path)
-        
-        logger.info(f"Voice saved to: {audio_path}")
+        voice_id = str(uuid.uuid4())
+        audio_filename = f"{voice_id}_voice.mp3"
+        engine = voice_engine(language, voice_type)
+        
+        # The whole text is a cache entry of its own once every sentence was
+        # synthesised before; /audio serves it straight from the cache
+        text_key = tts_cache.key(engine, text)
+        cached_path = tts_cache.cached_path(text_key)
+        if cached_path is None:
+            cached = voice_synthesizer.cached_audio(text, engine)
+            if cached:
+                tts_cache.put(text_key, cached)
+                cached_path = tts_cache.path(text_key)
+        if cached_path:
+            logger.info(f"Voice {voice_id} served from the TTS cache")
+            audio_filename = os.path.basename(cached_path)
+            audio_url = f"/audio/{audio_filename}"
+        else:
+            # Synthesis runs in the background whether or not anyone listens; the
+            # stream URL follows the file as sentences are appended to it
+            logger.info(f"Started voice {voice_id} for text: {text[:50]}...")
+            start_voice_synthesis(voice_id, current_user.id, text, engine,
+                                  os.path.join(app.config['AUDIO_FOLDER'], audio_filename))
+            audio_url = url_for('stream_voice', voice_id=voice_id)
         
         # Save transcript to database
         transcript_id = str(uuid.uuid4())
-        conn = sqlite3.connect('/app/data/users.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO transcripts (id, user_id, filename, content, language, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                 (transcript_id, current_user.id, 'YouTube Transcript', text, 'my', datetime.now()))
-        conn.commit()
-        conn.close()
+        db.execute("INSERT INTO transcripts (id, user_id, filename, content, language, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                  (transcript_id, current_user.id, 'YouTube Transcript', text, 'my', datetime.now()))
         
         return jsonify({
-            'job_id': job_id,
-            'voice_id': str(uuid.uuid4()),
+            'job_id': voice_id,
             'voice_id': voice_id,
-            'audio_url': f"/audio/{os.path.basename(audio_path)}",
+            'audio_url': audio_url,
+            'download_url': f"/audio/{audio_filename}",
             'text': text[:100] + ('...' if len(text) > 100 else ''),
             'language': language
         })
@@ -963,13 +1327,67 @@ def generate_voice():
         logger.error(f"Voice generation error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def voice_engine(language, voice_type):
+    """TTS engine for a /voice request"""
+    if app.config['VOICE_TTS_BACKEND'] == 'edge':
+        voice = app.config['EDGE_VOICES'].get(voice_type, app.config['TTS_VOICE'])
+    else:
+        voice = language
+    return create_engine(app.config['VOICE_TTS_BACKEND'], voice)
+
+def start_voice_synthesis(voice_id, user_id, text, engine, audio_path):
+    """Synthesise a /voice request on the async runtime, appending to a .part file"""
+    task = {'user_id': user_id, 'partial_path': f"{audio_path}.part"}
+    voice_tasks[voice_id] = task
+    
+    def finished(future):
+        voice_tasks.pop(voice_id, None)
+        if not future.cancelled() and future.exception():
+            logger.error(f"Voice synthesis error for {voice_id}: {future.exception()}")
+    
+    task['future'] = async_runtime.submit(
+        voice_synthesizer.save(text, audio_path, engine, partial_path=task['partial_path']))
+    task['future'].add_done_callback(finished)
+    return task
+
+@app.route('/voice/<voice_id>/stream')
+@login_required
+def stream_voice(voice_id):
+    """Stream a voice as MP3 while it is being synthesised"""
+    audio_path = os.path.join(app.config['AUDIO_FOLDER'], f"{voice_id}_voice.mp3")
+    task = voice_tasks.get(voice_id)
+    if not task or task['user_id'] != current_user.id or os.path.exists(audio_path):
+        response = media.send(audio_path, mimetype='audio/mpeg')
+        if response:
+            return response
+        return jsonify({'error': 'Audio not found'}), 404
+    
+    def generate():
+        sent = False
+        for data in follow_file(task['partial_path'], lambda: not task['future'].done(), poll_interval=0.1):
+            sent = True
+            yield data
+        if not sent and os.path.exists(audio_path):
+            # Finished between the check above and opening the partial file
+            with open(audio_path, 'rb') as f:
+                yield from iter(lambda: f.read(64 * 1024), b'')
+    
+    return Response(generate(), mimetype='audio/mpeg', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/audio/<filename>')
 @login_required
 def get_audio(filename):
     """Get generated audio file"""
     audio_path = os.path.join(app.config['AUDIO_FOLDER'], filename)
-    if os.path.exists(audio_path):
-        return send_file(audio_path, mimetype='audio/mpeg')
+    if not os.path.exists(audio_path) and TTS_CACHE_FILE_RE.match(filename):
+        # Content-addressed /voice results are served from the TTS cache itself
+        audio_path = os.path.join(app.config['TTS_CACHE_FOLDER'], filename)
+    response = media.send(audio_path, mimetype='audio/mpeg')
+    if response:
+        return response
     return jsonify({'error': 'Audio not found'}), 404
 
 # ==================== TRANSCRIPT HISTORY ====================
@@ -978,12 +1396,8 @@ def get_audio(filename):
 @login_required
 def list_transcripts():
     """List user's transcripts"""
-    conn = sqlite3.connect('/app/data/users.db')
-    c = conn.cursor()
-    c.execute("SELECT id, filename, content, language, created_at FROM transcripts WHERE user_id = ? ORDER BY created_at DESC LIMIT 20",
-              (current_user.id,))
-    transcripts = c.fetchall()
-    conn.close()
+    transcripts = db.query("SELECT id, filename, content, language, created_at FROM transcripts WHERE user_id = ? ORDER BY created_at DESC LIMIT 20",
+                           (current_user.id,))
     
     return jsonify([{
         'id': t[0],
@@ -997,12 +1411,8 @@ def list_transcripts():
 @login_required
 def get_transcript(transcript_id):
     """Get full transcript"""
-    conn = sqlite3.connect('/app/data/users.db')
-    c = conn.cursor()
-    c.execute("SELECT content FROM transcripts WHERE id = ? AND user_id = ?",
-              (transcript_id, current_user.id))
-    transcript = c.fetchone()
-    conn.close()
+    transcript = db.query_one("SELECT content FROM transcripts WHERE id = ? AND user_id = ?",
+                              (transcript_id, current_user.id))
     
     if transcript:
         return jsonify({'content': transcript[0]})
@@ -1014,12 +1424,8 @@ def get_transcript(transcript_id):
 @login_required
 def list_voices():
     """List user's generated voices"""
-    conn = sqlite3.connect('/app/data/users.db')
-    c = conn.cursor()
-    c.execute("SELECT id, text, language, created_at FROM voices WHERE user_id = ? ORDER BY created_at DESC LIMIT 20",
-              (current_user.id,))
-    voices = c.fetchall()
-    conn.close()
+    voices = db.query("SELECT id, text, language, created_at FROM voices WHERE user_id = ? ORDER BY created_at DESC LIMIT 20",
+                      (current_user.id,))
     
     return jsonify([{
         'id': v[0],
@@ -1041,8 +1447,13 @@ def cancel_task(task_id):
             
             # Update job status
             if task_id in active_jobs:
-                active_jobs[task_id]['status'] = 'cancelled'
                 active_jobs[task_id]['error'] = 'Job cancelled by user'
+                active_jobs[task_id]['status'] = 'cancelled'
+            
+            # Queued jobs that have not started yet are dropped outright
+            future = active_tasks[task_id].get('future')
+            if future:
+                future.cancel()
             
             # Try to stop the thread (Python threads can't be forcefully killed)
             thread = active_tasks[task_id].get('thread')
@@ -1128,6 +1539,9 @@ def upload_file():
             'type': 'video'
         }
         
+        # Build the preview proxy alongside the edit
+        preview_packager.submit(job_id, file_path)
+        
         return jsonify({
             'message': 'Upload successful',
             'job_id': job_id,
@@ -1233,30 +1647,81 @@ def upload_file():
         logger.error(f"Upload error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def job_status_payload(job_id, job):
+    """Client-visible status of a job"""
+    response = {
+        'status': job['status'],
+        'progress': job.get('progress', 0),
+        'filename': job.get('filename')
+    }
+    
+    if job['status'] == 'completed':
+        response['output_url'] = f"/download/{job_id}"
+        # Add file size information
+        if 'output_path' in job and os.path.exists(job['output_path']):
+            response['file_size'] = os.path.getsize(job['output_path'])
+    elif job['status'] == 'error':
+        response['error'] = job.get('error', 'Unknown error')
+    
+    if 'preview_playlist' in job:
+        response['preview_hls'] = f"/preview/{job_id}/hls/index.m3u8"
+    if job['status'] == 'processing' and 'render_path' in job:
+        response['stream_url'] = f"/stream/{job_id}"
+    
+    return response
+
+def not_modified(etag):
+    """Return a 304 response if the client already holds this ETag"""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
 @app.route('/status/<job_id>')
 @login_required
 def get_status(job_id):
     """Get job status"""
-    if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
-        job = active_jobs[job_id]
-        response = {
-            'status': job['status'],
-            'progress': job['progress'],
-            'filename': job['filename']
-        }
-        
-        if job['status'] == 'completed':
-            response['output_url'] = f"/download/{job_id}"
-            # Add file size information
-            if 'output_path' in job and os.path.exists(job['output_path']):
-                response['file_size'] = os.path.getsize(job['output_path'])
-        elif job['status'] == 'error':
-            response['error'] = job.get('error', 'Unknown error')
-        
-        return jsonify(response)
+    job = active_jobs.get(job_id)
+    if job and job['user_id'] == current_user.id:
+        etag = job.etag()
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        response = jsonify(job_status_payload(job_id, job))
+        response.set_etag(etag, weak=True)
+        return response
     
     return jsonify({'error': 'Job not found or access denied'}), 404
 
+@app.route('/status')
+@login_required
+def get_status_batch():
+    """Get the status of several jobs at once: /status?ids=a,b,c"""
+    ids = [i for i in request.args.get('ids', '').split(',') if i][:100]
+    if not ids:
+        return jsonify({'error': 'No job ids provided'}), 400
+    
+    jobs = {}
+    for job_id in dict.fromkeys(ids):
+        job = active_jobs.get(job_id)
+        jobs[job_id] = job if job and job['user_id'] == current_user.id else None
+    
+    etag = 'batch-' + format(zlib.crc32(','.join(
+        job.etag() if job else f"{job_id}-missing" for job_id, job in jobs.items()
+    ).encode()), '08x')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    response = jsonify({
+        job_id: job_status_payload(job_id, job) if job else {'error': 'Job not found or access denied'}
+        for job_id, job in jobs.items()
+    })
+    response.set_etag(etag, weak=True)
+    return response
+
 @app.route('/download/<job_id>')
 @login_required
 def download_file(job_id):
@@ -1264,42 +1729,109 @@ def download_file(job_id):
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
         if job['status'] == 'completed' and os.path.exists(job['output_path']):
-            return send_file(
+            response = media.send(
                 job['output_path'],
                 as_attachment=True,
                 download_name=f"edited_{job['filename']}",
                 mimetype='video/mp4'
             )
+            if response:
+                return response
     
     return jsonify({'error': 'File not ready'}), 404
 
+@app.route('/stream/<job_id>')
+@login_required
+def stream_render(job_id):
+    """Progressive download of a render, including the part encoded so far"""
+    job = active_jobs.get(job_id)
+    if not job or job['user_id'] != current_user.id:
+        return jsonify({'error': 'Job not found or access denied'}), 404
+    
+    if job['status'] == 'completed' and 'output_path' in job:
+        response = media.send(job['output_path'], mimetype='video/mp4')
+        if response:
+            return response
+    
+    if job['status'] in ('queued', 'processing') and 'render_path' in job:
+        # Follow the fragmented MP4 as the encoder appends to it
+        return Response(
+            follow_file(job['render_path'], lambda: job.get('status') in ('queued', 'processing')),
+            mimetype='video/mp4',
+            headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}
+        )
+    
+    return jsonify({'error': 'Render not started'}), 404
+
 @app.route('/jobs')
 @login_required
 def list_jobs():
-    """List user's jobs"""
+    """List user's jobs, newest first
+    
+    Query params: limit (default 10, max 50), cursor (from the X-Next-Cursor
+    header of the previous page) and status (comma-separated filter).
+    """
     try:
-        logger.info(f"Jobs list requested by user {current_user.id}")
-        user_jobs = []
-        for job_id, job in active_jobs.items():
-            if job['user_id'] == current_user.id:
-                user_jobs.append({
-                    'id': job_id,
-                    'filename': job.get('filename', 'Unknown'),
-                    'status': job.get('status', 'unknown'),
-                    'progress': job.get('progress', 0),
-                    'created_at': datetime.fromtimestamp(job.get('created_at', time.time())).strftime('%H:%M:%S')
-                })
-        
-        # Sort by newest first
-        user_jobs.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        # Return only last 10 jobs
-        return jsonify(user_jobs[:10])
+        # Changes to any of the user's jobs change the tag; the query picks the page
+        etag = active_jobs.user_etag(current_user.id) + '-' + format(zlib.crc32(request.query_string), '08x')
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+        cursor = request.args.get('cursor')
+        status = request.args.get('status')
+        statuses = [s for s in status.split(',') if s] if status else None
+        
+        jobs, next_cursor = active_jobs.page_user_jobs(current_user.id, limit, cursor, statuses)
+        user_jobs = [{
+            'id': job.id,
+            'filename': job.get('filename', 'Unknown'),
+            'status': job.get('status', 'unknown'),
+            'progress': job.get('progress', 0),
+            'created_at': datetime.fromtimestamp(job.created_at).strftime('%H:%M:%S')
+        } for job in jobs]
         
+        response = jsonify(user_jobs)
+        response.set_etag(etag, weak=True)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in list_jobs: {str(e)}")
         return jsonify([])  # Return empty array on error
 
+@app.route('/events')
+@login_required
+def job_event_stream():
+    """Server-Sent Events stream of the current user's job changes"""
+    user_id = current_user.id
+    subscription = job_events.subscribe(user_id)
+    jobs, _ = active_jobs.page_user_jobs(user_id, limit=10)
+    
+    def generate():
+        try:
+            # Initial snapshot so the client does not need a separate /jobs call
+            yield "retry: 3000\n\n"
+            for job in reversed(jobs):
+                yield format_sse(job_event(job), event='job')
+            while not subscription.closed:
+                events = subscription.drain(timeout=15)
+                if not events:
+                    yield ": keep-alive\n\n"
+                for event in events:
+                    yield format_sse(event, event='job')
+        finally:
+            job_events.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # let nginx pass events through unbuffered
+    })
+
 @app.route('/jobs/dummy')
 def dummy_jobs():
     """Dummy jobs endpoint - returns empty list to stop 404 errors"""
@@ -1325,12 +1857,8 @@ def register():
         hashed_password = generate_password_hash(password)
         
         try:
-            conn = sqlite3.connect('/app/data/users.db')
-            c = conn.cursor()
-            c.execute("INSERT INTO users (username, password, email, created_at) VALUES (?, ?, ?, ?)",
-                     (username, hashed_password, email, datetime.now()))
-            conn.commit()
-            conn.close()
+            db.execute("INSERT INTO users (username, password, email, created_at) VALUES (?, ?, ?, ?)",
+                      (username, hashed_password, email, datetime.now()))
             return jsonify({'message': 'User created successfully'})
         except sqlite3.IntegrityError:
             return jsonify({'error': 'Username already exists'}), 400
@@ -1344,11 +1872,7 @@ def login():
         username = request.form.get('username')
         password = request.form.get('password')
         
-        conn = sqlite3.connect('/app/data/users.db')
-        c = conn.cursor()
-        c.execute("SELECT * FROM users WHERE username = ?", (username,))
-        user = c.fetchone()
-        conn.close()
+        user = db.query_one("SELECT * FROM users WHERE username = ?", (username,))
         
         if user and check_password_hash(user[2], password):
             user_obj = User(user[0], user[1], user[3])
@@ -1363,6 +1887,7 @@ def login():
 @login_required
 def logout():
     """User logout"""
+    invalidate_user(current_user.id)
     logout_user()
     return jsonify({'message': 'Logged out successfully'})
 
@@ -1385,7 +1910,15 @@ def health_check():
         'moviepy_loaded': 'moviepy' in sys.modules,
         'pillow_loaded': 'PIL' in sys.modules,
         'whisper_loaded': 'whisper' in sys.modules,
-        'gtts_loaded': 'gtts' in sys.modules
+        'gtts_loaded': 'gtts' in sys.modules,
+        'models': model_manager.status(),
+        'whisper_batches': whisper_batcher.stats(),
+        'llm_cache': llm_client.stats() if llm_client else None,
+        'tts_cache': tts_cache.stats(),
+        'model_memory_mb': {
+            'resident': model_manager.resident_mb(),
+            'budget': model_manager.memory_budget_mb
+        }
     })
 
 @app.errorhandler(413)
@@ -1402,6 +1935,62 @@ except ImportError as e:
     print(f"❌ TTS import error: {e}")
     print("Please install TTS: pip install TTS")
 
+# Speaker conditioning is computed once per uploaded sample and reused by ID
+speaker_store = SpeakerStore(db, os.path.join(app.config['AUDIO_FOLDER'], 'speakers'),
+                             model=app.config['XTTS_MODEL'])
+
+def clone_with_speaker(text, output_path, speaker_id=None, sample_path=None, sample_name=None):
+    """Speak text in a saved voice, first saving sample_path as a profile if no speaker_id is given
+
+    Returns the speaker ID, or None if the speaker does not exist.
+    """
+    with model_manager.use('xtts') as tts:
+        if not speaker_id:
+            speaker_id = speaker_store.create(tts, current_user.id, sample_path, name=sample_name)
+        speaker = speaker_store.get(speaker_id, current_user.id)
+        if not speaker:
+            return None
+        speaker_store.synthesize(tts, speaker, text, "my", output_path)  # Myanmar language
+    return speaker_id
+
+@app.route('/speakers', methods=['GET'])
+@login_required
+def list_speakers():
+    """List the user's saved voice samples"""
+    return jsonify(speaker_store.for_user(current_user.id))
+
+@app.route('/speakers', methods=['POST'])
+@login_required
+def create_speaker():
+    """Save a voice sample as a reusable speaker profile"""
+    try:
+        if 'audio' not in request.files:
+            return jsonify({'error': 'No audio file provided'}), 400
+        audio_file = request.files['audio']
+        if not allowed_file(audio_file.filename):
+            return jsonify({'error': 'Invalid audio file type'}), 400
+        
+        sample_path = os.path.join(app.config['AUDIO_FOLDER'], f"{uuid.uuid4()}_sample.wav")
+        audio_file.save(sample_path)
+        try:
+            with model_manager.use('xtts') as tts:
+                speaker_id = speaker_store.create(tts, current_user.id, sample_path,
+                                                  name=request.form.get('name') or audio_file.filename)
+        finally:
+            os.remove(sample_path)
+        return jsonify({'speaker_id': speaker_id})
+    except Exception as e:
+        logger.error(f"Speaker profile error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/speakers/<speaker_id>', methods=['DELETE'])
+@login_required
+def delete_speaker(speaker_id):
+    """Delete a saved voice sample"""
+    if speaker_store.delete(speaker_id, current_user.id):
+        return jsonify({'success': True})
+    return jsonify({'error': 'Speaker not found'}), 404
+
 @app.route('/voice-clone', methods=['POST'])
 @login_required
 def clone_voice():
@@ -1409,53 +1998,51 @@ def clone_voice():
     try:
         logger.info(f"Voice clone request from user {current_user.id}")
         
-        if 'audio' not in request.files:
+        # A saved speaker_id skips the upload and the conditioning step
+        speaker_id = request.form.get('speaker_id')
+        if not speaker_id and 'audio' not in request.files:
             return jsonify({'error': 'No audio file provided'}), 400
         
         text = request.form.get('text', '')
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        audio_file = request.files['audio']
-        if not allowed_file(audio_file.filename):
-            return jsonify({'error': 'Invalid audio file type'}), 400
-        
         job_id = str(uuid.uuid4())
         
         # Save uploaded audio sample
-        sample_filename = f"{job_id}_sample.wav"
-        sample_path = os.path.join(app.config['AUDIO_FOLDER'], sample_filename)
-        audio_file.save(sample_path)
-        
-        # Initialize TTS with voice cloning
-        tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=False)
-        
-        # Generate cloned voice
+        sample_path = None
+        sample_name = None
+        if not speaker_id:
+            audio_file = request.files['audio']
+            if not allowed_file(audio_file.filename):
+                return jsonify({'error': 'Invalid audio file type'}), 400
+            sample_name = audio_file.filename
+            sample_filename = f"{job_id}_sample.wav"
+            sample_path = os.path.join(app.config['AUDIO_FOLDER'], sample_filename)
+            audio_file.save(sample_path)
+        
+        # Generate cloned voice with the resident XTTS model
         output_filename = f"{job_id}_cloned.wav"
         output_path = os.path.join(app.config['AUDIO_FOLDER'], output_filename)
         
-        tts.tts_to_file(
-            text=text,
-            speaker_wav=sample_path,
-            language="my",  # Myanmar language
-            file_path=output_path
-        )
+        try:
+            speaker_id = clone_with_speaker(text, output_path, speaker_id, sample_path, sample_name)
+        finally:
+            # Cleanup sample file; the profile keeps its own copy
+            if sample_path and os.path.exists(sample_path):
+                os.remove(sample_path)
+        if not speaker_id:
+            return jsonify({'error': 'Speaker not found'}), 404
         
         # Save to database
         voice_id = str(uuid.uuid4())
-        conn = sqlite3.connect('/app/data/users.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO voices (id, user_id, text, audio_path, language, created_at) VALUES (?, ?, ?, ?, ?, ?)",
-                 (voice_id, current_user.id, text[:100], output_path, 'my', datetime.now()))
-        conn.commit()
-        conn.close()
-        
-        # Cleanup sample file
-        os.remove(sample_path)
+        db.execute("INSERT INTO voices (id, user_id, text, audio_path, language, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                  (voice_id, current_user.id, text[:100], output_path, 'my', datetime.now()))
         
         return jsonify({
             'job_id': job_id,
             'voice_id': voice_id,
+            'speaker_id': speaker_id,
             'audio_url': f"/audio/{output_filename}",
             'text': text[:100] + ('...' if len(text) > 100 else '')
         })
@@ -1657,19 +2244,16 @@ def run_download_task_v2(job_id, cmd, output_path, file_type, user_id, url):
                 else:
                     raise Exception("Downloaded file not found")
             
-            # Save to database
-            conn = sqlite3.connect('/app/data/users.db')
-            c = conn.cursor()
-            c.execute("""INSERT INTO jobs 
-                       (id, user_id, filename, type, status, created_at, output_path) 
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                     (job_id, user_id, os.path.basename(url), 'download', 'completed', datetime.now(), final_path))
-            conn.commit()
-            conn.close()
-            
-            active_jobs[job_id]['status'] = 'completed'
-            active_jobs[job_id]['progress'] = 100
             active_jobs[job_id]['output_file'] = os.path.basename(final_path)
+            active_jobs[job_id]['output_path'] = final_path
+            active_jobs[job_id]['progress'] = 100
+            active_jobs[job_id]['status'] = 'completed'
+            
+            # Save to database, keeping the job's original created_at
+            active_jobs.persist(job_id)
+            
+            # Preview proxy for the downloaded media
+            preview_packager.submit(job_id, final_path)
             
         else:
             error_msg = result.stderr
@@ -1678,8 +2262,8 @@ def run_download_task_v2(job_id, cmd, output_path, file_type, user_id, url):
     except Exception as e:
         logger.error(f"Download task error: {str(e)}")
         if job_id in active_jobs:
-            active_jobs[job_id]['status'] = 'error'
             active_jobs[job_id]['error'] = str(e)
+            active_jobs[job_id]['status'] = 'error'
 
 
 @app.route('/download-file/<job_id>')
@@ -1689,11 +2273,13 @@ def download_file_by_id(job_id):
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
         if job['status'] == 'completed' and os.path.exists(job['output_path']):
-            return send_file(
+            response = media.send(
                 job['output_path'],
                 as_attachment=True,
                 download_name=f"downloaded_{os.path.basename(job['output_path'])}"
             )
+            if response:
+                return response
     return jsonify({'error': 'File not ready'}), 404
 
 @app.route('/preview-file/<job_id>')
@@ -1702,12 +2288,16 @@ def preview_file(job_id):
     """Preview downloaded file (streaming for video/audio)"""
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
+        if request.args.get('format') == 'hls' and 'preview_playlist' in job:
+            return redirect(url_for('get_preview_hls', job_id=job_id, name='index.m3u8'))
         if job['status'] == 'completed' and os.path.exists(job['output_path']):
-            return send_file(
+            response = media.send(
                 job['output_path'],
                 as_attachment=False,
                 mimetype='video/mp4' if job['output_path'].endswith('.mp4') else 'audio/mpeg'
             )
+            if response:
+                return response
     return jsonify({'error': 'File not ready'}), 404
 
 @app.route('/url-info', methods=['POST'])
@@ -1745,14 +2335,31 @@ def get_url_info():
 @app.route('/preview/<job_id>')
 @login_required
 def get_preview(job_id):
-    """Get video preview"""
+    """Get video preview (?format=hls redirects to the proxy playlist when ready)"""
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
+        if request.args.get('format') == 'hls' and 'preview_playlist' in job:
+            return redirect(url_for('get_preview_hls', job_id=job_id, name='index.m3u8'))
         if 'input_path' in job and os.path.exists(job['input_path']):
-            return send_file(
+            response = media.send(
                 job['input_path'],
                 mimetype='video/mp4'
             )
+            if response:
+                return response
+    return jsonify({'error': 'Preview not available'}), 404
+
+@app.route('/preview/<job_id>/hls/<name>')
+@login_required
+def get_preview_hls(job_id, name):
+    """HLS playlist and segments of the low-bitrate preview proxy"""
+    job = active_jobs.get(job_id)
+    mimetype = segment_mimetype(name)
+    if job and job['user_id'] == current_user.id and 'preview_playlist' in job and mimetype:
+        path = os.path.join(os.path.dirname(job['preview_playlist']), secure_filename(name))
+        response = media.send(path, mimetype=mimetype)
+        if response:
+            return response
     return jsonify({'error': 'Preview not available'}), 404
 
 @app.route('/preview-upload', methods=['POST'])
@@ -1786,6 +2393,7 @@ def preview_upload():
             'input_path': temp_path,
             'created_at': time.time()
         }
+        preview_packager.submit(preview_id, temp_path)
         
         return jsonify({
             'message': 'Preview uploaded successfully',
@@ -1807,17 +2415,10 @@ def test_transcript():
 @app.route('/transcript', methods=['POST'])
 @login_required
 def create_transcript():
-    """Transcript Generator input Youtube url generate stranscript to Myanmar Language"""
+    """Queue a Myanmar transcript job for a YouTube URL and return its job id"""
     try:
-        logger.info(f"=== TRANSCRIPT ROUTE CALLED ===")
-        logger.info(f"Request method: {request.method}")
-        logger.info(f"Request headers: {dict(request.headers)}")
-        
-        data = request.get_json()
-        logger.info(f"Request data: {data}")
-        
+        data = request.get_json(silent=True) or {}
         youtube_url = data.get('url')
-        logger.info(f"YouTube URL extracted: {youtube_url}")
         
         if not youtube_url:
             logger.error("No YouTube URL provided")
@@ -1830,47 +2431,27 @@ def create_transcript():
         
         logger.info(f"Transcript generation from YouTube URL: {youtube_url}")
         
-        # Download audio
-        audio_path = os.path.join(app.config['AUDIO_FOLDER'], f"temp_{current_user.id}.mp3")
-        success = asyncio.run(download_youtube_audio(youtube_url, audio_path))
-        
-        if not success:
-            logger.error("Failed to download audio")
-            return jsonify({'error': 'Failed to download audio'}), 500
-        
-        # Transcribe audio
-        logger.info("Transcribing audio to Myanmar...")
-        transcript = asyncio.run(transcribe_audio(audio_path))
-        
-        if not transcript:
-            logger.error("Failed to transcribe audio")
-            return jsonify({'error': 'Failed to transcribe audio'}), 500
-        
-        # Generate Myanmar story using Gemini 1.5 Pro
-        logger.info("Generating Myanmar story with Gemini...")
-        
-        if not GEMINI_AVAILABLE:
-            logger.error("Gemini AI not available")
-            return jsonify({'error': 'Gemini AI not available'}), 500
-        
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        prompt = f"Explain this video in Burmese as a storyteller (NotebookLM style). Use natural, warm, and friendly spoken Burmese.\n\nOriginal transcript:\n{transcript}"
-        
-        response = model.generate_content(prompt)
-        generated_text = response.text
-        
-        logger.info(f"Generated text length: {len(generated_text)}")
+        job_id = str(uuid.uuid4())
+        active_jobs[job_id] = {
+            'id': job_id,
+            'user_id': current_user.id,
+            'filename': f"Transcript from {youtube_url[:30]}...",
+            'status': 'queued',
+            'progress': 0,
+            'type': 'transcript',
+            'created_at': time.time()
+        }
         
-        # Clean up temp audio file
-        try:
-            os.remove(audio_path)
-        except:
-            pass
+        # Download, Whisper and Gemini run on the shared event loop, not this request;
+        # cancel_task sets the flag and the pipeline stops at its next step
+        active_tasks[job_id] = {'cancelled': False, 'type': 'transcript'}
+        async_runtime.submit(process_transcript_and_voice(job_id, youtube_url, current_user.id))
         
-        # Return Myanmar transcript immediately
-        result = {"transcript": generated_text}
-        logger.info(f"Returning result: {result}")
-        return jsonify(result)
+        return jsonify({
+            'job_id': job_id,
+            'status_url': url_for('get_transcript_status', job_id=job_id),
+            'message': 'Transcript job queued'
+        }), 202
         
     except Exception as e:
         logger.error(f"Transcript generation error: {str(e)}")
@@ -1883,30 +2464,69 @@ def get_transcript_status(job_id):
     """Get transcript job status"""
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
+        # Partial segments while Whisper is still running; ?since=N skips those already seen
+        segments = job.get('segments') or []
+        since = request.args.get('since', 0, type=int)
         return jsonify({
             'status': job['status'],
             'progress': job.get('progress', 0),
             'error': job.get('error'),
             'transcript': job.get('transcript'),
             'story': job.get('story'),
+            'segments': segments[since:],
+            'segment_count': len(segments),
             'voice_available': job.get('status') == 'completed'
         })
     else:
         return jsonify({'error': 'Job not found'}), 404
 
+@app.route('/transcript/<job_id>/story/stream')
+@login_required
+def stream_transcript_story(job_id):
+    """Server-Sent Events stream of the story text while the LLM writes it"""
+    job = active_jobs.get(job_id)
+    if not job or job['user_id'] != current_user.id:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    partial_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}_story.txt.part")
+    
+    def still_writing():
+        return 'story_path' not in job and job.get('status') in ('queued', 'processing')
+    
+    def generate():
+        yield "retry: 3000\n\n"
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for data in follow_file(partial_path, still_writing, poll_interval=0.2):
+            text = decoder.decode(data)
+            if text:
+                yield format_sse({'text': text}, event='delta')
+        if job.get('status') in ('error', 'cancelled'):
+            yield format_sse({'status': job.get('status'), 'error': job.get('error')}, event='error')
+            return
+        # The saved story may differ from what was streamed (e.g. an error message)
+        yield format_sse({'status': job.get('status'), 'story': job.get('story')}, event='done')
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/transcript/<job_id>/voice')
 @login_required
 def get_transcript_voice(job_id):
     """Download generated voice file"""
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
+        response = None
         if job['status'] == 'completed' and 'voice_path' in job:
-            return send_file(
+            response = media.send(
                 job['voice_path'],
                 as_attachment=True,
                 download_name=f"transcript_voice_{job_id}.mp3",
                 mimetype='audio/mpeg'
             )
+        if response:
+            return response
         else:
             return jsonify({'error': 'Voice not ready'}), 404
     else:
@@ -1919,28 +2539,28 @@ def download_transcript_files(job_id):
     if job_id in active_jobs and active_jobs[job_id]['user_id'] == current_user.id:
         job = active_jobs[job_id]
         if job['status'] == 'completed':
-            import zipfile
-            import io
+            download_name = f"transcript_package_{job_id}.zip"
             
-            # Create ZIP in memory
-            zip_buffer = io.BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                if 'transcript_path' in job and os.path.exists(job['transcript_path']):
-                    zip_file.write(job['transcript_path'], 'transcript.txt')
-                
-                if 'story_path' in job and os.path.exists(job['story_path']):
-                    zip_file.write(job['story_path'], 'burmese_story.txt')
-                
-                if 'voice_path' in job and os.path.exists(job['voice_path']):
-                    zip_file.write(job['voice_path'], 'burmese_voice.mp3')
+            # Repeat downloads are served from the package built the first time
+            package_path = os.path.join(app.config['TRANSCRIPT_FOLDER'], f"{job_id}_package.zip")
+            cached = media.send(package_path, mimetype='application/zip',
+                                as_attachment=True, download_name=download_name)
+            if cached:
+                return cached
             
-            zip_buffer.seek(0)
-            return send_file(
-                zip_buffer,
-                as_attachment=True,
-                download_name=f"transcript_package_{job_id}.zip",
-                mimetype='application/zip'
+            # Stream the ZIP as entries are written; the MP3 is stored, not deflated
+            entries = [
+                (job.get('transcript_path', ''), 'transcript.txt'),
+                (job.get('story_path', ''), 'burmese_story.txt'),
+                (job.get('voice_path', ''), 'burmese_voice.mp3'),
+            ]
+            return Response(
+                tee_to_file(stream_zip(entries), package_path),
+                mimetype='application/zip',
+                headers={
+                    'Content-Disposition': content_disposition(download_name),
+                    'X-Accel-Buffering': 'no'
+                }
             )
         else:
             return jsonify({'error': 'Files not ready'}), 404
@@ -1956,62 +2576,58 @@ def voice_clone_panel():
     try:
         logger.info(f"Voice clone panel request from user {current_user.id}")
         
-        if 'audio' not in request.files:
+        # A saved speaker_id skips the upload and the conditioning step
+        speaker_id = request.form.get('speaker_id')
+        if not speaker_id and 'audio' not in request.files:
             return jsonify({'error': 'No audio file provided'}), 400
         
         text = request.form.get('text', '')
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        audio_file = request.files['audio']
-        
         job_id = str(uuid.uuid4())
         
         # Save uploaded audio sample
-        sample_filename = f"{job_id}_sample.wav"
-        sample_path = os.path.join(app.config['AUDIO_FOLDER'], sample_filename)
-        audio_file.save(sample_path)
+        sample_path = None
+        sample_name = None
+        if not speaker_id:
+            audio_file = request.files['audio']
+            sample_name = audio_file.filename
+            sample_filename = f"{job_id}_sample.wav"
+            sample_path = os.path.join(app.config['AUDIO_FOLDER'], sample_filename)
+            audio_file.save(sample_path)
         
         try:
-            # Initialize TTS with voice cloning
-            tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=False)
-            
-            # Generate cloned voice
+            # Generate cloned voice with the resident XTTS model
             output_filename = f"{job_id}_cloned.wav"
             output_path = os.path.join(app.config['AUDIO_FOLDER'], output_filename)
             
-            tts.tts_to_file(
-                text=text,
-                speaker_wav=sample_path,
-                language="my",
-                file_path=output_path
-            )
+            speaker_id = clone_with_speaker(text, output_path, speaker_id, sample_path, sample_name)
+            if not speaker_id:
+                return jsonify({'error': 'Speaker not found'}), 404
             
             # Save to database
             voice_id = str(uuid.uuid4())
-            conn = sqlite3.connect('/app/data/users.db')
-            c = conn.cursor()
-            c.execute("""INSERT INTO voices 
-                         (id, user_id, text, audio_path, language, created_at) 
-                         VALUES (?, ?, ?, ?, ?, ?)""",
-                     (voice_id, current_user.id, text[:100], output_path, 'my-clone', datetime.now()))
-            conn.commit()
-            conn.close()
+            db.execute("""INSERT INTO voices 
+                          (id, user_id, text, audio_path, language, created_at) 
+                          VALUES (?, ?, ?, ?, ?, ?)""",
+                      (voice_id, current_user.id, text[:100], output_path, 'my-clone', datetime.now()))
             
-            # Cleanup sample file
-            if os.path.exists(sample_path):
+            # Cleanup sample file; the profile keeps its own copy
+            if sample_path and os.path.exists(sample_path):
                 os.remove(sample_path)
             
             return jsonify({
                 'job_id': job_id,
                 'voice_id': voice_id,
+                'speaker_id': speaker_id,
                 'audio_url': f"/audio/{output_filename}",
                 'text': text[:100] + ('...' if len(text) > 100 else '')
             })
             
         except Exception as e:
             # Cleanup on error
-            if os.path.exists(sample_path):
+            if sample_path and os.path.exists(sample_path):
                 os.remove(sample_path)
             raise e
         
@@ -2031,8 +2647,11 @@ def cleanup_old_files():
                 if current_time - job['created_at'] > 3600:  # 1 hour
                     if 'input_path' in job and os.path.exists(job['input_path']):
                         os.remove(job['input_path'])
+                    # Eviction also deletes the HLS rendition
                     del active_jobs[job_id]
                     logger.info(f"Cleaned up preview job {job_id}")
+        # Drop finished jobs past their TTL; they stay reachable through the jobs table
+        active_jobs.evict_expired()
     except Exception as e:
         logger.error(f"Cleanup error: {e}")
 
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Long-lived background asyncio event loop shared by all worker threads
+"""
+
+import asyncio
+import logging
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """Run coroutines from any thread on one persistent event loop
+
+    Network-bound steps (edge-tts, Gemini, yt-dlp) from many jobs overlap on
+    the loop instead of each job building and tearing down its own loop with
+    asyncio.run. Blocking calls go to ``io_executor`` and CPU-heavy ones to
+    ``cpu_executor`` so they never stall the loop.
+    """
+
+    def __init__(self, io_workers: int = 16, cpu_workers: int = 2):
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='async-io')
+        self.cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='async-cpu')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use"""
+        if self._loop is None:
+            self.start()
+        return self._loop
+
+    def start(self):
+        """Start the loop thread if it is not running yet"""
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(self.io_executor)
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name='async-runtime', daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            logger.info("Async runtime event loop started")
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread for its result"""
+        if self._loop is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("AsyncRuntime.run() called from the event loop thread")
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, aiter: AsyncIterator) -> Iterator:
+        """Consume an async iterator on the loop from a blocking thread
+
+        Used for streamed responses; closing the returned generator (client
+        disconnect) closes the async iterator on the loop too.
+        """
+        async def next_item():
+            return await aiter.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield self.run(next_item())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if hasattr(aiter, 'aclose'):
+                self.run(aiter.aclose())
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Await a blocking I/O call in the I/O executor"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.io_executor, functools.partial(func, *args, **kwargs))
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """Await a CPU-bound call in the CPU executor"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.cpu_executor, functools.partial(func, *args, **kwargs))
+
+    def stop(self):
+        """Stop the loop and shut the executors down"""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+        self.io_executor.shutdown(wait=False)
+        self.cpu_executor.shutdown(wait=False)
+
+
+# Global runtime instance
+async_runtime = AsyncRuntime()
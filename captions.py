@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Existing subtitle tracks as transcripts: selection and parsing
+"""
+
+import re
+import html
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Formats we can parse, in order of preference among yt-dlp's track variants
+TEXT_FORMATS = ('vtt', 'srt')
+
+# Model name recorded for caption-based transcripts in the transcript cache
+CAPTIONS_MODEL = 'captions'
+
+# A track with less text than this is treated as unusable
+MIN_CAPTION_CHARS = 20
+
+_TIMING_RE = re.compile(
+    r'(?P<start>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*(?P<end>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})')
+_TAG_RE = re.compile(r'<[^>]*>')
+_SSA_OVERRIDE_RE = re.compile(r'\{\\[^}]*\}')
+
+
+def parse_timestamp(value: str) -> float:
+    """'01:02:03.450', '02:03,450' or '2:03.45' in seconds"""
+    value = value.replace(',', '.')
+    parts = value.split(':')
+    seconds = float(parts[-1])
+    for i, part in enumerate(reversed(parts[:-1]), start=1):
+        seconds += int(part) * 60 ** i
+    return seconds
+
+
+def _clean_line(line: str) -> str:
+    line = _SSA_OVERRIDE_RE.sub('', _TAG_RE.sub('', line))
+    return ' '.join(html.unescape(line).split())
+
+
+def parse_cues(text: str) -> List[Dict[str, Any]]:
+    """Parse WebVTT or SRT text into transcript segments
+
+    Styling tags are stripped. Lines repeated from the previous cue (the
+    rolling layout of auto-generated captions) are dropped, so every line
+    of speech appears once.
+    """
+    segments: List[Dict[str, Any]] = []
+    previous_lines: List[str] = []
+    blocks = re.split(r'\n\s*\n', text.replace('\r\n', '\n').replace('\r', '\n').lstrip('\ufeff'))
+    for block in blocks:
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            match = _TIMING_RE.search(line)
+            if match:
+                break
+        else:
+            continue  # header, NOTE, STYLE or REGION block
+        cue_lines = [_clean_line(l) for l in lines[i + 1:]]
+        cue_lines = [l for l in cue_lines if l]
+        new_lines = [l for l in cue_lines if l not in previous_lines]
+        if cue_lines:
+            previous_lines = cue_lines
+        if not new_lines:
+            continue
+        start, end = parse_timestamp(match.group('start')), parse_timestamp(match.group('end'))
+        segments.append({
+            'id': len(segments),
+            'start': round(start, 2),
+            'end': round(max(end, start), 2),
+            'text': ' '.join(new_lines),
+        })
+    return segments
+
+
+def caption_result(segments: List[Dict[str, Any]], language: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Transcript result in the same shape as Whisper's, None if the track is unusable"""
+    text = ' '.join(s['text'] for s in segments)
+    if len(text) < MIN_CAPTION_CHARS:
+        return None
+    return {'text': text, 'segments': segments, 'language': language, 'source': 'captions'}
+
+
+def parse_caption_file(path: str, language: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Transcript result from a .vtt or .srt file"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return caption_result(parse_cues(f.read()), language)
+
+
+def _base_language(code: Optional[str]) -> str:
+    return (code or '').split('-')[0].lower()
+
+
+def choose_caption_track(info: Dict[str, Any], languages: Iterable[str] = ()) -> Optional[Tuple[str, str, str]]:
+    """Pick a usable subtitle track from yt-dlp metadata: (language, ext, url)
+
+    Uploaded subtitles are preferred over automatic captions. Automatic
+    captions are only used in the video's own language; the other
+    languages YouTube offers are machine translations.
+    """
+    wanted = [_base_language(l) for l in languages if l]
+    original = _base_language(info.get('language'))
+
+    def pick(tracks: Dict[str, List[Dict[str, Any]]], automatic: bool):
+        candidates = []
+        for lang, formats in (tracks or {}).items():
+            base = _base_language(lang)
+            if automatic and not (lang.endswith('-orig') or (original and base == original)):
+                continue
+            if wanted and base not in wanted:
+                continue
+            for fmt in formats:
+                if fmt.get('ext') in TEXT_FORMATS and fmt.get('url'):
+                    rank = (wanted.index(base) if wanted else 0,
+                            0 if lang.endswith('-orig') or base == original else 1,
+                            TEXT_FORMATS.index(fmt['ext']))
+                    candidates.append((rank, lang, fmt['ext'], fmt['url']))
+        if candidates:
+            _, lang, ext, url = min(candidates)
+            return lang.replace('-orig', ''), ext, url
+        return None
+
+    return pick(info.get('subtitles'), False) or pick(info.get('automatic_captions'), True)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite access layer: a bounded connection pool and a TTL/LRU cache
+"""
+
+import os
+import time
+import queue
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional, Sequence, List, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class Database:
+    """Bounded pool of SQLite connections shared by all threads
+
+    Werkzeug serves every request on a fresh thread, so connections are
+    checked out per statement (or per ``transaction``/``connection`` block)
+    and returned to the pool instead of being tied to a thread. At most
+    ``pool_size`` connections are open; further callers wait up to
+    ``pool_timeout`` seconds for one to be returned. WAL mode is a property
+    of the database file and is set once by the app's init_db.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8, cached_statements: int = 256,
+                 busy_timeout: float = 5.0, pool_timeout: float = 30.0):
+        self.path = path
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self.pool_timeout = pool_timeout
+        self._idle: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # Per-connection setting; journal_mode persists in the file itself
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening one while under pool_size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.pool_size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No database connection free after {self.pool_timeout}s")
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, rolling back anything left open"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out of the pool for the duration of the block"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Run a SELECT and return all rows"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        """Run a SELECT and return the first row or None"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a single write statement in its own transaction and return its rowcount
+
+        The cursor is not returned: its connection goes back to the pool, and
+        another thread may be using it by the time the caller reads from it.
+        Use query/query_one to read rows.
+        """
+        with self.connection() as conn:
+            with conn:
+                return conn.execute(sql, params).rowcount
+
+    @contextmanager
+    def transaction(self):
+        """Group several statements into one transaction"""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
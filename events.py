@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Job change-notification hub feeding the /events Server-Sent Events stream
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, List
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One open event stream for a user
+
+    Only the latest state per job is kept, so a slow client receives a
+    coalesced update instead of every intermediate progress tick.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._pending: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def push(self, event: Dict[str, Any]):
+        """Queue an event, replacing any unsent event for the same job"""
+        with self._cond:
+            self._pending.pop(event['id'], None)
+            self._pending[event['id']] = event
+            self._cond.notify()
+
+    def drain(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to timeout seconds and return all pending events"""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._pending.values())
+            self._pending.clear()
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+class JobEventHub:
+    """Fan job state changes out to the user's open event streams"""
+
+    def __init__(self):
+        self._subscribers: Dict[Any, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def subscribe(self, user_id) -> Subscription:
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event: Dict[str, Any]):
+        """Deliver a job event to every stream the user has open"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+            if not subscribers:
+                return
+            self._sequence += 1
+            event = dict(event, seq=self._sequence)
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def publish_job(self, job):
+        """Publish the client-visible state of a job record"""
+        self.publish(job.user_id, job_event(job))
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+def job_event(job) -> Dict[str, Any]:
+    """Client-visible fields of a job, matching /status"""
+    event = {
+        'id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'filename': job.filename,
+    }
+    if job.status == 'completed' and job.output_path:
+        event['output_url'] = f"/download/{job.id}"
+    elif job.status in ('error', 'cancelled'):
+        event['error'] = job.error or 'Unknown error'
+    return event
+
+
+def format_sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events message"""
+    message = ''
+    if 'seq' in data:
+        message += f"id: {data['seq']}\n"
+    if event:
+        message += f"event: {event}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+# Global hub instance
+job_events = JobEventHub()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Media delivery: authorise in Flask, hand the bytes to nginx via X-Accel-Redirect
+"""
+
+import os
+import time
+import logging
+import mimetypes
+from typing import Dict, Optional, Callable, Iterator
+from urllib.parse import quote
+
+from flask import Response, request, send_file
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# nginx sets this on proxied requests when it can serve X-Accel-Redirect
+# responses (same convention as Rack::Sendfile).
+SENDFILE_TYPE_HEADER = 'X-Sendfile-Type'
+
+
+class MediaDelivery:
+    """Serve files from known media folders
+
+    Behind nginx the response is an empty body with an X-Accel-Redirect
+    header to an ``internal`` location, so nginx streams the file with
+    sendfile and handles Range and If-None-Match/If-Modified-Since itself.
+    Without nginx it falls back to a conditional, range-aware send_file.
+    """
+
+    def __init__(self, roots: Dict[str, str]):
+        # folder -> internal nginx location prefix
+        self.roots = [(os.path.realpath(folder) + os.sep, prefix.rstrip('/') + '/')
+                      for folder, prefix in roots.items()]
+
+    def internal_uri(self, path: str) -> Optional[str]:
+        """Map a file path to its internal nginx URI, or None if not servable"""
+        real = os.path.realpath(path)
+        for folder, prefix in self.roots:
+            if real.startswith(folder):
+                return prefix + quote(real[len(folder):].replace(os.sep, '/'))
+        return None
+
+    def send(self, path: str, mimetype: Optional[str] = None, as_attachment: bool = False,
+             download_name: Optional[str] = None) -> Optional[Response]:
+        """Build the response for a file, or None if it is missing or outside the media folders"""
+        uri = self.internal_uri(path)
+        if uri is None or not os.path.isfile(path):
+            if uri is None:
+                logger.warning(f"Refusing to serve file outside media folders: {path}")
+            return None
+
+        if request.headers.get(SENDFILE_TYPE_HEADER, '').lower() != 'x-accel-redirect':
+            return send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                             download_name=download_name, conditional=True, etag=True)
+
+        mimetype = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = Response(status=200, mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = uri
+        response.headers['Cache-Control'] = 'private'
+        if as_attachment:
+            response.headers['Content-Disposition'] = content_disposition(
+                download_name or os.path.basename(path))
+        return response
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment header with an RFC 5987 fallback for non-ASCII names"""
+    ascii_name = filename.encode('ascii', 'ignore').decode('ascii').replace('"', '') or 'download'
+    if ascii_name == filename:
+        return f'attachment; filename="{filename}"'
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def follow_file(path: str, still_writing: Callable[[], bool], chunk_size: int = CHUNK_SIZE,
+                poll_interval: float = 0.5, idle_timeout: float = 600) -> Iterator[bytes]:
+    """Yield a file's bytes as another process appends to it (like tail -f)
+
+    Stops once still_writing() turns false and the rest of the file has been
+    sent, or after idle_timeout seconds without new data.
+    """
+    idle = 0.0
+    while not os.path.exists(path):
+        if not still_writing() or idle >= idle_timeout:
+            return
+        time.sleep(poll_interval)
+        idle += poll_interval
+
+    idle = 0.0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if data:
+                idle = 0.0
+                yield data
+                continue
+            if not still_writing():
+                # Send whatever was flushed between the last read and the check
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        return
+                    yield data
+            if idle >= idle_timeout:
+                logger.warning(f"Gave up following {path} after {idle_timeout}s without data")
+                return
+            time.sleep(poll_interval)
+            idle += poll_interval
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Low-bitrate HLS preview packaging for uploaded and downloaded media
+"""
+
+import os
+import time
+import shutil
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = 'index.m3u8'
+
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.aac'}
+
+MIMETYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+
+
+class HLSPackager:
+    """Build a proxy rendition of a media file as HLS segments + playlist
+
+    Encoding runs on a small thread pool (ffmpeg does the work in its own
+    process), so uploads return immediately. ``on_ready`` is called with
+    (job_id, playlist_path) once the playlist is complete.
+    """
+
+    def __init__(self, preview_folder: str, max_workers: int = 2, height: int = 480,
+                 video_bitrate: str = '800k', audio_bitrate: str = '96k',
+                 segment_seconds: int = 4,
+                 on_ready: Optional[Callable[[str, str], None]] = None):
+        self.preview_folder = preview_folder
+        self.height = height
+        self.video_bitrate = video_bitrate
+        self.audio_bitrate = audio_bitrate
+        self.segment_seconds = segment_seconds
+        self.on_ready = on_ready
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hls')
+        self._state: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(preview_folder, exist_ok=True)
+
+    def output_dir(self, job_id: str) -> str:
+        return os.path.join(self.preview_folder, job_id)
+
+    def playlist_path(self, job_id: str) -> str:
+        return os.path.join(self.output_dir(job_id), PLAYLIST_NAME)
+
+    def status(self, job_id: str) -> Optional[str]:
+        """'processing', 'ready', 'error' or None if never submitted"""
+        with self._lock:
+            return self._state.get(job_id)
+
+    def submit(self, job_id: str, input_path: str):
+        """Queue packaging for a job; repeated submissions are ignored"""
+        with self._lock:
+            if job_id in self._state:
+                return
+            self._state[job_id] = 'processing'
+        self._executor.submit(self._package, job_id, input_path)
+
+    def remove(self, job_id: str):
+        """Delete a job's preview rendition"""
+        with self._lock:
+            self._state.pop(job_id, None)
+        shutil.rmtree(self.output_dir(job_id), ignore_errors=True)
+
+    def build_command(self, input_path: str, out_dir: str) -> list:
+        """ffmpeg arguments for the proxy rendition"""
+        cmd = ['ffmpeg', '-y', '-v', 'error', '-i', input_path]
+        if os.path.splitext(input_path)[1].lower() in AUDIO_EXTENSIONS:
+            cmd += ['-vn']
+        else:
+            cmd += [
+                '-map', '0:v:0', '-map', '0:a:0?',
+                # Never upscale; keep width even for libx264
+                '-vf', f"scale=-2:'min({self.height},ih)'",
+                '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main',
+                '-b:v', self.video_bitrate, '-maxrate', self.video_bitrate,
+                '-bufsize', self.video_bitrate,
+                # Keyframe on every segment boundary so segments cut cleanly
+                '-force_key_frames', f"expr:gte(t,n_forced*{self.segment_seconds})",
+            ]
+        cmd += [
+            '-c:a', 'aac', '-b:a', self.audio_bitrate, '-ac', '2',
+            '-f', 'hls',
+            '-hls_time', str(self.segment_seconds),
+            '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(out_dir, 'segment_%04d.ts'),
+            os.path.join(out_dir, PLAYLIST_NAME),
+        ]
+        return cmd
+
+    def _package(self, job_id: str, input_path: str):
+        out_dir = self.output_dir(job_id)
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            start = time.time()
+            result = subprocess.run(self.build_command(input_path, out_dir),
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                raise Exception(result.stderr.strip()[-500:])
+            with self._lock:
+                removed = job_id not in self._state
+                if not removed:
+                    self._state[job_id] = 'ready'
+            if removed:
+                shutil.rmtree(out_dir, ignore_errors=True)
+                return
+            logger.info(f"HLS preview for job {job_id} ready in {time.time() - start:.1f}s")
+            if self.on_ready:
+                self.on_ready(job_id, self.playlist_path(job_id))
+        except Exception as e:
+            logger.error(f"HLS packaging error for job {job_id}: {e}")
+            with self._lock:
+                if job_id in self._state:
+                    self._state[job_id] = 'error'
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def segment_mimetype(filename: str) -> Optional[str]:
+    """Content type for a playlist or segment file, None if not an HLS file"""
+    return MIMETYPES.get(os.path.splitext(filename)[1].lower())
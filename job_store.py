@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Bounded in-memory job cache with TTL eviction and SQLite fallback
+"""
+
+import os
+import time
+import uuid
+import logging
+import heapq
+import threading
+import sqlite3
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterator, Tuple, List, Iterable, Callable
+
+from db import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Distinguishes ETags issued by this process from those of a previous run
+STORE_ID = uuid.uuid4().hex[:8]
+
+# Statuses after which a job no longer changes and may be evicted
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+
+# Large text payloads are never kept in memory; they are read back from the
+# file the worker already wrote them to.
+LAZY_TEXT_FIELDS = {
+    'transcript': 'transcript_path',
+    'story': 'story_path',
+}
+
+# Fields whose changes are reported to the store's on_change listener
+WATCHED_FIELDS = ('status', 'progress', 'error')
+
+JOB_FIELDS = ('id', 'user_id', 'filename', 'type', 'status', 'progress', 'error',
+              'created_at', 'start_time', 'finished_at', 'total_duration',
+              'input_path', 'output_path', 'output_file', 'file_type', 'options',
+              'transcript_path', 'story_path', 'voice_path', 'preview_playlist',
+              'render_path', 'segments')
+
+# Columns persisted to the jobs table when a job leaves the cache
+PERSISTED_FIELDS = ('user_id', 'filename', 'type', 'status', 'progress', 'error',
+                    'input_path', 'output_path', 'output_file', 'transcript_path',
+                    'story_path', 'voice_path', 'file_type', 'finished_at',
+                    'preview_playlist')
+
+
+class JobRecord:
+    """Compact job record with dict-style access for existing callers
+
+    ``version`` is bumped on every field change and backs the status ETag.
+    """
+
+    __slots__ = JOB_FIELDS + ('version', '_listener')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.version = 0
+        self.progress = 0
+        self.created_at = time.time()
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key: str):
+        if key in LAZY_TEXT_FIELDS:
+            return self._read_text(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key in LAZY_TEXT_FIELDS:
+            # Payload lives on disk; only keep it if no file was written yet
+            if not getattr(self, LAZY_TEXT_FIELDS[key]):
+                raise KeyError(f"{key} requires {LAZY_TEXT_FIELDS[key]} to be set first")
+            return
+        if key not in JOB_FIELDS:
+            raise KeyError(key)
+        changed = getattr(self, key) != value
+        setattr(self, key, value)
+        if changed and self.version is not None:
+            self.version += 1
+        if key == 'status' and value in TERMINAL_STATUSES and self.finished_at is None:
+            self.finished_at = time.time()
+        if changed and key in WATCHED_FIELDS and self._listener:
+            try:
+                self._listener(self)
+            except Exception as e:
+                logger.error(f"Job change listener error for {self.id}: {e}")
+
+    def append(self, key: str, item):
+        """Append item to a list field in place, creating the list on first use
+
+        Counts as one change for the ETag without copying the list, so
+        long-running jobs can publish partial results cheaply.
+        """
+        if key not in JOB_FIELDS:
+            raise KeyError(key)
+        items = getattr(self, key)
+        if items is None:
+            items = []
+            setattr(self, key, items)
+        items.append(item)
+        if self.version is not None:
+            self.version += 1
+
+    def __contains__(self, key: str) -> bool:
+        if key in LAZY_TEXT_FIELDS:
+            path = getattr(self, LAZY_TEXT_FIELDS[key])
+            return bool(path) and os.path.exists(path)
+        return key in JOB_FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _read_text(self, key: str) -> str:
+        path = getattr(self, LAZY_TEXT_FIELDS[key])
+        if not path or not os.path.exists(path):
+            raise KeyError(key)
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def is_finished(self) -> bool:
+        """Check if the job reached a terminal status"""
+        return self.status in TERMINAL_STATUSES
+
+    def etag(self) -> str:
+        """Opaque validator that changes whenever the job state changes"""
+        if self.version is None:
+            # Loaded from the jobs table; persisted jobs never change again
+            return f"{self.id}-db"
+        return f"{self.id}-{STORE_ID}-{self.version}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the non-empty fields as a plain dict"""
+        return {name: getattr(self, name) for name in JOB_FIELDS
+                if getattr(self, name) is not None}
+
+
+class JobStore:
+    """Bounded, thread-safe mapping of job_id -> JobRecord
+
+    Finished jobs are written to the jobs table through ``db`` (a
+    db.Database) and dropped from memory once they are older than ``ttl``
+    seconds or the cache exceeds ``max_jobs``. Lookups that miss memory fall
+    back to the database.
+
+    Per-user and per-(user, status) indexes sorted by (created_at, job_id)
+    back keyset pagination, so listing a user's jobs, filtered by status or
+    not, costs O(log n + page size) instead of a scan.
+
+    ``on_change`` is called with the record whenever a job is added or its
+    status, progress or error changes. ``on_evict`` is called with a record
+    as it leaves memory (evicted or deleted), before it is persisted, to
+    release resources tied to the live job.
+
+    Ids found in neither memory nor the database are remembered for
+    ``miss_ttl`` seconds, so polling an unknown or deleted job does not
+    query SQLite on every request.
+    """
+
+    def __init__(self, db, max_jobs: int = 1000, ttl: float = 3600,
+                 on_change: Optional[Callable[[JobRecord], None]] = None,
+                 on_evict: Optional[Callable[[JobRecord], None]] = None,
+                 miss_ttl: float = 5.0):
+        self.db = db
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.on_change = on_change
+        self.on_evict = on_evict
+        self._jobs: 'OrderedDict[str, JobRecord]' = OrderedDict()
+        self._by_user: Dict[Any, List[Tuple[float, str]]] = {}
+        self._by_status: Dict[Tuple[Any, Any], List[Tuple[float, str]]] = {}
+        self._indexed_status: Dict[str, Any] = {}
+        self._evicting: Dict[str, JobRecord] = {}
+        self._misses = TTLCache(maxsize=4096, ttl=miss_ttl)
+        self._horizons: Dict[Any, float] = {}
+        self._user_versions: Dict[Any, int] = {}
+        self._lock = threading.RLock()
+
+    # ---- mapping interface used by app.py ----
+
+    def __setitem__(self, job_id: str, job):
+        if not isinstance(job, JobRecord):
+            job = JobRecord(**job)
+        job.id = job_id
+        job._listener = self._job_changed
+        with self._lock:
+            self._misses.invalidate(job_id)
+            if job_id in self._jobs:
+                self._unindex(self._jobs[job_id])
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._index(job)
+            self._bump_user(job.user_id)
+            evicted = self._evict_overflow() if len(self._jobs) > self.max_jobs else []
+        self._finish_eviction(evicted)
+        if self.on_change:
+            self.on_change(job)
+
+    def __getitem__(self, job_id: str) -> JobRecord:
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def __delitem__(self, job_id: str):
+        with self._lock:
+            job = self._jobs.pop(job_id)
+            self._unindex(job)
+            self._bump_user(job.user_id)
+        self._release(job)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def get(self, job_id: str, default=None) -> Optional[JobRecord]:
+        with self._lock:
+            job = self._jobs.get(job_id) or self._evicting.get(job_id)
+        if job is not None:
+            return job
+        if self._misses.get(job_id):
+            return default
+        job = self._load(job_id)
+        return job if job is not None else default
+
+    def items(self) -> Iterator[Tuple[str, JobRecord]]:
+        """Snapshot of the jobs currently held in memory"""
+        with self._lock:
+            return list(self._jobs.items())
+
+    def user_etag(self, user_id) -> str:
+        """Validator for a user's job list; changes when any of their jobs does"""
+        with self._lock:
+            return f"jobs-{user_id}-{STORE_ID}-{self._user_versions.get(user_id, 0)}"
+
+    def _bump_user(self, user_id):
+        self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    def _job_changed(self, job: JobRecord):
+        with self._lock:
+            self._bump_user(job.user_id)
+            if self._jobs.get(job.id) is job and self._indexed_status.get(job.id) != job.status:
+                self._unindex(job)
+                self._index(job)
+        if self.on_change:
+            self.on_change(job)
+
+    # ---- per-user index ----
+
+    def page_user_jobs(self, user_id, limit: int = 10, cursor: Optional[str] = None,
+                       statuses: Optional[Iterable[str]] = None) -> Tuple[List[JobRecord], Optional[str]]:
+        """Return one page of a user's jobs, newest first, and the next cursor
+
+        The cursor is ``"<created_at>:<job_id>"`` of the last job returned.
+        Jobs newer than the user's DB horizon (the newest job that may exist
+        only in the jobs table) are served from memory alone; older pages are
+        merged with the jobs table.
+        """
+        statuses = set(statuses) if statuses else None
+        key = _parse_cursor(cursor)
+        horizon = self._db_horizon(user_id)
+        page: List[JobRecord] = []
+        older: List[JobRecord] = []
+        with self._lock:
+            if statuses is None:
+                indexes = [self._by_user.get(user_id, [])]
+            else:
+                indexes = [self._by_status.get((user_id, status), []) for status in statuses]
+            for _, job_id in heapq.merge(*(_newest_first(index, key) for index in indexes), reverse=True):
+                if len(page) >= limit:
+                    break
+                job = self._jobs[job_id]
+                if job.created_at > horizon:
+                    page.append(job)
+                elif len(page) + len(older) < limit:
+                    older.append(job)
+                else:
+                    break
+        if len(page) < limit and horizon > float('-inf'):
+            before = (page[-1].created_at, page[-1].id) if page else key
+            need = limit - len(page)
+            rows = self._load_user_page(user_id, need + len(older), before, statuses)
+            merged = older + rows
+            merged.sort(key=lambda job: (job.created_at, job.id), reverse=True)
+            page += merged[:need]
+        next_cursor = None
+        if len(page) == limit:
+            next_cursor = f"{page[-1].created_at!r}:{page[-1].id}"
+        return page, next_cursor
+
+    def _db_horizon(self, user_id) -> float:
+        """Newest created_at of this user's jobs that may only be in the DB"""
+        with self._lock:
+            horizon = self._horizons.get(user_id)
+        if horizon is not None:
+            return horizon
+        horizon = float('-inf')
+        try:
+            row = self.db.query_one("SELECT MAX(created_at) FROM jobs WHERE user_id = ?", (user_id,))
+            if row and row[0]:
+                horizon = _parse_timestamp(row[0], horizon)
+        except sqlite3.Error as e:
+            logger.error(f"Job horizon lookup error for user {user_id}: {e}")
+            return float('inf')
+        with self._lock:
+            # An eviction may have raised the horizon while we were querying
+            horizon = max(horizon, self._horizons.get(user_id, horizon))
+            self._horizons[user_id] = horizon
+        return horizon
+
+    def _index(self, job: JobRecord):
+        entry = (job.created_at, job.id)
+        insort(self._by_user.setdefault(job.user_id, []), entry)
+        insort(self._by_status.setdefault((job.user_id, job.status), []), entry)
+        self._indexed_status[job.id] = job.status
+
+    def _unindex(self, job: JobRecord):
+        entry = (job.created_at, job.id)
+        _remove_entry(self._by_user, job.user_id, entry)
+        _remove_entry(self._by_status, (job.user_id, self._indexed_status.pop(job.id, job.status)), entry)
+
+    # ---- eviction ----
+
+    def evict_expired(self) -> int:
+        """Persist and drop finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [self._evict(job_id) for job_id, job in list(self._jobs.items())
+                       if job.is_finished() and (job.finished_at or job.created_at) < cutoff]
+        self._finish_eviction(expired)
+        if expired:
+            logger.info(f"Evicted {len(expired)} finished jobs from cache")
+        return len(expired)
+
+    def _evict_overflow(self) -> List[JobRecord]:
+        """Drop the oldest finished jobs until the cache fits again"""
+        evicted = []
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.is_finished()]:
+            if len(self._jobs) <= self.max_jobs:
+                return evicted
+            evicted.append(self._evict(job_id))
+        if len(self._jobs) > self.max_jobs:
+            logger.warning(f"Job cache over capacity with {len(self._jobs)} unfinished jobs")
+        return evicted
+
+    def _evict(self, job_id: str) -> JobRecord:
+        """Unlink a job from memory; the caller finishes it outside the lock"""
+        job = self._jobs.pop(job_id)
+        self._unindex(job)
+        self._bump_user(job.user_id)
+        if job.user_id in self._horizons:
+            self._horizons[job.user_id] = max(self._horizons[job.user_id], job.created_at)
+        # Lookups keep finding it until the row is written
+        self._evicting[job_id] = job
+        return job
+
+    def _finish_eviction(self, jobs: List[JobRecord]):
+        """Release and persist evicted jobs without holding the store lock"""
+        for job in jobs:
+            self._release(job)
+            try:
+                self._persist(job)
+            except Exception as e:
+                logger.error(f"Failed to persist evicted job {job.id}: {e}")
+            with self._lock:
+                # A lookup that raced the job's creation may have cached a miss
+                self._misses.invalidate(job.id)
+                if self._evicting.get(job.id) is job:
+                    del self._evicting[job.id]
+
+    def _release(self, job: JobRecord):
+        # Detach first so the callback's own edits are not reported as changes
+        job._listener = None
+        if self.on_evict:
+            try:
+                self.on_evict(job)
+            except Exception as e:
+                logger.error(f"Eviction callback failed for job {job.id}: {e}")
+
+    # ---- persistence ----
+
+    def persist(self, job_id: str):
+        """Write a job's current state to the jobs table, keeping it cached"""
+        job = self.get(job_id)
+        if job is None:
+            return
+        try:
+            self._persist(job)
+        except Exception as e:
+            logger.error(f"Failed to persist job {job_id}: {e}")
+
+    def _persist(self, job: JobRecord):
+        columns = ('id', 'created_at') + PERSISTED_FIELDS
+        values = [job.id, datetime.fromtimestamp(job.created_at)]
+        values += [getattr(job, name) for name in PERSISTED_FIELDS]
+        self.db.execute(f"INSERT OR REPLACE INTO jobs ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))})", values)
+
+    def _load(self, job_id: str) -> Optional[JobRecord]:
+        try:
+            row = self.db.query_one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        except sqlite3.Error as e:
+            logger.error(f"Job lookup error for {job_id}: {e}")
+            return None
+        if row is None:
+            self._misses.set(job_id, True)
+            return None
+        return _record_from_row(row)
+
+    def _load_user_page(self, user_id, limit: int, before: Optional[Tuple[float, str]],
+                        statuses: Optional[set]) -> List[JobRecord]:
+        """Older jobs of a user that are no longer cached"""
+        query = "SELECT * FROM jobs WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if before:
+            query += " AND created_at < ?"
+            params.append(datetime.fromtimestamp(before[0]))
+        if statuses:
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params += sorted(statuses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        try:
+            rows = self.db.query(query, params)
+        except sqlite3.Error as e:
+            logger.error(f"Job page lookup error for user {user_id}: {e}")
+            return []
+        # Rows still cached were already considered by the in-memory walk
+        with self._lock:
+            return [_record_from_row(row) for row in rows if row['id'] not in self._jobs]
+
+
+def _remove_entry(indexes: Dict[Any, List[Tuple[float, str]]], name, entry: Tuple[float, str]):
+    """Remove entry from the sorted index indexes[name], dropping it once empty"""
+    index = indexes.get(name)
+    if not index:
+        return
+    pos = bisect_left(index, entry)
+    if pos < len(index) and index[pos] == entry:
+        del index[pos]
+    if not index:
+        del indexes[name]
+
+
+def _newest_first(index: List[Tuple[float, str]], before: Optional[Tuple[float, str]]) -> Iterator[Tuple[float, str]]:
+    """Walk a sorted index backwards from just below the before key"""
+    pos = bisect_left(index, before) if before else len(index)
+    for i in range(pos - 1, -1, -1):
+        yield index[i]
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    """Split a pagination cursor into its (created_at, job_id) key"""
+    if not cursor:
+        return None
+    created_at, _, job_id = cursor.partition(':')
+    try:
+        return (float(created_at), job_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _parse_timestamp(value, default: float) -> float:
+    """Convert a created_at column value to a Unix timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+def _record_from_row(row: sqlite3.Row) -> JobRecord:
+    """Rebuild a JobRecord from a jobs table row"""
+    fields = {name: row[name] for name in PERSISTED_FIELDS
+              if name in row.keys() and row[name] is not None}
+    job = JobRecord(**fields)
+    job.id = row['id']
+    job.version = None
+    job.created_at = _parse_timestamp(row['created_at'], job.created_at)
+    if job.status is None:
+        job.status = 'completed'
+    if job.is_finished() and job.finished_at is None:
+        job.finished_at = job.created_at
+    return job
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Pluggable LLM clients: Gemini in production, a local stub for tests and benchmarks
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    """Interface the story pipeline talks to"""
+
+    model = 'unknown'
+
+    async def generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the response in pieces as it is generated
+
+        Clients without streaming support yield the whole response once.
+        """
+        yield await self.generate(prompt)
+
+
+class GeminiClient(LLMClient):
+    """google.generativeai GenerativeModel behind the LLMClient interface"""
+
+    def __init__(self, model: str = 'gemini-1.5-pro'):
+        import google.generativeai as genai
+        self.model = model
+        self._model = genai.GenerativeModel(model)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self._model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self._model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only a finish reason)
+                continue
+            if text:
+                yield text
+
+
+class StubLLMClient(LLMClient):
+    """Deterministic offline client that never touches the network
+
+    By default the reply is a short digest-tagged echo of the prompt; pass
+    ``responder`` to script replies. ``latency`` simulates upstream time so
+    concurrency can be benchmarked.
+    """
+
+    model = 'stub'
+
+    def __init__(self, latency: float = 0.0, responder: Optional[Callable[[str], str]] = None):
+        self.latency = latency
+        self.responder = responder
+        self.calls = 0
+
+    def reply(self, prompt: str) -> str:
+        if self.responder:
+            return self.responder(prompt)
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        return f"[stub {digest}] {prompt[-200:].strip()}"
+
+    async def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.reply(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Reply word by word, spreading ``latency`` across the words"""
+        self.calls += 1
+        words = self.reply(prompt).split(' ')
+        for i, word in enumerate(words):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(words))
+            yield word if i == 0 else ' ' + word
+
+
+def create_client(backend: str, model: str) -> LLMClient:
+    """Client for a configured backend name ('gemini' or 'stub')"""
+    if backend == 'stub':
+        return StubLLMClient()
+    if backend == 'gemini':
+        return GeminiClient(model)
+    raise ValueError(f"Unknown LLM backend: {backend}")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Persistent LLM response cache with coalescing of identical in-flight requests
+"""
+
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict
+
+from llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLLMClient(LLMClient):
+    """LLMClient wrapper that answers repeated prompts from the llm_cache table
+
+    Entries are keyed by (model, prompt template version, prompt hash); bump
+    ``prompt_version`` whenever the templates change so stale answers are
+    not reused. Identical requests that arrive while the first is still
+    waiting on the upstream model share its result instead of calling it
+    again. Least recently used entries are deleted once the stored responses
+    exceed ``max_bytes``.
+    """
+
+    def __init__(self, client: LLMClient, db, prompt_version: str, max_bytes: int = 64 * 1024 ** 2):
+        self.client = client
+        self.model = client.model
+        self.db = db
+        self.prompt_version = prompt_version
+        self.max_bytes = max_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def cache_key(self, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{self.model}\0{self.prompt_version}\0{prompt_hash}".encode('utf-8')).hexdigest()
+
+    async def generate(self, prompt: str) -> str:
+        key = self.cache_key(prompt)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        # Registered before the lookup, so requests arriving meanwhile wait for it
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._blocking(self._lookup, key)
+            if response is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                response = await self.client.generate(prompt)
+                await self._blocking(self._store, key, response)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream a miss from the upstream client, storing the full text at the end
+
+        Hits and coalesced requests yield the whole response at once.
+        """
+        key = self.cache_key(prompt)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            yield await asyncio.shield(inflight)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            cached = await self._blocking(self._lookup, key)
+            if cached is not None:
+                self.hits += 1
+                future.set_result(cached)
+                yield cached
+                return
+            self.misses += 1
+            pieces = []
+            async for piece in self.client.stream(prompt):
+                pieces.append(piece)
+                yield piece
+            response = ''.join(pieces)
+            await self._blocking(self._store, key, response)
+            future.set_result(response)
+        except BaseException as e:
+            # Includes the consumer closing the stream early; nothing is stored
+            if not future.done():
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _blocking(self, func, *args):
+        """Run a SQLite call in the loop's executor so other coroutines keep running"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _lookup(self, key: str):
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                         (time.time(), key))
+        return row['response']
+
+    def _store(self, key: str, response: str):
+        now = time.time()
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, prompt_version, response, size, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, self.model, self.prompt_version, response, len(response.encode('utf-8')), now, now))
+            self.evict()
+        except sqlite3.Error as e:
+            # The response is still returned; it is just not cached
+            logger.error(f"LLM cache write error: {e}")
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            total = self.db.query_one("SELECT COALESCE(SUM(size), 0) AS total FROM llm_cache")['total']
+            if total <= self.max_bytes:
+                return
+            removed = 0
+            with self.db.transaction() as conn:
+                for row in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (row['key'],))
+                    total -= row['size']
+                    removed += 1
+            logger.info(f"Evicted {removed} cached LLM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        row = self.db.query_one("SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes FROM llm_cache")
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            'entries': row['entries'],
+            'bytes': row['bytes'],
+            'max_bytes': self.max_bytes,
+        }
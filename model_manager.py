@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Process-wide model manager: load ML models once and keep them under a memory budget
+"""
+
+import gc
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident size in MB of each Whisper checkpoint on CPU
+WHISPER_MEMORY_MB = {
+    'tiny': 150,
+    'base': 300,
+    'small': 1000,
+    'medium': 2600,
+    'large': 5200,
+    'large-v2': 5200,
+    'large-v3': 5200,
+    'turbo': 3200,
+}
+
+XTTS_MEMORY_MB = 2200
+
+
+class _ModelSlot:
+    """Registration and residency state of one model"""
+
+    __slots__ = ('name', 'loader', 'size_mb', 'model', 'loaded_at', 'last_used',
+                 'in_use', 'load_seconds', 'lock')
+
+    def __init__(self, name: str, loader: Callable[[], Any], size_mb: int):
+        self.name = name
+        self.loader = loader
+        self.size_mb = size_mb
+        self.model = None
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.in_use = 0
+        self.load_seconds: Optional[float] = None
+        # Serialises loading so concurrent first requests load the model once
+        self.lock = threading.Lock()
+
+
+class ModelManager:
+    """Keep registered models resident between jobs
+
+    A model is loaded on first use and shared by every job in the worker.
+    When loading one would exceed ``memory_budget_mb`` the least recently
+    used idle models are unloaded first, and models nobody used for
+    ``idle_timeout`` seconds are unloaded by a background reaper. Models
+    that are currently in use are never unloaded.
+    """
+
+    def __init__(self, memory_budget_mb: int = 4096, idle_timeout: float = 900):
+        self.memory_budget_mb = memory_budget_mb
+        self.idle_timeout = idle_timeout
+        self._slots: Dict[str, _ModelSlot] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any], size_mb: int):
+        """Declare a model; nothing is loaded until it is first used"""
+        with self._lock:
+            self._slots[name] = _ModelSlot(name, loader, size_mb)
+
+    def get(self, name: str) -> Any:
+        """Return a resident model, loading it if needed"""
+        slot = self._slot(name)
+        with slot.lock:
+            if slot.model is None:
+                self._make_room(slot)
+                start = time.time()
+                logger.info(f"Loading model {name}...")
+                model = slot.loader()
+                with self._lock:
+                    slot.model = model
+                    slot.loaded_at = time.time()
+                    slot.load_seconds = slot.loaded_at - start
+                logger.info(f"Model {name} loaded in {slot.load_seconds:.1f}s")
+                self._start_reaper()
+            slot.last_used = time.time()
+            return slot.model
+
+    @contextmanager
+    def use(self, name: str):
+        """Hold a model for the duration of a block so it cannot be unloaded"""
+        slot = self._slot(name)
+        with self._lock:
+            slot.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with self._lock:
+                slot.in_use -= 1
+                slot.last_used = time.time()
+
+    def preload(self, names: Iterable[str]):
+        """Load models ahead of the first request, e.g. at worker startup"""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Preloading model {name} failed: {e}")
+
+    def unload(self, name: str) -> bool:
+        """Drop a model if it is resident and not in use"""
+        slot = self._slot(name)
+        with self._lock:
+            if slot.model is None or slot.in_use:
+                return False
+            slot.model = None
+            slot.loaded_at = None
+        gc.collect()
+        logger.info(f"Unloaded model {name}")
+        return True
+
+    def unload_idle(self) -> int:
+        """Unload models that have not been used for idle_timeout seconds"""
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [s.name for s in self._slots.values()
+                    if s.model is not None and not s.in_use and s.last_used < cutoff]
+        return sum(1 for name in idle if self.unload(name))
+
+    def resident_mb(self) -> int:
+        with self._lock:
+            return sum(s.size_mb for s in self._slots.values() if s.model is not None)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Residency report per registered model"""
+        with self._lock:
+            return {
+                s.name: {
+                    'resident': s.model is not None,
+                    'size_mb': s.size_mb,
+                    'in_use': s.in_use,
+                    'idle_seconds': round(time.time() - s.last_used, 1) if s.last_used else None,
+                    'load_seconds': round(s.load_seconds, 2) if s.load_seconds else None,
+                }
+                for s in self._slots.values()
+            }
+
+    def _slot(self, name: str) -> _ModelSlot:
+        try:
+            return self._slots[name]
+        except KeyError:
+            raise KeyError(f"Unknown model: {name}")
+
+    def _make_room(self, slot: _ModelSlot):
+        """Unload least recently used idle models until slot fits the budget"""
+        while self.resident_mb() + slot.size_mb > self.memory_budget_mb:
+            with self._lock:
+                candidates = sorted(
+                    (s for s in self._slots.values()
+                     if s.model is not None and not s.in_use and s is not slot),
+                    key=lambda s: s.last_used or 0)
+            if not candidates:
+                logger.warning(f"Loading {slot.name} exceeds the model memory budget "
+                               f"({self.resident_mb() + slot.size_mb}MB > {self.memory_budget_mb}MB)")
+                return
+            self.unload(candidates[0].name)
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None or not self.idle_timeout:
+                return
+            self._reaper = threading.Thread(target=self._reap, name='model-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        interval = max(1.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            time.sleep(interval)
+            try:
+                self.unload_idle()
+            except Exception as e:
+                logger.error(f"Model reaper error: {e}")
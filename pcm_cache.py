@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Disk cache of decoded 16kHz mono float32 PCM for speech recognition
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+from vad import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+PCM_EXTENSION = '.f32'
+
+
+class PCMCache:
+    """Raw f32le files keyed by source, read back as memory maps
+
+    Audio is decoded once, straight to the format Whisper and the VAD work
+    on; later passes map the file instead of decoding again and never hold
+    the whole track in memory. Least recently used files are removed once
+    the folder exceeds ``max_bytes``.
+    """
+
+    def __init__(self, folder: str, max_bytes: int = 2 * 1024 ** 3):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}{PCM_EXTENSION}")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Memory-mapped samples for key, or None if not cached"""
+        path = self.path(key)
+        try:
+            if os.path.getsize(path) == 0:
+                return None
+            os.utime(path)
+            return np.memmap(path, dtype=np.float32, mode='r')
+        except OSError:
+            return None
+
+    @contextmanager
+    def writer(self, key: str):
+        """File to write PCM into; it is only published if the block completes"""
+        path = self.path(key)
+        # Unique per writer: streaming jobs for the same video share the event loop thread
+        tmp_path = f"{path}.part-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def decode_file(self, source_path: str, key: str) -> np.ndarray:
+        """Decode any media file to cached PCM with one ffmpeg pass"""
+        with self.writer(key) as f:
+            result = subprocess.run(
+                ['ffmpeg', '-nostdin', '-v', 'error', '-i', source_path,
+                 '-vn', '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1'],
+                stdout=f, stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                raise Exception(f"ffmpeg PCM decode failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+        return self.get(key)
+
+    def evict(self):
+        """Remove least recently used files until the cache fits max_bytes"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.folder):
+                if not name.endswith(PCM_EXTENSION):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.folder, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                    total -= size
+                    logger.info(f"Evicted cached PCM {name}")
+                except OSError:
+                    pass
+
+
+def source_key(video_id: Optional[str] = None, url: Optional[str] = None,
+               extractor: Optional[str] = None) -> str:
+    """Cache key for a source: extractor and video ID when known, otherwise a hash of the URL
+
+    IDs are only unique within one yt-dlp extractor, so the extractor is
+    part of the key.
+    """
+    if video_id:
+        safe = lambda value: ''.join(c for c in value if c.isalnum() or c in '-_')
+        return f"{safe(extractor or 'youtube').lower()}_{safe(video_id)}"
+    return 'url_' + hashlib.sha1((url or '').encode('utf-8')).hexdigest()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Saved XTTS speaker profiles: conditioning latents computed once per voice sample
+"""
+
+import os
+import uuid
+import wave
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from db import TTLCache
+from speech import split_sentences
+from transcript_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Sample rate of XTTS v2 output, if the synthesizer does not report one
+XTTS_SAMPLE_RATE = 24000
+
+# XTTS rejects inputs over about 400 text tokens; sentences are kept well below
+XTTS_MAX_CHARS = 250
+
+
+class SpeakerStore:
+    """Speaker profiles in the ``speakers`` table with latents saved under ``folder``
+
+    Cloning normally re-derives the GPT conditioning latent and speaker
+    embedding from the sample on every request. A profile stores them once
+    under a speaker ID, so later requests only pay the decoder. The sample
+    is kept alongside, and latents computed with a different model are
+    recomputed on first use.
+    """
+
+    def __init__(self, db, folder: str, model: str, cached_profiles: int = 32):
+        self.db = db
+        self.folder = folder
+        self.model = model
+        self._latents = TTLCache(maxsize=cached_profiles, ttl=3600)
+        os.makedirs(folder, exist_ok=True)
+
+    def _conditioning(self, tts, sample_path: str) -> Dict[str, Any]:
+        xtts = tts.synthesizer.tts_model
+        gpt_cond_latent, speaker_embedding = xtts.get_conditioning_latents(audio_path=[sample_path])
+        return {'gpt_cond_latent': gpt_cond_latent, 'speaker_embedding': speaker_embedding}
+
+    def _save_latents(self, speaker_id: str, latents: Dict[str, Any]) -> str:
+        import torch
+        latents_path = os.path.join(self.folder, f"{speaker_id}.pt")
+        tmp_path = f"{latents_path}.part-{uuid.uuid4().hex[:8]}"
+        torch.save(latents, tmp_path)
+        os.replace(tmp_path, latents_path)
+        return latents_path
+
+    def create(self, tts, user_id, sample_path: str, name: Optional[str] = None) -> str:
+        """Profile for a voice sample, reusing the user's profile of an identical sample"""
+        sample_hash = content_hash(sample_path)
+        row = self.db.query_one("SELECT id FROM speakers WHERE user_id = ? AND sample_hash = ?",
+                                (user_id, sample_hash))
+        if row:
+            return row['id']
+
+        speaker_id = str(uuid.uuid4())
+        stored_sample = os.path.join(self.folder, f"{speaker_id}{os.path.splitext(sample_path)[1] or '.wav'}")
+        shutil.copyfile(sample_path, stored_sample)
+        latents = self._conditioning(tts, stored_sample)
+        latents_path = self._save_latents(speaker_id, latents)
+        self.db.execute(
+            "INSERT INTO speakers (id, user_id, name, sample_path, sample_hash, latents_path, model, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (speaker_id, user_id, name or 'Voice sample', stored_sample, sample_hash, latents_path,
+             self.model, datetime.now()))
+        self._latents.set(speaker_id, latents)
+        logger.info(f"Created speaker profile {speaker_id} for user {user_id}")
+        return speaker_id
+
+    def get(self, speaker_id: str, user_id) -> Optional[Dict[str, Any]]:
+        row = self.db.query_one("SELECT * FROM speakers WHERE id = ? AND user_id = ?", (speaker_id, user_id))
+        return dict(row) if row else None
+
+    def for_user(self, user_id) -> List[Dict[str, Any]]:
+        rows = self.db.query("SELECT id, name, created_at FROM speakers WHERE user_id = ? ORDER BY created_at DESC",
+                             (user_id,))
+        return [dict(row) for row in rows]
+
+    def latents(self, tts, speaker: Dict[str, Any]) -> Dict[str, Any]:
+        """Conditioning for a profile: memory, then disk, then recomputed from the sample"""
+        latents = self._latents.get(speaker['id'])
+        if latents is not None:
+            return latents
+        if speaker['model'] == self.model and os.path.exists(speaker['latents_path']):
+            import torch
+            latents = torch.load(speaker['latents_path'])
+        else:
+            logger.info(f"Recomputing speaker {speaker['id']} latents for {self.model}")
+            latents = self._conditioning(tts, speaker['sample_path'])
+            self._save_latents(speaker['id'], latents)
+            self.db.execute("UPDATE speakers SET model = ? WHERE id = ?", (self.model, speaker['id']))
+        self._latents.set(speaker['id'], latents)
+        return latents
+
+    def synthesize(self, tts, speaker: Dict[str, Any], text: str, language: str, output_path: str) -> str:
+        """Speak text in a saved voice into a 16-bit WAV file, one sentence per inference call"""
+        latents = self.latents(tts, speaker)
+        sentences = split_sentences(text, XTTS_MAX_CHARS)
+        if not sentences:
+            raise ValueError('No text to synthesise')
+        waves = []
+        for sentence in sentences:
+            out = tts.synthesizer.tts_model.inference(sentence, language, latents['gpt_cond_latent'],
+                                                      latents['speaker_embedding'])
+            wav = out['wav']
+            if hasattr(wav, 'cpu'):
+                wav = wav.cpu().numpy()
+            waves.append(np.asarray(wav, dtype=np.float32).reshape(-1))
+        pcm = (np.clip(np.concatenate(waves), -1.0, 1.0) * 32767).astype('<i2')
+        with wave.open(output_path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(getattr(tts.synthesizer, 'output_sample_rate', None) or XTTS_SAMPLE_RATE)
+            f.writeframes(pcm.tobytes())
+        return output_path
+
+    def delete(self, speaker_id: str, user_id) -> bool:
+        speaker = self.get(speaker_id, user_id)
+        if not speaker:
+            return False
+        self.db.execute("DELETE FROM speakers WHERE id = ?", (speaker_id,))
+        self._latents.invalidate(speaker_id)
+        for path in (speaker['sample_path'], speaker['latents_path']):
+            if path and os.path.exists(path):
+                os.remove(path)
+        return True
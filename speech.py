@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Text-to-speech: pluggable engines and sentence-chunked concurrent synthesis
+"""
+
+import io
+import os
+import re
+import math
+import uuid
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: Myanmar (။, with or without a following space), Latin
+# punctuation followed by whitespace, and line breaks
+_SENTENCE_END_RE = re.compile(r'(?<=။)\s*|(?<=[.!?])\s+|\n+')
+
+# Softer break (Myanmar ၊, commas) used to split over-long sentences
+_CLAUSE_END_RE = re.compile(r'(?<=[၊,;])\s*')
+
+# One silent MPEG-2 Layer III frame: 24kHz mono 48kbps, 576 samples (24ms),
+# the same stream format edge-tts returns
+_SILENT_FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + bytes(140)
+_FRAME_SECONDS = 576 / 24000
+
+
+def split_sentences(text: str, max_chars: int = 400) -> List[str]:
+    """Split text on sentence boundaries into pieces of at most max_chars
+
+    Sentences longer than max_chars are split on clause breaks, then on
+    whitespace; a single word is never split.
+    """
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        current = ''
+        for part in _CLAUSE_END_RE.split(sentence):
+            words = part.split() if len(part) > max_chars else [part.strip()]
+            for word in words:
+                if current and len(current) + 1 + len(word) > max_chars:
+                    pieces.append(current)
+                    current = ''
+                current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+    return [p for p in pieces if p]
+
+
+class TTSEngine:
+    """Interface the voice pipeline talks to; returns MP3 bytes"""
+
+    name = 'unknown'
+    voice = None
+    language = None
+
+    async def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class EdgeTTSEngine(TTSEngine):
+    """Microsoft Edge neural voices through edge-tts"""
+
+    name = 'edge'
+
+    def __init__(self, voice: str = 'my-MM-ThihaNeural'):
+        import edge_tts
+        self._edge_tts = edge_tts
+        self.voice = voice
+        self.language = voice.rsplit('-', 1)[0]
+
+    async def synthesize(self, text: str) -> bytes:
+        audio = bytearray()
+        async for chunk in self._edge_tts.Communicate(text, self.voice).stream():
+            if chunk['type'] == 'audio':
+                audio.extend(chunk['data'])
+        if not audio:
+            raise RuntimeError('edge-tts returned no audio')
+        return bytes(audio)
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS through gTTS; the voice is the language code"""
+
+    name = 'gtts'
+
+    def __init__(self, voice: str = 'my'):
+        from gtts import gTTS
+        self._gtts = gTTS
+        self.voice = voice
+        self.language = voice
+
+    def _synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        self._gtts(text=text, lang=self.voice, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    async def synthesize(self, text: str) -> bytes:
+        # gTTS is blocking; run it in the loop's executor
+        return await asyncio.get_running_loop().run_in_executor(None, self._synthesize, text)
+
+
+class FakeTTSEngine(TTSEngine):
+    """Offline engine producing silent MP3 audio, for tests and benchmarks
+
+    The audio lasts ``seconds_per_char`` per character. ``latency`` simulates
+    upstream time and the first ``failures`` calls raise, to exercise retries.
+    """
+
+    name = 'fake'
+
+    def __init__(self, voice: str = 'fake', latency: float = 0.0, failures: int = 0,
+                 seconds_per_char: float = 0.06):
+        self.voice = voice
+        self.language = 'my'
+        self.latency = latency
+        self.failures = failures
+        self.seconds_per_char = seconds_per_char
+        self.calls = 0
+
+    async def synthesize(self, text: str) -> bytes:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError('fake TTS failure')
+        frames = max(1, math.ceil(len(text) * self.seconds_per_char / _FRAME_SECONDS))
+        return _SILENT_FRAME * frames
+
+
+def create_engine(backend: str, voice: str) -> TTSEngine:
+    """Engine for a configured backend name ('edge', 'gtts' or 'fake')"""
+    if backend == 'edge':
+        return EdgeTTSEngine(voice)
+    if backend == 'gtts':
+        return GTTSEngine(voice)
+    if backend == 'fake':
+        return FakeTTSEngine(voice)
+    raise ValueError(f"Unknown TTS backend: {backend}")
+
+
+class ChunkedSynthesizer:
+    """Synthesise long text sentence by sentence, several sentences at a time
+
+    At most ``concurrency`` requests are in flight across all jobs. A failed
+    sentence is retried on its own (``retries`` times, with exponential
+    backoff) instead of restarting the whole text. MP3 frames are
+    self-contained, so the pieces are joined byte for byte without
+    re-encoding. With a ``cache`` (tts_cache.TTSCache) sentences already
+    synthesised with the same engine and voice are reused.
+    """
+
+    def __init__(self, engine: TTSEngine, concurrency: int = 4, retries: int = 3,
+                 retry_delay: float = 1.0, max_chars: int = 400, cache=None):
+        self.engine = engine
+        self.cache = cache
+        self.concurrency = concurrency
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_chars = max_chars
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def synthesize_chunk(self, text: str, engine: Optional[TTSEngine] = None) -> bytes:
+        """One piece of text, from the cache or synthesised and retried on failure"""
+        engine = engine or self.engine
+        key = None
+        if self.cache:
+            key = self.cache.key(engine, text)
+            audio = await self._blocking(self.cache.get, key)
+            if audio:
+                return audio
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    audio = await engine.synthesize(text)
+                if key:
+                    # Writing and evicting touch the disk; keep them off the event loop
+                    await self._blocking(self.cache.put, key, audio)
+                return audio
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning(f"TTS chunk failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def cached_audio(self, text: str, engine: Optional[TTSEngine] = None) -> Optional[bytes]:
+        """The whole text's audio if every sentence is cached, else None"""
+        engine = engine or self.engine
+        chunks = split_sentences(text, self.max_chars)
+        if not self.cache or not chunks:
+            return None
+        audio = []
+        for chunk in chunks:
+            # One lookup per sentence, stopping at the first miss
+            piece = self.cache.get(self.cache.key(engine, chunk))
+            if not piece:
+                return None
+            audio.append(piece)
+        return b''.join(audio)
+
+    async def _blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def stream(self, text: str, engine: Optional[TTSEngine] = None) -> AsyncIterator[bytes]:
+        """Yield each sentence's audio in order as soon as it is ready
+
+        All sentences are queued at once, so later ones are synthesised
+        while earlier ones are being sent. ``engine`` overrides the default
+        engine for this text.
+        """
+        chunks = split_sentences(text, self.max_chars)
+        if not chunks:
+            raise ValueError('No text to synthesise')
+        tasks = [asyncio.ensure_future(self.synthesize_chunk(chunk, engine)) for chunk in chunks]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            # Client went away or a chunk failed for good
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize(self, text: str, engine: Optional[TTSEngine] = None) -> bytes:
+        return b''.join([audio async for audio in self.stream(text, engine)])
+
+    async def save(self, text: str, output_path: str, engine: Optional[TTSEngine] = None,
+                   partial_path: Optional[str] = None) -> str:
+        """Synthesise text into output_path
+
+        Each sentence is appended to ``partial_path`` (a unique temporary
+        name by default) as soon as it is ready, so readers can follow the
+        file while it grows; it is renamed to output_path once complete and
+        removed if synthesis fails.
+        """
+        tmp_path = partial_path or f"{output_path}.part-{uuid.uuid4().hex[:8]}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                async for audio in self.stream(text, engine):
+                    f.write(audio)
+                    f.flush()
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return output_path
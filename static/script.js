@@ -21,12 +21,20 @@ function getRangeValue(id, defaultValue = '1') {
 
 // ========== GLOBAL VARIABLES ==========
 let currentJobId = null;
+let transcriptSegmentCount = 0;
+let transcriptSegmentsLoading = false;
+let storyEventSource = null;
 let statusInterval = null;
 let currentTranscriptId = null;
 let currentVoiceId = null;
+let currentSpeaker = null;
 let currentDownloadJobId = null;
 let previewVideo = null;
 let currentPreviewId = null;
+let jobEventSource = null;
+let previewHls = null;
+let jobWatchers = {};
+const jobsById = new Map();
 
 // ========== WHEN PAGE LOADS ==========
 document.addEventListener('DOMContentLoaded', function() {
@@ -38,9 +46,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize all event listeners
     initEventListeners();
     
-    // Load jobs list
+    // Load jobs list - pushed over /events, polling only as a fallback
     loadJobs();
-    setInterval(loadJobs, 3000);
+    if (!connectJobEvents()) {
+        setInterval(loadJobs, 3000);
+    }
     
     // Check saved dark mode preference
     if (localStorage.getItem('darkMode') === 'enabled') {
@@ -119,6 +129,58 @@ async function loadJobs() {
     }
 }
 
+// ========== JOB EVENT STREAM (SSE) ==========
+function connectJobEvents() {
+    if (!window.EventSource) return false;
+    
+    jobEventSource = new EventSource('/events');
+    
+    jobEventSource.addEventListener('job', (e) => {
+        const job = JSON.parse(e.data);
+        
+        // Keep creation order: the server sends the snapshot oldest first
+        jobsById.set(job.id, Object.assign(jobsById.get(job.id) || {}, job));
+        displayJobs(Array.from(jobsById.values()).reverse().slice(0, 10));
+        
+        const watcher = jobWatchers[job.id];
+        if (watcher && watcher.apply(job)) {
+            delete jobWatchers[job.id];
+        }
+    });
+    
+    jobEventSource.onerror = () => {
+        // EventSource reconnects on its own unless the stream was rejected
+        if (jobEventSource.readyState === EventSource.CLOSED) {
+            console.warn('Job event stream closed - falling back to polling');
+            jobEventSource = null;
+            setInterval(loadJobs, 3000);
+            const watchers = Object.values(jobWatchers);
+            jobWatchers = {};
+            watchers.forEach(w => w.fallback());
+        }
+    };
+    
+    return true;
+}
+
+// Follow one job over the event stream; returns false when polling is needed
+function watchJob(jobId, apply, fallback) {
+    if (!jobEventSource || jobEventSource.readyState === EventSource.CLOSED) return false;
+    
+    jobWatchers = {};
+    jobWatchers[jobId] = { apply, fallback };
+    
+    const known = jobsById.get(jobId);
+    if (known && apply(known)) {
+        delete jobWatchers[jobId];
+    }
+    return true;
+}
+
+function unwatchJobs() {
+    jobWatchers = {};
+}
+
 window.hideAllFeatures = function() {
     console.log('🏠 Going back to home');
     
@@ -347,6 +409,11 @@ function cleanupPreview() {
     const previewSection = document.getElementById('previewSection');
     const videoPreview = document.getElementById('videoPreview');
     
+    if (previewHls) {
+        previewHls.destroy();
+        previewHls = null;
+    }
+    
     if (videoPreview && videoPreview.src) {
         URL.revokeObjectURL(videoPreview.src);
         videoPreview.src = '';
@@ -393,6 +460,8 @@ async function generateTranscript() {
     }
     
     showProgressModal('Generating Transcript...');
+    transcriptSegmentCount = 0;
+    closeStoryStream();
     
     try {
         const response = await fetch('/transcript', { 
@@ -405,19 +474,167 @@ async function generateTranscript() {
             })
         });
         
+        const data = await response.json();
         if (response.ok) {
-            const data = await response.json();
+            // The server queues the job; follow it until the story is ready
+            currentJobId = data.job_id;
+            startTranscriptStatusCheck(data.job_id);
+        } else {
             hideProgressModal();
+            alert('Error: ' + (data.error || 'Request failed'));
+        }
+    } catch (error) {
+        hideProgressModal();
+        alert('Transcript generation failed: ' + error.message);
+    }
+}
+
+function startTranscriptStatusCheck(jobId) {
+    if (statusInterval) clearInterval(statusInterval);
+    
+    if (watchJob(jobId, (data) => applyTranscriptStatus(jobId, data), () => startTranscriptStatusCheck(jobId))) return;
+    
+    statusInterval = setInterval(async () => {
+        try {
+            const response = await fetch(`/transcript/${jobId}/status?since=${transcriptSegmentCount}`);
+            
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            }
+            
+            const data = await response.json();
             
-            // Display transcript result
-            displayTranscriptResults(data.transcript);
+            if (applyTranscriptStatus(jobId, data)) {
+                clearInterval(statusInterval);
+            }
+        } catch (error) {
+            console.error('Transcript status check failed:', error);
+            clearInterval(statusInterval);
+            hideProgressModal();
+            showNotification('Failed to check transcript status', 'error');
+        }
+    }, 2000);
+}
+
+// Apply a transcript status update; returns true once the job has finished
+function applyTranscriptStatus(jobId, data) {
+    updateProgress(data.progress || 0, getStatusText(data.status));
+    
+    if (data.status === 'processing') {
+        // Status responses carry new segments; job events only say that progress moved
+        if ((data.progress || 0) >= 70) {
+            // Transcript is done; the story is being written
+            startStoryStream(jobId);
+        } else if (data.segments) {
+            appendTranscriptSegments(data.segments, data.segment_count);
         } else {
-            const errorData = await response.json();
-            alert('Error: ' + (errorData.error || 'Request failed'));
+            refreshTranscriptSegments(jobId);
+        }
+    } else if (data.status === 'completed') {
+        showTranscriptResult(jobId);
+        return true;
+    } else if (data.status === 'error' || data.status === 'cancelled') {
+        hideProgressModal();
+        if (data.status === 'error') {
+            alert('Transcript generation failed: ' + (data.error || 'Unknown error'));
+        }
+        return true;
+    }
+    return false;
+}
+
+async function refreshTranscriptSegments(jobId) {
+    if (transcriptSegmentsLoading) return;
+    transcriptSegmentsLoading = true;
+    try {
+        const response = await fetch(`/transcript/${jobId}/status?since=${transcriptSegmentCount}`);
+        if (response.ok) {
+            const data = await response.json();
+            appendTranscriptSegments(data.segments || [], data.segment_count);
+        }
+    } catch (error) {
+        console.error('Partial transcript fetch failed:', error);
+    } finally {
+        transcriptSegmentsLoading = false;
+    }
+}
+
+function appendTranscriptSegments(segments, total) {
+    if (!segments.length) return;
+    
+    if (transcriptSegmentCount === 0) {
+        // Show text as it arrives; the job is still followed in the background
+        document.getElementById('progressModal').classList.add('hidden');
+        displayTranscriptResults('');
+    }
+    transcriptSegmentCount = total;
+    
+    const transcriptArea = document.getElementById('transcriptResult');
+    if (transcriptArea) {
+        transcriptArea.value += segments.map(s => `[${formatTimestamp(s.start)}] ${s.text}\n`).join('');
+        transcriptArea.scrollTop = transcriptArea.scrollHeight;
+    }
+}
+
+function startStoryStream(jobId) {
+    if (storyEventSource || !window.EventSource) return;
+    
+    let started = false;
+    storyEventSource = new EventSource(`/transcript/${jobId}/story/stream`);
+    storyEventSource.addEventListener('delta', (e) => {
+        const data = JSON.parse(e.data);
+        if (!started) {
+            // Replace the transcript with the story as soon as its first words arrive
+            started = true;
+            document.getElementById('progressModal').classList.add('hidden');
+            displayTranscriptResults('');
+        }
+        const transcriptArea = document.getElementById('transcriptResult');
+        if (transcriptArea) {
+            transcriptArea.value += data.text;
+            transcriptArea.scrollTop = transcriptArea.scrollHeight;
         }
+    });
+    storyEventSource.addEventListener('done', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.story) displayTranscriptResults(data.story);
+        // Stop here; the job watcher still reports the voice step
+        storyEventSource.close();
+    });
+    storyEventSource.onerror = (e) => {
+        // An 'error' event with data is the server reporting a failed job;
+        // the job watcher shows it, so just stop instead of reconnecting
+        if (e.data) {
+            closeStoryStream();
+        } else if (storyEventSource && storyEventSource.readyState === EventSource.CLOSED) {
+            storyEventSource = null;
+        }
+    };
+}
+
+function closeStoryStream() {
+    if (storyEventSource) {
+        storyEventSource.close();
+        storyEventSource = null;
+    }
+}
+
+function formatTimestamp(seconds) {
+    const m = Math.floor(seconds / 60);
+    const s = Math.floor(seconds % 60);
+    return `${m}:${String(s).padStart(2, '0')}`;
+}
+
+async function showTranscriptResult(jobId) {
+    // Job events carry progress only; the story text comes from the status route
+    try {
+        const response = await fetch(`/transcript/${jobId}/status`);
+        const data = await response.json();
+        hideProgressModal();
+        displayTranscriptResults(data.story || data.transcript || '');
     } catch (error) {
         hideProgressModal();
-        alert('Transcript generation failed: ' + error.message);
+        alert('Could not load transcript: ' + error.message);
     }
 }
 
@@ -481,8 +698,10 @@ async function generateVoice() {
             hideProgressModal();
             document.getElementById('voiceResult').classList.remove('hidden');
             const audio = document.getElementById('voiceAudio');
+            // The URL streams audio while it is synthesised; start playing right away
             audio.src = data.audio_url;
             audio.load();
+            audio.play().catch(() => {});
             currentVoiceId = data.voice_id;
             loadJobs();
         } else {
@@ -533,8 +752,14 @@ async function cloneVoice() {
     
     showProgressModal('Cloning Voice...');
     
+    // The server keeps a profile per sample; send its ID instead of the same file again
+    const sampleKey = `${audioFile.name}:${audioFile.size}:${audioFile.lastModified}`;
     const formData = new FormData();
-    formData.append('audio', audioFile);
+    if (currentSpeaker && currentSpeaker.sampleKey === sampleKey) {
+        formData.append('speaker_id', currentSpeaker.id);
+    } else {
+        formData.append('audio', audioFile);
+    }
     formData.append('text', text);
     
     try {
@@ -542,6 +767,7 @@ async function cloneVoice() {
         const data = await response.json();
         
         if (response.ok) {
+            currentSpeaker = data.speaker_id ? { id: data.speaker_id, sampleKey } : null;
             hideProgressModal();
             document.getElementById('voiceResult').classList.remove('hidden');
             const audio = document.getElementById('voiceAudio');
@@ -549,6 +775,8 @@ async function cloneVoice() {
             audio.load();
             alert('Voice cloned successfully!');
         } else {
+            // A deleted profile is re-created from the file next time
+            currentSpeaker = null;
             hideProgressModal();
             alert('Error: ' + data.error);
         }
@@ -672,6 +900,7 @@ function hideProgressModal() {
         clearInterval(statusInterval);
         statusInterval = null;
     }
+    unwatchJobs();
 }
 
 function updateProgress(progress, status) {
@@ -767,6 +996,9 @@ function startStatusCheck(jobId) {
 function startDownloadStatusCheck(jobId) {
     if (statusInterval) clearInterval(statusInterval);
     
+    // Updates are pushed when the event stream is connected
+    if (watchJob(jobId, (data) => applyDownloadStatus(jobId, data), () => startDownloadStatusCheck(jobId))) return;
+    
     statusInterval = setInterval(async () => {
         try {
             const response = await fetch(`/status/${jobId}`);
@@ -777,18 +1009,8 @@ function startDownloadStatusCheck(jobId) {
             
             const data = await response.json();
             
-            if (data.status === 'completed') {
+            if (applyDownloadStatus(jobId, data)) {
                 clearInterval(statusInterval);
-                hideDownloadProgress();
-                showDownloadComplete(jobId);
-                loadJobs();
-            } else if (data.status === 'error') {
-                clearInterval(statusInterval);
-                hideDownloadProgress();
-                alert('Download error: ' + (data.error || 'Unknown error'));
-            } else {
-                // Update progress message
-                showDownloadProgress(`Downloading... ${data.progress || 0}%`);
             }
         } catch (error) {
             console.error('Status check failed:', error);
@@ -803,6 +1025,22 @@ function startDownloadStatusCheck(jobId) {
     }, 2000); // Check every 2 seconds instead of 1
 }
 
+function applyDownloadStatus(jobId, data) {
+    if (data.status === 'completed') {
+        hideDownloadProgress();
+        showDownloadComplete(jobId);
+        loadJobs();
+        return true;
+    } else if (data.status === 'error') {
+        hideDownloadProgress();
+        alert('Download error: ' + (data.error || 'Unknown error'));
+        return true;
+    }
+    // Update progress message
+    showDownloadProgress(`Downloading... ${data.progress || 0}%`);
+    return false;
+}
+
 // ========== NON-BLOCKING PROGRESS FUNCTIONS ==========
 function showDownloadProgress(message) {
     // Create or update progress notification
@@ -910,7 +1148,7 @@ function previewDownloadedFile(jobId) {
     const videoPreview = document.getElementById('videoPreview');
     
     if (previewSection && videoPreview) {
-        videoPreview.src = `/preview-file/${jobId}`;
+        setPreviewSource(videoPreview, jobId, `/preview-file/${jobId}`);
         previewSection.classList.remove('hidden');
         
         // Scroll to preview
@@ -918,6 +1156,35 @@ function previewDownloadedFile(jobId) {
     }
 }
 
+// Play the low-bitrate HLS proxy when it is ready, else the original file
+async function setPreviewSource(video, jobId, fallbackUrl) {
+    if (previewHls) {
+        previewHls.destroy();
+        previewHls = null;
+    }
+    
+    let hlsUrl = null;
+    try {
+        const response = await fetch(`/status/${jobId}`);
+        if (response.ok) {
+            const data = await response.json();
+            hlsUrl = data.preview_hls || null;
+        }
+    } catch (error) {
+        console.error('Preview status check failed:', error);
+    }
+    
+    if (hlsUrl && video.canPlayType('application/vnd.apple.mpegurl')) {
+        video.src = hlsUrl;  // Safari / iOS play HLS natively
+    } else if (hlsUrl && window.Hls && Hls.isSupported()) {
+        previewHls = new Hls();
+        previewHls.loadSource(hlsUrl);
+        previewHls.attachMedia(video);
+    } else {
+        video.src = fallbackUrl;
+    }
+}
+
 // ========== LOGIN STATUS ==========
 async function checkLoginStatus() {
     try {
@@ -1029,10 +1296,12 @@ function showNotification(message, type = 'info') {
     }, 3000);
 }
 
-// Enhanced status check with polling
+// Enhanced status check - event stream first, polling as fallback
 function startStatusCheck(jobId) {
     if (statusInterval) clearInterval(statusInterval);
     
+    if (watchJob(jobId, applyJobStatus, () => startStatusCheck(jobId))) return;
+    
     statusInterval = setInterval(async () => {
         try {
             const response = await fetch(`/status/${jobId}`);
@@ -1043,23 +1312,8 @@ function startStatusCheck(jobId) {
             
             const data = await response.json();
             
-            // Update progress
-            updateProgress(data.progress, data.status);
-            
-            // Handle different statuses
-            if (data.status === 'completed') {
+            if (applyJobStatus(data)) {
                 clearInterval(statusInterval);
-                handleJobCompleted(data);
-            } else if (data.status === 'error') {
-                clearInterval(statusInterval);
-                handleJobError(data);
-            } else if (data.status === 'cancelled') {
-                clearInterval(statusInterval);
-                handleJobCancelled(data);
-            } else {
-                // Still processing - update status text
-                const statusText = getStatusText(data.status);
-                document.getElementById('progressStatus').textContent = statusText;
             }
             
         } catch (error) {
@@ -1076,6 +1330,29 @@ function startStatusCheck(jobId) {
     }, 2000); // Check every 2 seconds
 }
 
+// Apply a status update; returns true once the job has finished
+function applyJobStatus(data) {
+    // Update progress
+    updateProgress(data.progress, data.status);
+    
+    // Handle different statuses
+    if (data.status === 'completed') {
+        handleJobCompleted(data);
+        return true;
+    } else if (data.status === 'error') {
+        handleJobError(data);
+        return true;
+    } else if (data.status === 'cancelled') {
+        handleJobCancelled(data);
+        return true;
+    }
+    
+    // Still processing - update status text
+    const statusText = getStatusText(data.status);
+    document.getElementById('progressStatus').textContent = statusText;
+    return false;
+}
+
 function handleJobCompleted(data) {
     document.getElementById('progressStatus').textContent = 'Completed!';
     document.getElementById('progressFill').style.width = '100%';
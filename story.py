@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Burmese story generation from transcripts, map-reduce for long inputs
+"""
+
+import re
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, List
+
+from llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+STORY_PROMPT = """
+You are NotebookLM, an AI assistant specialized in creating engaging, educational content from transcripts.
+
+Please analyze this transcript and create a compelling Burmese story that:
+1. Captures the main themes and key insights
+2. Uses natural, conversational Myanmar language
+3. Includes cultural context where appropriate
+4. Is engaging and easy to understand
+5. Follows storytelling traditions of Myanmar
+
+Format as a narrative story that flows naturally, not just a summary.
+Use rich vocabulary but keep it accessible.
+
+Original transcript:
+{transcript}
+
+Burmese story (NotebookLM style):
+"""
+
+MAP_PROMPT = """
+You are summarising part {index} of {total} of a video transcript so a storyteller can later retell the whole video.
+
+Write a detailed summary of this part in the transcript's language. Keep every key event, idea, name,
+number and quote in the order they appear. Do not add an introduction or conclusion.
+
+Transcript part {index} of {total}:
+{transcript}
+
+Summary:
+"""
+
+REDUCE_PROMPT = """
+You are NotebookLM, an AI assistant specialized in creating engaging, educational content from transcripts.
+
+The notes below summarise a long video transcript, part by part and in order.
+Using them, create one compelling Burmese story that:
+1. Captures the main themes and key insights of the whole video
+2. Uses natural, conversational Myanmar language
+3. Includes cultural context where appropriate
+4. Is engaging and easy to understand
+5. Follows storytelling traditions of Myanmar
+
+Format as a narrative story that flows naturally, not just a summary.
+Use rich vocabulary but keep it accessible.
+
+Notes:
+{summaries}
+
+Burmese story (NotebookLM style):
+"""
+
+# Bump whenever a prompt above changes so cached responses are not reused
+PROMPT_VERSION = '1'
+
+# Upper bound on re-summarising summaries that are still over budget
+MAX_SUMMARY_ROUNDS = 3
+
+# Sentence ends in Latin scripts and Myanmar (။); newlines also break
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?။])\s+|\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound token estimate without calling the API
+
+    Roughly four bytes per token: about four characters of English, while
+    Myanmar text (three UTF-8 bytes per character) is counted closer to
+    its real, much higher token density.
+    """
+    return len(text.encode('utf-8')) // 4 + 1
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Pack sentences into chunks of at most max_tokens
+
+    A single sentence longer than the budget is split on whitespace.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        pieces = [sentence]
+        if estimate_tokens(sentence) > max_tokens:
+            pieces, piece = [], []
+            for word in sentence.split():
+                if piece and estimate_tokens(' '.join(piece + [word])) > max_tokens:
+                    pieces.append(' '.join(piece))
+                    piece = []
+                piece.append(word)
+            if piece:
+                pieces.append(' '.join(piece))
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+class StoryGenerator:
+    """Turn a transcript into a Burmese story with a pluggable LLM client
+
+    Transcripts that fit ``chunk_tokens`` go to the model in one call. Longer
+    ones are split into chunks that are summarised concurrently (at most
+    ``concurrency`` calls in flight across all jobs), then one reduce call
+    writes the story from the ordered summaries. If the summaries are still
+    too long they are summarised again first (up to MAX_SUMMARY_ROUNDS).
+    """
+
+    def __init__(self, client: LLMClient, chunk_tokens: int = 8000, concurrency: int = 4):
+        self.client = client
+        self.chunk_tokens = chunk_tokens
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _call(self, prompt: str) -> str:
+        async with self._semaphore:
+            return await self.client.generate(prompt)
+
+    async def summarise(self, text: str) -> List[str]:
+        """Map step: one summary per chunk, in transcript order"""
+        chunks = split_text(text, self.chunk_tokens)
+        start = time.time()
+        summaries = await asyncio.gather(*(
+            self._call(MAP_PROMPT.format(index=i + 1, total=len(chunks), transcript=chunk))
+            for i, chunk in enumerate(chunks)))
+        logger.info(f"Summarised {len(chunks)} transcript chunks in {time.time() - start:.1f}s")
+        return list(summaries)
+
+    async def generate(self, transcript: str) -> str:
+        return ''.join([piece async for piece in self.stream(transcript)])
+
+    async def stream(self, transcript: str) -> AsyncIterator[str]:
+        """Yield the story as the model writes it
+
+        Only the final call is streamed; map steps for long transcripts
+        still finish before the first piece arrives.
+        """
+        prompt = await self._story_prompt(transcript)
+        async with self._semaphore:
+            async for piece in self.client.stream(prompt):
+                yield piece
+
+    async def _story_prompt(self, transcript: str) -> str:
+        """Prompt for the call that writes the story, summarising first if needed"""
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            return STORY_PROMPT.format(transcript=transcript)
+
+        summaries = await self.summarise(transcript)
+        notes = '\n\n'.join(f"Part {i + 1}:\n{s.strip()}" for i, s in enumerate(summaries))
+        for _ in range(MAX_SUMMARY_ROUNDS):
+            if estimate_tokens(notes) <= self.chunk_tokens or len(summaries) == 1:
+                break
+            summaries = await self.summarise(notes)
+            notes = '\n\n'.join(f"Part {i + 1}:\n{s.strip()}" for i, s in enumerate(summaries))
+        return REDUCE_PROMPT.format(summaries=notes)
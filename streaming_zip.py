@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Streaming ZIP writer - yields archive bytes as entries are written
+"""
+
+import os
+import logging
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-compressed formats gain nothing from deflate; store them as-is
+STORED_EXTENSIONS = {'.mp3', '.mp4', '.m4a', '.aac', '.wav', '.zip', '.jpg', '.jpeg', '.png'}
+
+
+class _ChunkSink:
+    """Write-only, unseekable sink that collects bytes until drained
+
+    zipfile detects the missing seek/tell and switches to data descriptors,
+    so entries can be emitted without rewinding to patch their headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries: Iterable[Tuple[str, str]], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a ZIP archive of (path, arcname) entries chunk by chunk
+
+    Missing files are skipped. Memory use is bounded by chunk_size rather
+    than by the size of the archive.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as zf:
+        for path, arcname in entries:
+            if not os.path.exists(path):
+                continue
+            ext = os.path.splitext(path)[1].lower()
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            size = os.path.getsize(path)
+            with open(path, 'rb') as src, zf.open(info, 'w', force_zip64=size >= zipfile.ZIP64_LIMIT) as dest:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dest.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory is written when the archive is closed
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def tee_to_file(chunks: Iterable[bytes], path: str) -> Iterator[bytes]:
+    """Pass chunks through while saving them to path for later requests
+
+    The file only appears once the stream completed, so an aborted download
+    never leaves a truncated cache entry behind.
+    """
+    tmp_path = f"{path}.part-{os.getpid()}-{id(chunks)}"
+    completed = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, path)
+        completed = True
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
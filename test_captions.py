@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Offline checks for caption-first transcription (no server or network needed)
+"""
+
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from captions import parse_caption_file, choose_caption_track, parse_timestamp
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_fixtures', 'captions')
+
+def test_rolling_auto_captions():
+    """YouTube auto captions repeat the previous line in every cue"""
+    result = parse_caption_file(os.path.join(FIXTURES, 'auto_rolling.en.vtt'), 'en')
+    texts = [s['text'] for s in result['segments']]
+    print(f"Segments: {texts}")
+    assert texts == ["welcome back to the channel", "today we're cooking mohinga",
+                     "Myanmar's national dish"], texts
+    assert result['segments'][1]['start'] == 2.96
+    assert result['source'] == 'captions'
+
+def test_srt():
+    result = parse_caption_file(os.path.join(FIXTURES, 'uploaded.srt'))
+    segments = result['segments']
+    print(f"Segments: {segments}")
+    assert segments[0]['text'] == 'Hello and welcome.'
+    assert segments[1]['text'] == 'This episode is about the history of Bagan.'
+    assert segments[2]['start'] == 3600.0 and segments[2]['text'] == 'See you next time.'
+
+def test_timestamps():
+    assert parse_timestamp('01:02:03.450') == 3723.45
+    assert parse_timestamp('02:03,450') == 123.45
+
+def test_track_choice():
+    info = {
+        'language': 'en',
+        'subtitles': {'my': [{'ext': 'json3', 'url': 'u0'}, {'ext': 'vtt', 'url': 'u1'}]},
+        'automatic_captions': {
+            'en-orig': [{'ext': 'vtt', 'url': 'u2'}],
+            'fr': [{'ext': 'vtt', 'url': 'u3'}],
+        },
+    }
+    assert choose_caption_track(info) == ('my', 'vtt', 'u1')
+    assert choose_caption_track(info, ['en']) == ('en', 'vtt', 'u2')
+    # Machine-translated automatic captions are never used
+    assert choose_caption_track(info, ['fr']) is None
+    assert choose_caption_track({'automatic_captions': {'de': [{'ext': 'vtt', 'url': 'x'}]}}) is None
+
+if __name__ == '__main__':
+    for test in (test_rolling_auto_captions, test_srt, test_timestamps, test_track_choice):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All caption tests passed")
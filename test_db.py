@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the SQLite connection pool and the TTL/LRU cache
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import Database, TTLCache
+
+def make_db(**kwargs):
+    db = Database(os.path.join(tempfile.mkdtemp(), 'test.db'), **kwargs)
+    db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    return db
+
+def test_connection_returned_after_exception():
+    # With a single connection any leak would make the next checkout time out
+    db = make_db(pool_size=1, pool_timeout=0.2)
+    try:
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('rolled back')")
+            raise ValueError('boom')
+    except ValueError:
+        pass
+    try:
+        db.execute("INSERT INTO missing_table VALUES (1)")
+        assert False, 'expected the bad statement to raise'
+    except sqlite3.OperationalError:
+        pass
+    try:
+        with db.connection():
+            raise KeyError('boom')
+    except KeyError:
+        pass
+
+    # The failed transaction was rolled back and the pool still works
+    assert db.query("SELECT name FROM items") == []
+    assert db.execute("INSERT INTO items (name) VALUES (?)", ('kept',)) == 1
+    assert db.query_one("SELECT name FROM items")['name'] == 'kept'
+    assert db._opened == 1
+
+def test_execute_returns_rowcount():
+    db = make_db()
+    for name in ('a', 'b', 'c'):
+        db.execute("INSERT INTO items (name) VALUES (?)", (name,))
+    assert db.execute("UPDATE items SET name = 'z' WHERE name != 'a'") == 2
+    assert db.execute("DELETE FROM items WHERE name = 'missing'") == 0
+    assert [row['name'] for row in db.query("SELECT name FROM items ORDER BY id")] == ['a', 'z', 'z']
+
+def test_pool_is_bounded():
+    db = make_db(pool_size=2, pool_timeout=5)
+    inside = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker():
+        with db.connection() as conn:
+            with lock:
+                inside.append(1)
+                peak.append(len(inside))
+            time.sleep(0.05)
+            conn.execute("SELECT 1").fetchone()
+            with lock:
+                inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Callers beyond pool_size waited for a returned connection
+    assert max(peak) == 2 and db._opened == 2
+
+    db.close()
+    assert db._opened == 0
+
+    db = make_db(pool_size=1, pool_timeout=0.05)
+    with db.connection():
+        try:
+            db.acquire()
+            assert False, 'expected the pool to be exhausted'
+        except RuntimeError:
+            pass
+
+def test_ttl_cache_expiry_and_lru():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' is now the most recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+    cache.invalidate('a')
+    assert cache.get('a', 'default') == 'default'
+
+    time.sleep(0.06)
+    assert cache.get('c') is None
+    assert len(cache) == 0
+
+    # Falsy values are cached too
+    cache.set('zero', 0)
+    assert cache.get('zero', 'missing') == 0
+    cache.clear()
+    assert len(cache) == 0
+
+if __name__ == '__main__':
+    for test in (test_connection_returned_after_exception, test_execute_returns_rowcount,
+                 test_pool_is_bounded, test_ttl_cache_expiry_and_lru):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All database tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the job event hub and SSE encoding
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from events import JobEventHub, format_sse, job_event
+from job_store import JobRecord
+
+def test_latest_event_per_job():
+    hub = JobEventHub()
+    subscription = hub.subscribe(1)
+    for progress in (10, 20, 30):
+        hub.publish(1, {'id': 'a', 'status': 'processing', 'progress': progress})
+    hub.publish(1, {'id': 'b', 'status': 'queued', 'progress': 0})
+    hub.publish(1, {'id': 'a', 'status': 'completed', 'progress': 100})
+
+    events = subscription.drain(timeout=0)
+    # One event per job, the newest state, in the order jobs last changed
+    assert [(e['id'], e['status'], e['progress']) for e in events] == [
+        ('b', 'queued', 0), ('a', 'completed', 100)]
+    assert events[0]['seq'] < events[1]['seq']
+    assert subscription.drain(timeout=0) == []
+
+def test_events_reach_only_the_users_streams():
+    hub = JobEventHub()
+    first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+    assert hub.subscriber_count() == 3
+    hub.publish(1, {'id': 'a', 'status': 'queued'})
+    assert len(first.drain(0)) == len(second.drain(0)) == 1
+    assert other.drain(0) == []
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    assert first.closed and hub.subscriber_count() == 1
+    hub.publish(1, {'id': 'a', 'status': 'completed'})
+    assert first.drain(0) == []
+
+def test_drain_wakes_on_publish_and_close():
+    hub = JobEventHub()
+    subscription = hub.subscribe(1)
+    threading.Timer(0.05, hub.publish, (1, {'id': 'a', 'status': 'queued'})).start()
+    start = time.monotonic()
+    assert [e['id'] for e in subscription.drain(timeout=5)] == ['a']
+    assert time.monotonic() - start < 1
+
+    threading.Timer(0.05, hub.unsubscribe, (subscription,)).start()
+    start = time.monotonic()
+    assert subscription.drain(timeout=5) == []
+    assert time.monotonic() - start < 1
+
+def test_job_event_and_sse_format():
+    job = JobRecord(id='j1', user_id=1, filename='clip.mp4', status='error', progress=40)
+    assert job_event(job) == {'id': 'j1', 'status': 'error', 'progress': 40, 'filename': 'clip.mp4',
+                              'error': 'Unknown error'}
+    job = JobRecord(id='j2', user_id=1, filename='clip.mp4', status='completed', progress=100,
+                    output_path='/tmp/out.mp4')
+    assert job_event(job)['output_url'] == '/download/j2'
+
+    message = format_sse({'seq': 7, 'id': 'j2'}, event='job')
+    assert message.startswith('id: 7\nevent: job\ndata: ') and message.endswith('\n\n')
+    assert json.loads(message.split('data: ', 1)[1]) == {'seq': 7, 'id': 'j2'}
+    # Newlines in the payload stay inside one data line
+    message = format_sse({'text': 'line one\nline two'})
+    assert message.count('\n') == 2 and json.loads(message[len('data: '):]) == {'text': 'line one\nline two'}
+
+if __name__ == '__main__':
+    for test in (test_latest_event_per_job, test_events_reach_only_the_users_streams,
+                 test_drain_wakes_on_publish_and_close, test_job_event_and_sse_format):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All event tests passed")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Checks for media delivery through X-Accel-Redirect and the send_file fallback
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+from flask import Flask
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from file_delivery import MediaDelivery, content_disposition, follow_file
+
+def make_client():
+    root = tempfile.mkdtemp()
+    media_folder = os.path.join(root, 'outputs')
+    os.makedirs(media_folder)
+    with open(os.path.join(media_folder, 'clip one.mp4'), 'wb') as f:
+        f.write(b'0123456789')
+    with open(os.path.join(root, 'secret.txt'), 'w') as f:
+        f.write('not media')
+
+    media = MediaDelivery({media_folder: '/protected/outputs'})
+    app = Flask(__name__)
+
+    @app.route('/file/<path:name>')
+    def serve(name):
+        response = media.send(os.path.join(media_folder, name), as_attachment=True,
+                              download_name='ဗီဒီယို.mp4')
+        return response or ('missing', 404)
+
+    return app.test_client(), media, media_folder
+
+def test_internal_uri():
+    _, media, media_folder = make_client()
+    assert media.internal_uri(os.path.join(media_folder, 'clip one.mp4')) == '/protected/outputs/clip%20one.mp4'
+    # Paths that resolve outside the media folders are never mapped
+    assert media.internal_uri(os.path.join(media_folder, '..', 'secret.txt')) is None
+    assert media.internal_uri(media_folder + '-other/x.mp4') is None
+
+def test_accel_redirect_behind_nginx():
+    client, _, _ = make_client()
+    response = client.get('/file/clip one.mp4', headers={'X-Sendfile-Type': 'X-Accel-Redirect'})
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/protected/outputs/clip%20one.mp4'
+    assert response.headers['Content-Type'] == 'video/mp4'
+    assert response.headers['Content-Disposition'] == content_disposition('ဗီဒီယို.mp4')
+    # nginx sends the body
+    assert response.get_data() == b''
+
+    assert client.get('/file/../secret.txt', headers={'X-Sendfile-Type': 'X-Accel-Redirect'}).status_code == 404
+    assert client.get('/file/missing.mp4').status_code == 404
+
+def test_send_file_fallback_is_conditional():
+    client, _, _ = make_client()
+    response = client.get('/file/clip one.mp4')
+    assert response.status_code == 200 and response.get_data() == b'0123456789'
+    assert 'X-Accel-Redirect' not in response.headers
+    etag = response.headers['ETag']
+
+    assert client.get('/file/clip one.mp4', headers={'If-None-Match': etag}).status_code == 304
+    partial = client.get('/file/clip one.mp4', headers={'Range': 'bytes=2-5'})
+    assert partial.status_code == 206 and partial.get_data() == b'2345'
+
+def test_content_disposition():
+    assert content_disposition('story.zip') == 'attachment; filename="story.zip"'
+    header = content_disposition('ပုံပြင်.zip')
+    assert header.startswith('attachment; filename=".zip"; filename*=UTF-8\'\'')
+    assert content_disposition('"quoted".txt') == 'attachment; filename="quoted.txt"; ' \
+                                                  'filename*=UTF-8\'\'%22quoted%22.txt'
+
+def test_follow_file():
+    path = os.path.join(tempfile.mkdtemp(), 'growing.txt.part')
+    done = threading.Event()
+
+    def writer():
+        time.sleep(0.05)
+        with open(path, 'wb') as f:
+            for piece in (b'one ', b'two ', b'three'):
+                f.write(piece)
+                f.flush()
+                time.sleep(0.05)
+        done.set()
+
+    threading.Thread(target=writer).start()
+    data = b''.join(follow_file(path, lambda: not done.is_set(), chunk_size=4, poll_interval=0.01))
+    assert data == b'one two three'
+
+    # A file that never appears ends the stream once the writer is gone
+    assert list(follow_file(path + '.missing', lambda: False)) == []
+
+if __name__ == '__main__':
+    for test in (test_internal_uri, test_accel_redirect_behind_nginx, test_send_file_fallback_is_conditional,
+                 test_content_disposition, test_follow_file):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All file delivery tests passed")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the job cache against a temporary SQLite database
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import Database
+from job_store import JobStore
+
+# Columns of the jobs table as created and migrated by app.init_db
+JOBS_TABLE = '''CREATE TABLE jobs
+                (id TEXT PRIMARY KEY, user_id INTEGER, filename TEXT, type TEXT, status TEXT,
+                 created_at TIMESTAMP, output_path TEXT, progress INTEGER, error TEXT,
+                 input_path TEXT, output_file TEXT, transcript_path TEXT, story_path TEXT,
+                 voice_path TEXT, file_type TEXT, finished_at REAL, preview_playlist TEXT)'''
+
+BASE_TIME = 1700000000.0
+
+def make_store(**kwargs):
+    db = Database(os.path.join(tempfile.mkdtemp(), 'jobs.db'))
+    db.execute(JOBS_TABLE)
+    return JobStore(db, **kwargs)
+
+def add_job(store, n, status='completed', user_id=1, **fields):
+    job_id = f"job-{n:03d}"
+    store[job_id] = dict({'user_id': user_id, 'filename': f"{job_id}.mp4", 'status': status,
+                          'created_at': BASE_TIME + n}, **fields)
+    return job_id
+
+def all_pages(store, user_id=1, limit=4, statuses=None):
+    ids, cursor = [], None
+    while True:
+        page, cursor = store.page_user_jobs(user_id, limit, cursor, statuses)
+        ids += [job.id for job in page]
+        if cursor is None:
+            return ids
+
+def test_keyset_pagination():
+    store = make_store()
+    for n in range(25):
+        add_job(store, n, status='completed' if n % 3 else 'error')
+    add_job(store, 100, user_id=2)
+
+    page, cursor = store.page_user_jobs(1, 10)
+    assert [job.id for job in page] == [f"job-{n:03d}" for n in range(24, 14, -1)]
+    assert cursor == f"{BASE_TIME + 15!r}:job-015"
+    assert all_pages(store, limit=10) == [f"job-{n:03d}" for n in range(24, -1, -1)]
+
+    # Status filters walk their own index, newest first
+    errors = all_pages(store, statuses=['error'])
+    assert errors == [f"job-{n:03d}" for n in range(24, -1, -1) if n % 3 == 0], errors
+    store['job-001']['status'] = 'error'
+    assert 'job-001' in all_pages(store, statuses=['error'])
+    assert 'job-001' not in all_pages(store, statuses=['completed'])
+    assert len(all_pages(store, statuses=['completed', 'error'])) == 25
+
+def test_merge_across_db_horizon():
+    store = make_store(ttl=60)
+    # Older jobs finished long ago and leave memory
+    for n in range(10):
+        add_job(store, n, finished_at=BASE_TIME + n)
+    # One still running from before the horizon, plus newer jobs
+    add_job(store, 50, status='processing', created_at=BASE_TIME + 4.5)
+    for n in range(10, 15):
+        add_job(store, n)
+
+    assert store.evict_expired() == 10
+    assert len(store) == 6
+    assert store._db_horizon(1) == BASE_TIME + 9
+
+    ids = all_pages(store, limit=4)
+    expected = [f"job-{n:03d}" for n in range(14, 4, -1)] + ['job-050']
+    expected += [f"job-{n:03d}" for n in range(4, -1, -1)]
+    assert ids == expected, ids
+    assert all_pages(store, limit=4, statuses=['processing']) == ['job-050']
+
+    # A fresh process finds everything that was persisted
+    restarted = JobStore(store.db)
+    assert all_pages(restarted, limit=3) == [f"job-{n:03d}" for n in range(9, -1, -1)]
+
+def test_persist_keeps_created_at():
+    store = make_store()
+    add_job(store, 1, status='processing')
+    store['job-001']['status'] = 'completed'
+    store.persist('job-001')
+    row = store.db.query_one("SELECT * FROM jobs WHERE id = ?", ('job-001',))
+    assert JobStore(store.db).get('job-001').created_at == BASE_TIME + 1
+    assert row['status'] == 'completed'
+
+def test_ttl_eviction():
+    evicted = []
+    store = make_store(ttl=60, on_evict=lambda job: evicted.append(job.id))
+    now = time.time()
+    add_job(store, 1, finished_at=now - 120)
+    add_job(store, 2, finished_at=now)
+    add_job(store, 3, status='processing')
+
+    assert store.evict_expired() == 1
+    assert evicted == ['job-001']
+    assert [job_id for job_id, _ in store.items()] == ['job-002', 'job-003']
+    # Still reachable, now read back from the jobs table
+    job = store['job-001']
+    assert job.version is None and job.status == 'completed'
+    assert job.etag() == 'job-001-db'
+
+def test_eviction_io_outside_lock():
+    blocked = []
+
+    def on_evict(job):
+        # Another request thread must not wait behind the eviction's disk I/O
+        reader = threading.Thread(target=store.get, args=('job-002',))
+        reader.start()
+        reader.join(timeout=1)
+        blocked.append(reader.is_alive())
+        # Still reachable while its row is being written
+        blocked.append(store.get(job.id) is not job)
+
+    store = make_store(ttl=60, on_evict=on_evict)
+    add_job(store, 1, finished_at=0)
+    add_job(store, 2, status='processing')
+    assert store.evict_expired() == 1
+    assert blocked == [False, False]
+    assert store.get('job-001').version is None
+
+def test_miss_cache():
+    store = make_store()
+    queries = []
+    store.db.query_one = lambda sql, params=(), _query=store.db.query_one: queries.append(sql) or _query(sql, params)
+
+    for _ in range(3):
+        assert 'job-404' not in store and store.get('job-404') is None
+    assert len(queries) == 1
+    # Creating the job forgets the miss
+    add_job(store, 404)
+    assert store['job-404'].filename == 'job-404.mp4'
+
+def test_overflow_eviction():
+    store = make_store(max_jobs=3)
+    add_job(store, 1, status='processing')
+    for n in range(2, 6):
+        add_job(store, n)
+
+    # Only finished jobs are evicted, oldest first
+    assert [job_id for job_id, _ in store.items()] == ['job-001', 'job-004', 'job-005']
+    assert 'job-002' in store and store.get('job-003').filename == 'job-003.mp4'
+
+    del store['job-004']
+    assert 'job-004' not in store
+
+def test_lazy_text_fields():
+    folder = tempfile.mkdtemp()
+    transcript_path = os.path.join(folder, 'transcript.txt')
+    with open(transcript_path, 'w', encoding='utf-8') as f:
+        f.write('မင်္ဂလာပါ')
+
+    store = make_store(ttl=0)
+    add_job(store, 1, status='processing')
+    job = store['job-001']
+    assert 'transcript' not in job and job.get('story') is None
+    try:
+        job['story'] = 'text'
+        assert False, 'story set without story_path'
+    except KeyError:
+        pass
+
+    job['transcript_path'] = transcript_path
+    # The payload is never kept on the record; the file is the source of truth
+    job['transcript'] = 'ignored'
+    assert job['transcript'] == 'မင်္ဂလာပါ'
+    assert 'transcript' not in job.to_dict()
+
+    job['status'] = 'completed'
+    job['finished_at'] = 0
+    assert store.evict_expired() == 1
+    assert store['job-001']['transcript'] == 'မင်္ဂလာပါ'
+
+def test_append_segments():
+    store = make_store()
+    add_job(store, 1, status='processing')
+    job = store['job-001']
+    etag = job.etag()
+    job.append('segments', {'id': 0, 'text': 'one'})
+    segments = job['segments']
+    job.append('segments', {'id': 1, 'text': 'two'})
+    # Appended in place; the ETag still changes with every segment
+    assert job['segments'] is segments and [s['text'] for s in segments] == ['one', 'two']
+    assert job.etag() != etag
+
+if __name__ == '__main__':
+    for test in (test_keyset_pagination, test_merge_across_db_horizon, test_persist_keeps_created_at,
+                 test_ttl_eviction, test_eviction_io_outside_lock, test_miss_cache,
+                 test_overflow_eviction, test_lazy_text_fields, test_append_segments):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All job store tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the persistent LLM response cache and request coalescing
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import Database
+from llm import StubLLMClient
+from llm_cache import CachedLLMClient
+
+# Same shape as the llm_cache table created by app.init_db
+LLM_CACHE_TABLE = '''CREATE TABLE llm_cache
+                     (key TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, response TEXT,
+                      size INTEGER, created_at REAL, last_used REAL, hits INTEGER DEFAULT 0)'''
+
+class FlakyClient(StubLLMClient):
+    """Stub client whose first ``failures`` calls raise"""
+
+    def __init__(self, failures=0, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def generate(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError('upstream down')
+        return self.reply(prompt)
+
+def make_client(upstream, db=None):
+    if db is None:
+        db = Database(os.path.join(tempfile.mkdtemp(), 'cache.db'))
+        db.execute(LLM_CACHE_TABLE)
+    return CachedLLMClient(upstream, db, prompt_version='test')
+
+def test_concurrent_identical_prompts_coalesce():
+    upstream = StubLLMClient(latency=0.05)
+    client = make_client(upstream)
+
+    async def run():
+        return await asyncio.gather(*(client.generate('tell me a story') for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert len(set(responses)) == 1
+    assert upstream.calls == 1
+    assert client.misses == 1 and client.coalesced == 4
+
+def test_stream_and_generate_share_inflight():
+    upstream = StubLLMClient(latency=0.05)
+    client = make_client(upstream)
+
+    async def run():
+        async def streamed():
+            return ''.join([piece async for piece in client.stream('same prompt')])
+        return await asyncio.gather(streamed(), client.generate('same prompt'), streamed())
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == upstream.reply('same prompt')
+    assert upstream.calls == 1
+
+def test_cache_hit():
+    upstream = StubLLMClient()
+    client = make_client(upstream)
+
+    async def run():
+        first = await client.generate('prompt')
+        return first, await client.generate('prompt'), [p async for p in client.stream('prompt')]
+
+    first, second, streamed = asyncio.run(run())
+    assert first == second == ''.join(streamed)
+    assert upstream.calls == 1 and client.hits == 2
+    row = client.db.query_one("SELECT hits FROM llm_cache")
+    assert row['hits'] == 2
+    # A new client on the same database (another worker, a restart) hits too
+    assert asyncio.run(make_client(upstream, client.db).generate('prompt')) == first
+    assert upstream.calls == 1
+
+def test_failure_does_not_poison_later_callers():
+    upstream = FlakyClient(failures=1, latency=0.05)
+    client = make_client(upstream)
+
+    async def run():
+        results = await asyncio.gather(*(client.generate('prompt') for _ in range(3)),
+                                       return_exceptions=True)
+        # Waiters share the failed attempt; nothing is cached or left in flight
+        assert all(isinstance(r, ConnectionError) for r in results), results
+        assert client._inflight == {}
+        return await client.generate('prompt')
+
+    assert asyncio.run(run()) == upstream.reply('prompt')
+    assert upstream.calls == 2
+    assert client.db.query_one("SELECT COUNT(*) AS n FROM llm_cache")['n'] == 1
+
+if __name__ == '__main__':
+    for test in (test_concurrent_identical_prompts_coalesce, test_stream_and_generate_share_inflight,
+                 test_cache_hit, test_failure_does_not_poison_later_callers):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All LLM cache tests passed")
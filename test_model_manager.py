@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the model manager's memory budget, pinning and idle reaper
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_manager import ModelManager
+
+class Loader:
+    """Model loader that counts how often it ran"""
+
+    def __init__(self, name):
+        self.name = name
+        self.loads = 0
+
+    def __call__(self):
+        self.loads += 1
+        return f"{self.name}-model-{self.loads}"
+
+def make_manager(sizes, **kwargs):
+    manager = ModelManager(**kwargs)
+    loaders = {}
+    for name, size_mb in sizes.items():
+        loaders[name] = Loader(name)
+        manager.register(name, loaders[name], size_mb)
+    return manager, loaders
+
+def resident(manager):
+    return sorted(name for name, info in manager.status().items() if info['resident'])
+
+def test_loaded_once_and_unloaded_under_budget():
+    manager, loaders = make_manager({'a': 400, 'b': 400, 'c': 400}, memory_budget_mb=1000, idle_timeout=0)
+    assert manager.get('a') == 'a-model-1'
+    assert manager.get('a') == 'a-model-1'
+    assert loaders['a'].loads == 1
+
+    manager.get('b')
+    time.sleep(0.01)
+    manager.get('a')
+    time.sleep(0.01)
+    # Loading c would exceed the budget, so the least recently used model goes
+    manager.get('c')
+    assert resident(manager) == ['a', 'c']
+    assert manager.resident_mb() == 800
+
+    # An unloaded model is loaded again on its next use
+    assert manager.get('b') == 'b-model-2'
+    assert resident(manager) == ['b', 'c']
+
+    try:
+        manager.get('missing')
+        assert False, 'expected an unknown model to raise'
+    except KeyError:
+        pass
+
+def test_in_use_models_are_pinned():
+    manager, loaders = make_manager({'a': 600, 'b': 600}, memory_budget_mb=1000, idle_timeout=0)
+    with manager.use('a') as model:
+        assert model == 'a-model-1'
+        assert manager.status()['a']['in_use'] == 1
+        assert manager.unload('a') is False
+        # Nothing idle can make room, so b is loaded over budget rather than failing
+        manager.get('b')
+        assert resident(manager) == ['a', 'b']
+    assert manager.status()['a']['in_use'] == 0
+
+    with manager.use('b'):
+        time.sleep(0.01)
+        manager.unload('a')
+        manager.get('a')
+        # b is pinned, so it survives even though it is the least recently used
+        assert resident(manager) == ['a', 'b']
+    assert manager.unload('b') is True
+    assert manager.unload('b') is False
+    assert loaders['a'].loads == 2 and loaders['b'].loads == 1
+
+def test_idle_reaper():
+    manager, _ = make_manager({'a': 100, 'b': 100}, idle_timeout=0.2)
+    manager.get('a')
+    with manager.use('b'):
+        # The reaper wakes every second at the shortest
+        deadline = time.time() + 3
+        while 'a' in resident(manager) and time.time() < deadline:
+            time.sleep(0.05)
+        assert resident(manager) == ['b']
+    # Released models are reaped once they have been idle long enough
+    assert manager.unload_idle() == 0
+    time.sleep(0.25)
+    manager.unload_idle()
+    assert resident(manager) == []
+
+if __name__ == '__main__':
+    for test in (test_loaded_once_and_unloaded_under_budget, test_in_use_models_are_pinned, test_idle_reaper):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All model manager tests passed")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the PCM disk cache
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pcm_cache import PCMCache, source_key
+
+def write_pcm(cache, key, samples):
+    with cache.writer(key) as f:
+        f.write(np.asarray(samples, dtype=np.float32).tobytes())
+
+def test_write_and_map():
+    cache = PCMCache(tempfile.mkdtemp())
+    assert cache.get('clip') is None
+    samples = np.linspace(-1, 1, 1000, dtype=np.float32)
+    write_pcm(cache, 'clip', samples)
+
+    mapped = cache.get('clip')
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(mapped, samples)
+    assert os.listdir(cache.folder) == ['clip.f32']
+
+def test_failed_write_publishes_nothing():
+    cache = PCMCache(tempfile.mkdtemp())
+    try:
+        with cache.writer('clip') as f:
+            f.write(b'\0' * 64)
+            raise RuntimeError('decoder died')
+    except RuntimeError:
+        pass
+    assert cache.get('clip') is None
+    assert os.listdir(cache.folder) == []
+
+    # An empty file counts as a miss
+    write_pcm(cache, 'empty', [])
+    assert cache.get('empty') is None
+
+def test_evicts_least_recently_used():
+    cache = PCMCache(tempfile.mkdtemp(), max_bytes=2 * 4000)
+    write_pcm(cache, 'first', np.zeros(1000))
+    write_pcm(cache, 'second', np.zeros(1000))
+    past = time.time() - 60
+    os.utime(cache.path('first'), (past, past))
+    os.utime(cache.path('second'), (past + 1, past + 1))
+    # Reading refreshes the entry, so 'second' is now the oldest
+    assert cache.get('first') is not None
+
+    write_pcm(cache, 'third', np.zeros(1000))
+    assert sorted(os.listdir(cache.folder)) == ['first.f32', 'third.f32']
+
+def test_source_key():
+    assert source_key('dQw4w9WgXcQ') == 'youtube_dQw4w9WgXcQ'
+    assert source_key('12345', extractor='Vimeo') == 'vimeo_12345'
+    # IDs from different extractors never collide, and path characters are dropped
+    assert source_key('../etc', extractor='generic') == 'generic_etc'
+    url_key = source_key(url='https://example.com/talk.mp4')
+    assert url_key.startswith('url_') and url_key == source_key(url='https://example.com/talk.mp4')
+    assert url_key != source_key(url='https://example.com/other.mp4')
+
+if __name__ == '__main__':
+    for test in (test_write_and_map, test_failed_write_publishes_nothing, test_evicts_least_recently_used,
+                 test_source_key):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All PCM cache tests passed")
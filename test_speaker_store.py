@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Offline checks for saved speaker profiles with a fake XTTS model
+"""
+
+import os
+import sys
+import wave
+import pickle
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import Database
+from speaker_store import SpeakerStore
+
+# Columns of the speakers table as created by app.init_db
+SPEAKERS_TABLE = '''CREATE TABLE speakers
+                    (id TEXT PRIMARY KEY, user_id INTEGER, name TEXT, sample_path TEXT, sample_hash TEXT,
+                     latents_path TEXT, model TEXT, created_at TIMESTAMP)'''
+
+class FakeXTTS:
+    """Conditioning is counted; each inference returns 0.1s of audio"""
+
+    def __init__(self):
+        self.conditioning_calls = 0
+        self.sentences = []
+
+    def get_conditioning_latents(self, audio_path):
+        self.conditioning_calls += 1
+        return f"gpt:{os.path.basename(audio_path[0])}", 'embedding'
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding):
+        self.sentences.append(text)
+        return {'wav': np.full(2400, 0.5, dtype=np.float32)}
+
+class PickleSpeakerStore(SpeakerStore):
+    """Saves latents with pickle so the checks run without torch"""
+
+    def _save_latents(self, speaker_id, latents):
+        latents_path = os.path.join(self.folder, f"{speaker_id}.pt")
+        with open(latents_path, 'wb') as f:
+            pickle.dump(latents, f)
+        return latents_path
+
+def make_store(model='xtts_v2'):
+    folder = tempfile.mkdtemp()
+    db = Database(os.path.join(folder, 'speakers.db'))
+    db.execute(SPEAKERS_TABLE)
+    xtts = FakeXTTS()
+    tts = SimpleNamespace(synthesizer=SimpleNamespace(tts_model=xtts, output_sample_rate=24000))
+    sample_path = os.path.join(folder, 'sample.wav')
+    with open(sample_path, 'wb') as f:
+        f.write(b'RIFF fake sample')
+    return PickleSpeakerStore(db, os.path.join(folder, 'speakers'), model), tts, xtts, sample_path
+
+def test_create_reuses_identical_sample():
+    store, tts, xtts, sample_path = make_store()
+    speaker_id = store.create(tts, 1, sample_path, name='Grandma')
+    assert store.create(tts, 1, sample_path) == speaker_id
+    # The same sample from another user is a separate profile
+    other_id = store.create(tts, 2, sample_path)
+    assert other_id != speaker_id
+    assert xtts.conditioning_calls == 2
+
+    speaker = store.get(speaker_id, 1)
+    assert speaker['name'] == 'Grandma' and os.path.exists(speaker['sample_path'])
+    assert store.get(speaker_id, 2) is None
+    assert [s['id'] for s in store.for_user(1)] == [speaker_id]
+
+def test_latents_cached_and_recomputed_for_new_model():
+    store, tts, xtts, sample_path = make_store()
+    speaker = store.get(store.create(tts, 1, sample_path), 1)
+    # Served from memory, not recomputed per request
+    assert store.latents(tts, speaker)['speaker_embedding'] == 'embedding'
+    assert xtts.conditioning_calls == 1
+
+    # A worker running another model recomputes once and records the new model
+    upgraded = PickleSpeakerStore(store.db, store.folder, 'xtts_v3')
+    upgraded.latents(tts, upgraded.get(speaker['id'], 1))
+    upgraded.latents(tts, upgraded.get(speaker['id'], 1))
+    assert xtts.conditioning_calls == 2
+    assert upgraded.get(speaker['id'], 1)['model'] == 'xtts_v3'
+
+def test_synthesize_sentence_by_sentence():
+    store, tts, xtts, sample_path = make_store()
+    speaker = store.get(store.create(tts, 1, sample_path), 1)
+    output_path = os.path.join(store.folder, 'out.wav')
+    store.synthesize(tts, speaker, 'First sentence. Second one! Third?', 'en', output_path)
+
+    assert xtts.sentences == ['First sentence.', 'Second one!', 'Third?']
+    with wave.open(output_path, 'rb') as f:
+        assert f.getframerate() == 24000 and f.getsampwidth() == 2
+        assert f.getnframes() == 3 * 2400
+
+    try:
+        store.synthesize(tts, speaker, '   ', 'en', output_path)
+        assert False, 'expected empty text to be rejected'
+    except ValueError:
+        pass
+
+def test_delete():
+    store, tts, xtts, sample_path = make_store()
+    speaker_id = store.create(tts, 1, sample_path)
+    speaker = store.get(speaker_id, 1)
+    assert store.delete(speaker_id, 2) is False
+    assert store.delete(speaker_id, 1) is True
+    assert store.get(speaker_id, 1) is None
+    assert not os.path.exists(speaker['sample_path']) and not os.path.exists(speaker['latents_path'])
+    assert store.delete(speaker_id, 1) is False
+
+if __name__ == '__main__':
+    for test in (test_create_reuses_identical_sample, test_latents_cached_and_recomputed_for_new_model,
+                 test_synthesize_sentence_by_sentence, test_delete):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All speaker store tests passed")
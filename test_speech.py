@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Offline checks for sentence splitting and chunked TTS with the fake engine
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from speech import ChunkedSynthesizer, FakeTTSEngine, split_sentences
+from tts_cache import TTSCache
+
+class TaggedEngine(FakeTTSEngine):
+    """Fake engine whose audio is the sentence itself; shorter sentences finish first"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def synthesize(self, text):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01 * len(text))
+            return f"<{text}>".encode('utf-8')
+        finally:
+            self.active -= 1
+
+def test_split_sentences():
+    text = 'မင်္ဂလာပါ။ဒီနေ့ ပုံပြင်တစ်ပုဒ် ပြောမယ်။ Hello there! How are you?\n\nBye'
+    assert split_sentences(text) == ['မင်္ဂလာပါ။', 'ဒီနေ့ ပုံပြင်တစ်ပုဒ် ပြောမယ်။', 'Hello there!',
+                                     'How are you?', 'Bye']
+
+    # Over-long sentences split on clause breaks, then on whitespace
+    assert split_sentences('one two, three four, five six', 12) == ['one two,', 'three four,', 'five six']
+    words = ' '.join(['word'] * 30)
+    pieces = split_sentences(words, 20)
+    assert all(len(p) <= 20 for p in pieces) and ' '.join(pieces) == words
+    # A single word is never split, even if it is longer than the limit
+    assert split_sentences('a' * 30, 10) == ['a' * 30]
+
+    assert split_sentences('  \n \n') == []
+
+def test_in_order_under_concurrency():
+    engine = TaggedEngine()
+    synthesizer = ChunkedSynthesizer(engine, concurrency=3)
+    sentences = ['A much longer first sentence here.', 'Second.', 'Third one.', 'Four.', 'Fifth sentence.']
+
+    async def collect():
+        return [chunk async for chunk in synthesizer.stream(' '.join(sentences))]
+
+    chunks = asyncio.run(collect())
+    # Later, shorter sentences finish first but are yielded in text order
+    assert chunks == [f"<{s}>".encode('utf-8') for s in sentences]
+    assert engine.peak == 3 and engine.calls == len(sentences)
+
+def test_retry_per_sentence():
+    engine = FakeTTSEngine(failures=2)
+    synthesizer = ChunkedSynthesizer(engine, concurrency=1, retries=3, retry_delay=0.001)
+    audio = asyncio.run(synthesizer.synthesize('First sentence. Second sentence. Third.'))
+    # Only the failed sentence is retried, not the whole text
+    assert engine.calls == 3 + 2
+    assert audio and len(audio) % 144 == 0
+
+    engine = FakeTTSEngine(failures=5)
+    synthesizer = ChunkedSynthesizer(engine, retries=2, retry_delay=0.001)
+    try:
+        asyncio.run(synthesizer.synthesize('Never works.'))
+        assert False, 'expected the last failure to propagate'
+    except ConnectionError:
+        pass
+    assert engine.calls == 3
+
+def test_cache_and_save():
+    folder = tempfile.mkdtemp()
+    engine = TaggedEngine()
+    synthesizer = ChunkedSynthesizer(engine, cache=TTSCache(os.path.join(folder, 'cache')))
+    output_path = os.path.join(folder, 'voice.mp3')
+
+    async def run():
+        await synthesizer.save('One. Two. Three.', output_path)
+        assert synthesizer.cached_audio('One. Two. Three.') == b'<One.><Two.><Three.>'
+        # Only the edited sentence is synthesised again
+        return await synthesizer.synthesize('One. Two changed. Three.')
+
+    assert asyncio.run(run()) == b'<One.><Two changed.><Three.>'
+    assert engine.calls == 4
+    with open(output_path, 'rb') as f:
+        assert f.read() == b'<One.><Two.><Three.>'
+    # No partial file is left next to the output
+    assert sorted(os.listdir(folder)) == ['cache', 'voice.mp3']
+
+def test_cache_stats_count_each_lookup_once():
+    folder = tempfile.mkdtemp()
+    cache = TTSCache(folder)
+    synthesizer = ChunkedSynthesizer(TaggedEngine(), cache=cache)
+    asyncio.run(synthesizer.synthesize('One. Two.'))
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    assert synthesizer.cached_audio('One. Two.') == b'<One.><Two.>'
+    assert (cache.hits, cache.misses) == (2, 2)
+    # Stops at the first sentence that is not cached
+    assert synthesizer.cached_audio('Three. One.') is None
+    assert (cache.hits, cache.misses) == (2, 3)
+
+if __name__ == '__main__':
+    for test in (test_split_sentences, test_in_order_under_concurrency, test_retry_per_sentence,
+                 test_cache_and_save, test_cache_stats_count_each_lookup_once):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All speech tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline checks for transcript chunking and map-reduce story generation
+"""
+
+import os
+import re
+import sys
+import asyncio
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm import StubLLMClient
+from story import StoryGenerator, estimate_tokens, split_text
+
+PART_RE = re.compile(r'part (\d+) of (\d+)')
+
+class TrackingClient(StubLLMClient):
+    """Stub client that records its prompts and peak concurrency"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate(prompt)
+        finally:
+            self.active -= 1
+
+def summary_reply(prompt):
+    """Short summary naming the part, or the story for a final prompt"""
+    match = PART_RE.search(prompt)
+    return f"summary {match.group(1)}/{match.group(2)}" if match else 'THE STORY'
+
+def test_split_text_boundaries():
+    sentences = [f"Sentence number {i} talks about Bagan." for i in range(40)]
+    text = ' '.join(sentences)
+    chunks = split_text(text, 50)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks), chunks
+    # Chunks break between sentences and keep every one, in order
+    assert ' '.join(chunks) == text
+    assert all(chunk.endswith('.') for chunk in chunks)
+
+    # Myanmar sentence ends and newlines are boundaries too
+    assert split_text('ပထမ။ ဒုတိယ။\nတတိယ', 3) == ['ပထမ။', 'ဒုတိယ။', 'တတိယ']
+
+    # A sentence longer than the budget is split on whitespace
+    long_sentence = ' '.join(['word'] * 100) + '.'
+    pieces = split_text(long_sentence, 20)
+    assert len(pieces) > 1 and all(estimate_tokens(p) <= 20 for p in pieces)
+    assert ' '.join(pieces) == long_sentence
+
+    assert split_text('   \n\n ', 10) == []
+
+def test_short_transcript_single_call():
+    client = TrackingClient(responder=summary_reply)
+    story = asyncio.run(StoryGenerator(client, chunk_tokens=1000).generate('A short transcript.'))
+    assert story == 'THE STORY'
+    assert client.calls == 1
+    # Only the streamed story call; no map step
+    assert client.prompts == []
+
+def test_map_reduce():
+    client = TrackingClient(latency=0.05, responder=summary_reply)
+    generator = StoryGenerator(client, chunk_tokens=100, concurrency=3)
+    transcript = ' '.join(f"Line {i} of a long talk about Myanmar history." for i in range(60))
+    chunks = split_text(transcript, 100)
+
+    story = asyncio.run(generator.generate(transcript))
+    assert story == 'THE STORY'
+    # One map call per chunk, at most `concurrency` in flight, then the reduce
+    assert len(client.prompts) == len(chunks) > 3
+    assert client.peak == 3
+    assert client.calls == len(chunks) + 1
+    for prompt, chunk in zip(sorted(client.prompts, key=lambda p: int(PART_RE.search(p).group(1))), chunks):
+        assert chunk in prompt
+
+def test_reduce_prompt_orders_summaries():
+    captured = []
+
+    class ReduceClient(TrackingClient):
+        async def stream(self, prompt):
+            captured.append(prompt)
+            async for piece in super().stream(prompt):
+                yield piece
+
+    client = ReduceClient(responder=summary_reply)
+    transcript = ' '.join(f"Sentence {i} of the talk." for i in range(40))
+    total = len(split_text(transcript, 80))
+    asyncio.run(StoryGenerator(client, chunk_tokens=80).generate(transcript))
+
+    assert len(captured) == 1 and total > 1
+    notes = captured[0]
+    positions = [notes.index(f"Part {i}:\nsummary {i}/{total}") for i in range(1, total + 1)]
+    assert positions == sorted(positions)
+
+def test_summaries_resummarised_when_too_long():
+    long_summary = ' '.join(['detail'] * 30)
+
+    def responder(prompt):
+        return long_summary if PART_RE.search(prompt) else 'THE STORY'
+
+    client = TrackingClient(responder=responder)
+    transcript = ' '.join(f"Sentence {i} of the talk." for i in range(40))
+    first_round = len(split_text(transcript, 40))
+    asyncio.run(StoryGenerator(client, chunk_tokens=40).generate(transcript))
+    # Notes of long summaries are summarised again instead of overflowing
+    assert len(client.prompts) > first_round
+
+if __name__ == '__main__':
+    for test in (test_split_text_boundaries, test_short_transcript_single_call, test_map_reduce,
+                 test_reduce_prompt_orders_summaries, test_summaries_resummarised_when_too_long):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All story tests passed")
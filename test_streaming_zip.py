@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the streaming ZIP writer
+"""
+
+import io
+import os
+import sys
+import zlib
+import zipfile
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streaming_zip import stream_zip, tee_to_file
+
+def write_file(folder, name, data):
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def test_mp3_stored_text_deflated():
+    folder = tempfile.mkdtemp()
+    audio = os.urandom(300 * 1024)
+    story = ('မြန်မာ ပုံပြင် ' * 5000).encode('utf-8')
+    mp3_path = write_file(folder, 'voice.mp3', audio)
+    txt_path = write_file(folder, 'story.txt', story)
+
+    chunks = list(stream_zip([(mp3_path, 'voice.mp3'),
+                              (os.path.join(folder, 'missing.txt'), 'missing.txt'),
+                              (txt_path, 'story.txt')], chunk_size=16 * 1024))
+    # Emitted as it goes, not as one buffered archive
+    assert len(chunks) > 2, len(chunks)
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ['voice.mp3', 'story.txt']
+        mp3_info, txt_info = zf.getinfo('voice.mp3'), zf.getinfo('story.txt')
+        assert mp3_info.compress_type == zipfile.ZIP_STORED
+        assert mp3_info.compress_size == mp3_info.file_size == len(audio)
+        assert txt_info.compress_type == zipfile.ZIP_DEFLATED
+        assert txt_info.compress_size < txt_info.file_size == len(story)
+        assert mp3_info.CRC == zlib.crc32(audio)
+        assert txt_info.CRC == zlib.crc32(story)
+        assert zf.read('voice.mp3') == audio
+        assert zf.read('story.txt') == story
+
+def test_tee_to_file():
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'archive.zip')
+    assert b''.join(tee_to_file(iter([b'ab', b'cd']), path)) == b'abcd'
+    with open(path, 'rb') as f:
+        assert f.read() == b'abcd'
+
+    # An aborted stream leaves nothing behind
+    partial = os.path.join(folder, 'partial.zip')
+    stream = tee_to_file(iter([b'ab', b'cd']), partial)
+    next(stream)
+    stream.close()
+    assert os.listdir(folder) == ['archive.zip']
+
+if __name__ == '__main__':
+    for test in (test_mp3_stored_text_deflated, test_tee_to_file):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All streaming ZIP tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Offline checks for the transcript cache against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import Database
+from transcript_cache import TranscriptCache, content_hash
+
+# Columns of the transcripts table as created and migrated by app.init_db
+TRANSCRIPTS_TABLE = '''CREATE TABLE transcripts
+                       (id TEXT PRIMARY KEY, user_id INTEGER, filename TEXT, content TEXT, language TEXT,
+                        created_at TIMESTAMP, media_key TEXT, model TEXT, segments_path TEXT)'''
+
+RESULT = {'text': 'မင်္ဂလာပါ။ Hello.', 'language': 'my',
+          'segments': [{'start': 0.0, 'end': 1.5, 'text': 'မင်္ဂလာပါ။'}, {'start': 1.5, 'end': 2.0, 'text': 'Hello.'}]}
+
+def make_cache():
+    folder = tempfile.mkdtemp()
+    db = Database(os.path.join(folder, 'transcripts.db'))
+    db.execute(TRANSCRIPTS_TABLE)
+    return TranscriptCache(db, os.path.join(folder, 'segments'))
+
+def test_store_and_lookup():
+    cache = make_cache()
+    assert cache.lookup('youtube_abc', 'base', None) is None
+    first = cache.store(1, 'talk.mp4', 'youtube_abc', 'base', None, RESULT)
+
+    assert cache.lookup('youtube_abc', 'base', None) == RESULT
+    # Other models and languages are separate entries
+    assert cache.lookup('youtube_abc', 'small', None) is None
+    assert cache.lookup('youtube_abc', 'base', 'en') is None
+
+    # Another user's run of the same media adds a history row but shares the segment file
+    second = cache.store(2, 'talk.mp4', 'youtube_abc', 'base', None, RESULT)
+    rows = cache.db.query("SELECT id, user_id, language, segments_path FROM transcripts ORDER BY user_id")
+    assert [row['id'] for row in rows] == [first, second]
+    assert rows[0]['segments_path'] == rows[1]['segments_path']
+    assert rows[0]['language'] == 'auto'
+    assert os.listdir(cache.folder) == [os.path.basename(rows[0]['segments_path'])]
+
+def test_history_only_without_media_key():
+    cache = make_cache()
+    cache.store(1, 'upload.wav', None, 'base', 'my', RESULT)
+    row = cache.db.query_one("SELECT content, segments_path FROM transcripts")
+    assert row['content'] == RESULT['text'] and row['segments_path'] is None
+    assert os.listdir(cache.folder) == []
+
+def test_unreadable_entry_is_a_miss():
+    cache = make_cache()
+    cache.store(1, 'talk.mp4', 'youtube_abc', 'base', 'my', RESULT)
+    os.remove(cache.segments_path('youtube_abc', 'base', 'my'))
+    assert cache.lookup('youtube_abc', 'base', 'my') is None
+
+    cache.store(1, 'talk.mp4', 'sha256_x', 'base', 'my', RESULT)
+    with open(cache.segments_path('sha256_x', 'base', 'my'), 'w') as f:
+        f.write('{truncated')
+    assert cache.lookup('sha256_x', 'base', 'my') is None
+
+def test_segments_path_and_content_hash():
+    cache = make_cache()
+    path = cache.segments_path('url_../x', 'large-v3', None)
+    assert os.path.dirname(path) == cache.folder
+    assert os.path.basename(path) == 'url_.._x_large-v3_auto.json'
+
+    folder = tempfile.mkdtemp()
+    for name, data in (('a.bin', b'same'), ('b.bin', b'same'), ('c.bin', b'other')):
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(data)
+    a, b, c = (content_hash(os.path.join(folder, name), chunk_size=2) for name in ('a.bin', 'b.bin', 'c.bin'))
+    assert a == b != c and a.startswith('sha256_')
+
+if __name__ == '__main__':
+    for test in (test_store_and_lookup, test_history_only_without_media_key, test_unreadable_entry_is_a_miss,
+                 test_segments_path_and_content_hash):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All transcript cache tests passed")
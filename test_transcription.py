@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline checks for streamed transcription with a fake Whisper decoder
+"""
+
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vad import SAMPLE_RATE
+from transcription import BatchedTranscriber, PCM_BLOCK_BYTES
+
+class FakeDecoder(BatchedTranscriber):
+    """Batcher whose 'transcript' of a window is its loudness"""
+
+    def __init__(self):
+        super().__init__(model_manager=None, max_batch=4, max_latency=0.01)
+        self.decoded = []
+
+    def _decode(self, language, requests):
+        for request in requests:
+            self.decoded.append(len(request.audio))
+            level = float(np.max(np.abs(request.audio)))
+            request.future.set_result(SimpleNamespace(text=f"level {level:.1f}", language='my',
+                                                      no_speech_prob=0.0, avg_logprob=-0.2))
+
+def synth(*parts):
+    pieces = []
+    for level, seconds in parts:
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        pieces.append(level * np.sin(2 * np.pi * 440 * t) if level else np.zeros(len(t)))
+    return np.concatenate(pieces).astype(np.float32)
+
+def test_stream_segments_line_up():
+    # Tones far enough apart that each becomes its own 30 second window
+    samples = synth((0, 2), (0.1, 5), (0, 35), (0.2, 5), (0, 35), (0.3, 4), (0, 3))
+    data = samples.tobytes()
+    decoder = FakeDecoder()
+    segments = []
+
+    async def run():
+        reader = asyncio.StreamReader()
+
+        async def produce():
+            # Odd-sized reads split floats across blocks
+            for i in range(0, len(data), PCM_BLOCK_BYTES + 3):
+                reader.feed_data(data[i:i + PCM_BLOCK_BYTES + 3])
+                await asyncio.sleep(0)
+            reader.feed_eof()
+
+        producer = asyncio.ensure_future(produce())
+        result = await decoder.transcribe_reader(reader, on_segment=segments.append)
+        await producer
+        return result
+
+    result = asyncio.run(run())
+    assert [s['text'] for s in result['segments']] == ['level 0.1', 'level 0.2', 'level 0.3']
+    # Segment times come from the window offsets kept after the samples were dropped
+    for segment, start, end in zip(result['segments'], (2, 42, 82), (7, 47, 86)):
+        assert abs(segment['start'] - (start - 0.2)) <= 0.05, segment
+        assert abs(segment['end'] - (end + 0.2)) <= 0.05, segment
+    assert segments == result['segments']
+    assert result['language'] == 'my'
+    assert len(decoder.decoded) == 3
+
+def test_failed_stream_raises():
+    decoder = FakeDecoder()
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(synth((0.2, 3), (0, 1)).tobytes())
+        reader.feed_eof()
+
+        async def on_eof():
+            raise RuntimeError('ffmpeg failed')
+
+        await decoder.transcribe_reader(reader, on_eof=on_eof)
+
+    try:
+        asyncio.run(run())
+        assert False, 'expected the decoder failure to propagate'
+    except RuntimeError:
+        pass
+
+if __name__ == '__main__':
+    for test in (test_stream_segments_line_up, test_failed_stream_raises):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All transcription tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline checks for energy VAD and streaming windows on synthetic PCM
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vad import SAMPLE_RATE, speech_regions, split_on_silence
+from transcription import StreamChunker
+
+FRAME_SECONDS = 0.03
+
+def synth(*parts):
+    """Concatenate (kind, seconds) parts: 'silence' is faint noise, 'tone' a 440Hz sine"""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for kind, seconds in parts:
+        n = int(seconds * SAMPLE_RATE)
+        if kind == 'tone':
+            t = np.arange(n) / SAMPLE_RATE
+            pieces.append(0.3 * np.sin(2 * np.pi * 440 * t))
+        else:
+            pieces.append(rng.normal(0, 1e-4, n))
+    return np.concatenate(pieces).astype(np.float32)
+
+def approx(a, b, tolerance=FRAME_SECONDS):
+    return abs(a - b) <= tolerance + 1e-9
+
+def test_speech_regions():
+    samples = synth(('silence', 1), ('tone', 2), ('silence', 1), ('tone', 3), ('silence', 1))
+    regions = [(s * FRAME_SECONDS, e * FRAME_SECONDS) for s, e in speech_regions(samples)]
+    assert len(regions) == 2, regions
+    assert approx(regions[0][0], 1) and approx(regions[0][1], 3), regions
+    assert approx(regions[1][0], 4) and approx(regions[1][1], 7), regions
+
+    # Pauses shorter than min_silence_ms are bridged
+    samples = synth(('silence', 1), ('tone', 1), ('silence', 0.15), ('tone', 1), ('silence', 1))
+    assert len(speech_regions(samples)) == 1
+
+    assert speech_regions(synth(('silence', 2))) == []
+
+def test_split_on_silence():
+    samples = synth(('silence', 1), ('tone', 2), ('silence', 1), ('tone', 3), ('silence', 1))
+    # Both regions fit one window, padded by 200ms on each side
+    chunks = split_on_silence(samples, max_chunk_seconds=30)
+    assert len(chunks) == 1
+    start, end = (c / SAMPLE_RATE for c in chunks[0])
+    assert approx(start, 0.8) and approx(end, 7.2), chunks
+
+    # With 2.5 second windows each region gets its own, and the 3 second
+    # tone is cut into windows that neither overlap nor leave gaps
+    chunks = split_on_silence(samples, max_chunk_seconds=2.5)
+    assert all(end - start <= 2.5 * SAMPLE_RATE for start, end in chunks), chunks
+    assert approx(chunks[0][0] / SAMPLE_RATE, 0.8) and approx(chunks[0][1] / SAMPLE_RATE, 3.2), chunks
+    rest = chunks[1:]
+    assert len(rest) == 2, chunks
+    assert rest[0][1] == rest[1][0]
+    assert approx(rest[0][0] / SAMPLE_RATE, 3.8) and approx(rest[-1][1] / SAMPLE_RATE, 7.2), chunks
+
+def test_stream_chunker_windows():
+    samples = synth(('silence', 1), ('tone', 4), ('silence', 3), ('tone', 4), ('silence', 3))
+    chunker = StreamChunker(max_chunk_seconds=6)
+    windows = []
+    emitted_at = []
+    for second in range(15):
+        block = samples[second * SAMPLE_RATE:(second + 1) * SAMPLE_RATE]
+        new = chunker.feed(block)
+        windows += new
+        emitted_at += [second + 1] * len(new)
+    windows += chunker.flush()
+
+    assert len(windows) == 2, [(w.offset, w.duration) for w in windows]
+    first, second = windows
+    # A window is released once two seconds of trailing silence closed it
+    assert emitted_at == [8, 15]
+    assert approx(first.offset, 0.8) and approx(first.offset + first.duration, 5.2)
+    assert approx(second.offset, 8.0) and approx(second.offset + second.duration, 12.2)
+    assert first.offset + first.duration <= second.offset
+    for window in windows:
+        start = int(round(window.offset * SAMPLE_RATE))
+        assert np.array_equal(window.audio, samples[start:start + len(window.audio)])
+        assert len(window.audio) == int(round(window.duration * SAMPLE_RATE))
+
+def test_stream_chunker_continuous_speech():
+    samples = synth(('tone', 20))
+    chunker = StreamChunker(max_chunk_seconds=6)
+    windows = []
+    for second in range(20):
+        windows += chunker.feed(samples[second * SAMPLE_RATE:(second + 1) * SAMPLE_RATE])
+    windows += chunker.flush()
+
+    assert all(w.duration <= 6 for w in windows)
+    # Cut windows tile the stream: no overlap, no gap, nothing lost
+    position = 0.0
+    for window in windows:
+        assert approx(window.offset, position, 1e-6), (window.offset, position)
+        position = window.offset + window.duration
+    assert approx(position, 20, 1e-6)
+    assert sum(len(w.audio) for w in windows) == len(samples)
+
+if __name__ == '__main__':
+    for test in (test_speech_regions, test_split_on_silence, test_stream_chunker_windows,
+                 test_stream_chunker_continuous_speech):
+        print(f"▶ {test.__name__}")
+        test()
+    print("✅ All VAD tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Transcript cache keyed by media identity, model and language
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Requested language when Whisper detects it itself
+AUTO_LANGUAGE = 'auto'
+
+
+class TranscriptCache:
+    """Reuse finished transcripts of the same media
+
+    Every stored transcript is a row in the ``transcripts`` table (which also
+    backs the user's transcript history) plus a segment JSON file shared by
+    all rows for the same media/model/language.
+    """
+
+    def __init__(self, db, folder: str):
+        self.db = db
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def segments_path(self, media_key: str, model: str, language: Optional[str]) -> str:
+        name = f"{media_key}_{model}_{language or AUTO_LANGUAGE}.json"
+        return os.path.join(self.folder, ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name))
+
+    def lookup(self, media_key: str, model: str, language: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached transcript result (text, segments, language) or None"""
+        row = self.db.query_one(
+            "SELECT segments_path FROM transcripts WHERE media_key = ? AND model = ? AND language = ? "
+            "AND segments_path IS NOT NULL ORDER BY created_at DESC LIMIT 1",
+            (media_key, model, language or AUTO_LANGUAGE))
+        if row is None:
+            return None
+        try:
+            with open(row['segments_path'], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Transcript cache entry for {media_key} unreadable: {e}")
+            return None
+
+    def store(self, user_id, filename: str, media_key: Optional[str], model: str,
+              language: Optional[str], result: Dict[str, Any]) -> str:
+        """Record a transcript for the user's history and, with a media key, for reuse"""
+        segments_path = None
+        if media_key:
+            segments_path = self.segments_path(media_key, model, language)
+        if segments_path and not os.path.exists(segments_path):
+            tmp_path = f"{segments_path}.part-{uuid.uuid4().hex[:8]}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': result['text'], 'segments': result.get('segments', []),
+                           'language': result.get('language')}, f, ensure_ascii=False)
+            os.replace(tmp_path, segments_path)
+
+        transcript_id = str(uuid.uuid4())
+        self.db.execute(
+            "INSERT INTO transcripts (id, user_id, filename, content, language, created_at, "
+            "media_key, model, segments_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (transcript_id, user_id, filename, result['text'], language or AUTO_LANGUAGE,
+             datetime.now(), media_key, model, segments_path))
+        return transcript_id
+
+
+def content_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Media key for a file whose source has no stable ID"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return 'sha256_' + digest.hexdigest()
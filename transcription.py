@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Batched Whisper transcription shared by all transcript jobs
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, Executor
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vad import SAMPLE_RATE, split_on_silence
+
+logger = logging.getLogger(__name__)
+
+# Same thresholds whisper.transcribe uses to drop silent windows
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# Whisper's input window in seconds
+CHUNK_SECONDS = 30
+
+# Silence after the last chunk that marks it as complete while streaming
+TRAILING_SILENCE_SECONDS = 2
+
+# Bytes of f32le PCM read from ffmpeg per step (one second of 16kHz mono)
+PCM_BLOCK_BYTES = SAMPLE_RATE * 4
+
+
+class AudioWindow:
+    """A speech chunk of at most 30 seconds; streams drop ``audio`` once it is queued"""
+
+    __slots__ = ('offset', 'duration', 'audio')
+
+    def __init__(self, offset: float, duration: float, audio):
+        self.offset = offset
+        self.duration = duration
+        self.audio = audio
+
+
+class _WindowRequest:
+    __slots__ = ('audio', 'language', 'future')
+
+    def __init__(self, audio, language: Optional[str]):
+        self.audio = audio
+        self.language = language
+        self.future: Future = Future()
+
+
+class BatchedTranscriber:
+    """Decode speech windows from every active job in shared batches
+
+    Jobs split their audio at silences into windows of at most 30 seconds
+    (Whisper's input size) and queue them; a single batcher
+    thread waits up to ``max_latency`` seconds for up to ``max_batch``
+    windows, then runs the Whisper encoder and decoder once over the stacked
+    batch and hands each result back to the job that queued it. Windows
+    whose Future was cancelled before their batch started are dropped.
+
+    At most ``max_streams`` ffmpeg decoders run at once for
+    ``transcribe_stream``; further streams wait on the event loop for a
+    slot without holding a thread.
+    """
+
+    def __init__(self, model_manager, model_name: str = 'whisper', max_batch: int = 8,
+                 max_latency: float = 0.1, executor: Optional[Executor] = None,
+                 max_streams: int = 4):
+        self.model_manager = model_manager
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.executor = executor
+        self.max_streams = max_streams
+        self._stream_slots = asyncio.Semaphore(max_streams)
+        self._queue: 'queue.Queue[_WindowRequest]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.windows = 0
+
+    def load_windows(self, source: Union[str, np.ndarray]) -> List[AudioWindow]:
+        """Cut 16kHz samples (or a file decoded to them) at silences into windows of at most 30s"""
+        if isinstance(source, str):
+            import whisper
+            audio = whisper.load_audio(source)
+        else:
+            audio = source
+        return [AudioWindow(start / SAMPLE_RATE, (end - start) / SAMPLE_RATE, audio[start:end])
+                for start, end in split_on_silence(audio, SAMPLE_RATE, max_chunk_seconds=CHUNK_SECONDS)]
+
+    def submit(self, audio, language: Optional[str] = None) -> Future:
+        """Queue one window of samples; the Future resolves to whisper's DecodingResult"""
+        self._start()
+        request = _WindowRequest(audio, language)
+        self._queue.put(request)
+        return request.future
+
+    def transcribe(self, source: Union[str, np.ndarray], language: Optional[str] = None) -> Dict[str, Any]:
+        """Blocking transcription of a file or samples through the shared batches"""
+        windows = self.load_windows(source)
+        futures = [self.submit(w.audio, language) for w in windows]
+        try:
+            results = [f.result() for f in futures]
+        finally:
+            # After a failure the remaining windows are not decoded
+            for future in futures:
+                future.cancel()
+        return stitch(windows, results)
+
+    async def transcribe_async(self, source: Union[str, np.ndarray], language: Optional[str] = None,
+                               on_segment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Transcribe without holding a thread while the windows wait for a batch"""
+        loop = asyncio.get_running_loop()
+        windows = await loop.run_in_executor(self.executor, self.load_windows, source)
+        futures = [asyncio.wrap_future(self.submit(w.audio, language)) for w in windows]
+        results = []
+        segment_count = 0
+        try:
+            for window, future in zip(windows, futures):
+                result = await future
+                results.append(result)
+                segment = make_segment(window, result, segment_count)
+                if segment:
+                    segment_count += 1
+                    if on_segment:
+                        on_segment(segment)
+        finally:
+            # Cancelling the wrapper cancels the queued request too
+            for future in futures:
+                future.cancel()
+        return stitch(windows, results)
+
+    async def transcribe_stream(self, input_args: Sequence[str], language: Optional[str] = None,
+                                on_segment: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                pcm_sink: Optional[BinaryIO] = None) -> Dict[str, Any]:
+        """Transcribe audio while ffmpeg is still decoding it
+
+        ffmpeg decodes ``input_args`` (e.g. ['-i', url]) straight to 16kHz
+        mono PCM. Every chunk that ends in silence is queued for decoding as
+        soon as it has arrived, and ``on_segment`` receives timestamped
+        segments in order while the rest of the audio is still streaming.
+        The decoded PCM is also written to ``pcm_sink`` when one is given.
+        """
+        async with self._stream_slots:
+            return await self._transcribe_stream(input_args, language, on_segment, pcm_sink)
+
+    async def _transcribe_stream(self, input_args: Sequence[str], language: Optional[str],
+                                 on_segment: Optional[Callable[[Dict[str, Any]], None]],
+                                 pcm_sink: Optional[BinaryIO]) -> Dict[str, Any]:
+        proc = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-nostdin', '-v', 'error', *input_args,
+            '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), 'pipe:1',
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+
+        async def check_exit():
+            await proc.wait()
+            if proc.returncode != 0:
+                raise Exception(f"ffmpeg exited with {proc.returncode}: "
+                                f"{(await stderr_task).decode(errors='replace').strip()[-500:]}")
+
+        try:
+            return await self.transcribe_reader(proc.stdout, language, on_segment, pcm_sink, on_eof=check_exit)
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            stderr_task.cancel()
+
+    async def transcribe_reader(self, reader: asyncio.StreamReader, language: Optional[str] = None,
+                                on_segment: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                pcm_sink: Optional[BinaryIO] = None,
+                                on_eof: Optional[Callable[[], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Transcribe 16kHz mono f32le PCM as it arrives on reader
+
+        Submitted windows keep only their offset and duration; the queued
+        request holds the samples until its batch is decoded, so memory stays
+        bounded by the chunker's buffer however long the stream runs.
+        ``on_eof`` is awaited once the reader is exhausted, before the last
+        chunk is flushed, and may raise to abort the transcript.
+        """
+        chunker = StreamChunker(SAMPLE_RATE, CHUNK_SECONDS)
+        windows: List[AudioWindow] = []
+        futures: List[asyncio.Future] = []
+        results: List[Any] = []
+        segment_count = 0
+
+        def queue_windows(new_windows: List[AudioWindow]):
+            for window in new_windows:
+                futures.append(asyncio.wrap_future(self.submit(window.audio, language)))
+                window.audio = None
+                windows.append(window)
+
+        def emit(result):
+            nonlocal segment_count
+            segment = make_segment(windows[len(results)], result, segment_count)
+            results.append(result)
+            if segment:
+                segment_count += 1
+                if on_segment:
+                    on_segment(segment)
+
+        try:
+            pending = b''
+            while True:
+                data = await reader.read(PCM_BLOCK_BYTES)
+                if not data:
+                    break
+                # Keep a partial float for the next read
+                data, pending = pending + data, b''
+                usable = len(data) - len(data) % 4
+                data, pending = data[:usable], data[usable:]
+                if pcm_sink is not None:
+                    pcm_sink.write(data)
+                queue_windows(chunker.feed(np.frombuffer(data, dtype=np.float32)))
+                # Publish whatever finished decoding, strictly in order
+                while len(results) < len(futures) and futures[len(results)].done():
+                    emit(futures[len(results)].result())
+            if on_eof:
+                await on_eof()
+            queue_windows(chunker.flush())
+            while len(results) < len(futures):
+                emit(await futures[len(results)])
+        finally:
+            # Windows still queued when the stream failed are dropped by the batcher
+            for future in futures:
+                future.cancel()
+        return stitch(windows, results)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'windows': self.windows,
+            'avg_batch_size': round(self.windows / self.batches, 2) if self.batches else 0,
+            'queued': self._queue.qsize(),
+        }
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='whisper-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[_WindowRequest]:
+        """Block for one window, then gather more until the batch is full or latency runs out"""
+        batch: List[_WindowRequest] = []
+        deadline = None
+        while len(batch) < self.max_batch:
+            if deadline is None:
+                request = self._queue.get()
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            # Windows of a stream that failed or was cancelled are dropped, not decoded
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            batch.append(request)
+            if deadline is None:
+                deadline = time.monotonic() + self.max_latency
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Decoding options are per batch, so split by requested language
+            by_language: Dict[Optional[str], List[_WindowRequest]] = {}
+            for request in batch:
+                by_language.setdefault(request.language, []).append(request)
+            for language, requests in by_language.items():
+                self._decode(language, requests)
+
+    def _decode(self, language: Optional[str], requests: List[_WindowRequest]):
+        try:
+            import torch
+            import whisper
+
+            with self.model_manager.use(self.model_name) as model:
+                # Mels are built here so queued windows only hold their samples
+                # np.array copies memory-mapped windows into writable buffers for torch
+                mels = torch.stack([whisper.log_mel_spectrogram(whisper.pad_or_trim(np.array(r.audio)),
+                                                                model.dims.n_mels)
+                                    for r in requests]).to(model.device)
+                options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                                  fp16=model.device.type == 'cuda')
+                start = time.time()
+                results = whisper.decode(model, mels, options)
+            self.batches += 1
+            self.windows += len(requests)
+            logger.info(f"Whisper batch of {len(requests)} windows decoded in {time.time() - start:.1f}s")
+            for request, result in zip(requests, results):
+                request.future.set_result(result)
+        except Exception as e:
+            logger.error(f"Whisper batch decode error: {e}")
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+
+class StreamChunker:
+    """Turn a growing stream of samples into silence-bounded windows
+
+    Samples are buffered until more than one window's worth has arrived;
+    every chunk except the last one is then final, because the VAD found
+    the silence that ends it. The last chunk stays buffered as it may
+    still continue.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, max_chunk_seconds: float = CHUNK_SECONDS):
+        self.sample_rate = sample_rate
+        self.max_chunk_seconds = max_chunk_seconds
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # stream position of the buffer's first sample
+
+    def feed(self, samples: np.ndarray) -> List[AudioWindow]:
+        self._buffer = np.concatenate((self._buffer, samples))
+        if len(self._buffer) <= self.max_chunk_seconds * self.sample_rate:
+            return []
+        chunks = split_on_silence(self._buffer, self.sample_rate, self.max_chunk_seconds)
+        if not chunks:
+            # Nothing but silence so far
+            return self._drop(len(self._buffer), [])
+        if len(self._buffer) - chunks[-1][1] > TRAILING_SILENCE_SECONDS * self.sample_rate:
+            # A long pause already closed the last chunk
+            return self._drop(len(self._buffer), chunks)
+        return self._drop(chunks[-1][0], chunks[:-1])
+
+    def flush(self) -> List[AudioWindow]:
+        chunks = split_on_silence(self._buffer, self.sample_rate, self.max_chunk_seconds)
+        return self._drop(len(self._buffer), chunks)
+
+    def _drop(self, keep_from: int, chunks: List[Tuple[int, int]]) -> List[AudioWindow]:
+        # Copy each window so the buffer it came from can be freed
+        windows = [AudioWindow((self._offset + start) / self.sample_rate, (end - start) / self.sample_rate,
+                               self._buffer[start:end].copy())
+                   for start, end in chunks]
+        self._buffer = self._buffer[keep_from:].copy()
+        self._offset += keep_from
+        return windows
+
+
+def make_segment(window: AudioWindow, result: Any, index: int) -> Optional[Dict[str, Any]]:
+    """Timestamped segment for one decoded window, None for silence"""
+    text = result.text.strip()
+    if not text or (result.no_speech_prob > NO_SPEECH_THRESHOLD
+                    and result.avg_logprob < LOGPROB_THRESHOLD):
+        return None
+    return {
+        'id': index,
+        'start': round(window.offset, 2),
+        'end': round(window.offset + window.duration, 2),
+        'text': text,
+        'avg_logprob': result.avg_logprob,
+        'no_speech_prob': result.no_speech_prob,
+    }
+
+
+def stitch(windows: List[AudioWindow], results: List[Any]) -> Dict[str, Any]:
+    """Join per-window results into whisper.transcribe's output shape"""
+    segments = []
+    for window, result in zip(windows, results):
+        segment = make_segment(window, result, len(segments))
+        if segment:
+            segments.append(segment)
+    languages = Counter(r.language for r in results if getattr(r, 'language', None))
+    return {
+        'text': ' '.join(s['text'] for s in segments),
+        'segments': segments,
+        'language': languages.most_common(1)[0][0] if languages else None,
+    }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Content-addressed disk cache of synthesised speech, one file per sentence
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+TTS_EXTENSION = '.mp3'
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of text for cache keys: NFC, single spaces, trimmed"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class TTSCache:
+    """MP3 audio keyed by engine, voice, language and normalised text
+
+    Entries are per sentence, so an edited story only re-synthesises the
+    sentences that changed. Least recently used files are removed once the
+    folder exceeds ``max_bytes``.
+    """
+
+    def __init__(self, folder: str, max_bytes: int = 1024 ** 3):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, engine, text: str) -> str:
+        identity = f"{engine.name}\0{engine.voice}\0{engine.language}\0{normalize_text(text)}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}{TTS_EXTENSION}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio for key, or None"""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                audio = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return audio
+
+    def cached_path(self, key: str) -> Optional[str]:
+        """Path of a cached entry to serve as a file, or None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, audio: bytes):
+        path = self.path(key)
+        # Unique per write: puts for the same sentence can overlap on the event loop thread
+        tmp_path = f"{path}.part-{uuid.uuid4().hex}"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += len(audio)
+            over = self._bytes is None or self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used files until the cache fits max_bytes"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.folder):
+                if not name.endswith(TTS_EXTENSION):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.folder, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                    total -= size
+                    removed += 1
+                except OSError:
+                    pass
+            self._bytes = total
+            if removed:
+                logger.info(f"Evicted {removed} cached TTS sentences")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Energy-based voice activity detection for splitting long audio at silences
+"""
+
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def frame_energy_db(samples: np.ndarray, frame_samples: int) -> np.ndarray:
+    """RMS level of each non-overlapping frame in dBFS"""
+    n_frames = len(samples) // frame_samples
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:n_frames * frame_samples].reshape(n_frames, frame_samples)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-5))
+
+
+def speech_regions(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                   margin_db: float = 12.0, floor_db: float = -50.0,
+                   min_silence_ms: int = 300, min_speech_ms: int = 200) -> List[Tuple[int, int]]:
+    """(start_frame, end_frame) runs of speech
+
+    A frame is speech when it is margin_db above the noise floor (10th
+    percentile frame level) and above floor_db. When the audio is mostly
+    speech the floor is itself speech, so the threshold is also capped at
+    margin_db below the typical speech level (90th percentile). Pauses
+    shorter than min_silence_ms are bridged and blips shorter than
+    min_speech_ms dropped.
+    """
+    frame_samples = sample_rate * frame_ms // 1000
+    energy = frame_energy_db(samples, frame_samples)
+    if len(energy) == 0:
+        return []
+    noise, speech = np.percentile(energy, [10, 90])
+    threshold = max(min(noise + margin_db, speech - margin_db), floor_db)
+    voiced = energy > threshold
+
+    # Edges of voiced runs: +1 where a run starts, -1 one past where it ends
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_gap = max(1, min_silence_ms // frame_ms)
+    min_run = max(1, min_speech_ms // frame_ms)
+    regions: List[Tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [(s, e) for s, e in regions if e - s >= min_run]
+
+
+def split_on_silence(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                     max_chunk_seconds: float = 30.0, frame_ms: int = 30,
+                     pad_ms: int = 200, **vad_options) -> List[Tuple[int, int]]:
+    """(start_sample, end_sample) chunks of speech, each at most max_chunk_seconds
+
+    Neighbouring speech regions are packed into a chunk while it still fits,
+    so chunks end in silence. A single region longer than the limit is cut
+    at its quietest frame in the second half of the allowed span. Silence
+    between chunks is not transcribed at all.
+    """
+    frame_samples = sample_rate * frame_ms // 1000
+    max_frames = int(max_chunk_seconds * 1000 // frame_ms)
+    pad = pad_ms // frame_ms
+    total_frames = len(samples) // frame_samples
+    regions = speech_regions(samples, sample_rate, frame_ms, **vad_options)
+    energy = frame_energy_db(samples, frame_samples)
+
+    # Long regions are cut first so every region fits in one chunk
+    pieces: List[Tuple[int, int]] = []
+    for start, end in regions:
+        start, end = max(0, start - pad), min(total_frames, end + pad)
+        if pieces and start < pieces[-1][1]:
+            start = pieces[-1][1]
+        while end - start > max_frames:
+            lo = start + max_frames // 2
+            cut = lo + int(np.argmin(energy[lo:start + max_frames]))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    chunks: List[Tuple[int, int]] = []
+    for start, end in pieces:
+        if chunks and end - chunks[-1][0] <= max_frames:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+
+    result = [(s * frame_samples, min(len(samples), e * frame_samples)) for s, e in chunks]
+    if result:
+        # The partial frame at the end of the file belongs to the last chunk
+        if total_frames and result[-1][1] == total_frames * frame_samples:
+            result[-1] = (result[-1][0], len(samples))
+        speech = sum(e - s for s, e in result) / sample_rate
+        logger.info(f"VAD: {len(result)} chunks, {speech:.0f}s speech of {len(samples) / sample_rate:.0f}s audio")
+    return result